@@ -1,16 +1,23 @@
 from flask import Flask
-from neo4j import GraphDatabase
+from app.utils.logging_config import configure_logging, get_logger
+from app.utils.json_provider import FastJSONProvider
+from app.utils import admission, timing
 from dotenv import load_dotenv
 import os
 
 from app.routes import graph
 
+logger = get_logger("time")
 
 # Load environment variables from .env
 load_dotenv()
 
 def create_app():
+    configure_logging()
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    timing.init_app(app)
+    admission.init_app(app)
 
     # Fetch Neo4j credentials from environment variables
     NEO4J_URI = os.getenv("NEO4J_URI")
@@ -21,25 +28,21 @@ def create_app():
     if not NEO4J_URI or not NEO4J_USER or not NEO4J_PASSWORD:
         raise ValueError("Neo4j connection details are missing in the environment variables.")
 
-    # Initialize Neo4j driver
-    driver = GraphDatabase.driver(
-        NEO4J_URI,
-        auth=(NEO4J_USER, NEO4J_PASSWORD),
-        connection_timeout=120
-    )
+    # Shared Neo4j driver; each process (including forked workers) opens its own pool
+    from app.routes.constants import neo4j_driver
 
     # Test the connection
     try:
-        driver.verify_connectivity()
+        neo4j_driver.verify_connectivity()
     except Exception as e:
         raise ConnectionError(f"Failed to connect to Neo4j: {e}")
 
-    app.config['graph'] = driver
+    app.config['graph'] = neo4j_driver
     
 
     with app.app_context():
         from app import models
-        from app.routes import main, geolocate, ephemeris, graph
+        from app.routes import main, geolocate, ephemeris, graph, search, heatmap, stream, metrics, terminal
        
 
         print("Registering blueprints...")
@@ -56,8 +59,30 @@ def create_app():
         app.register_blueprint(graph.filter_viz_bp, url_prefix='/')
         print("Graph filter routes registered.")
         
+        app.register_blueprint(search.search_bp, url_prefix='/')
+        print("Search routes registered.")
+
+        app.register_blueprint(heatmap.heatmap_bp, url_prefix='/')
+        print("Heatmap routes registered.")
+
+        app.register_blueprint(stream.stream_bp, url_prefix='/')
+        print("Stream routes registered.")
+
+        app.register_blueprint(metrics.metrics_bp, url_prefix='/')
+        print("Metrics routes registered.")
+
+        app.register_blueprint(terminal.terminal_bp, url_prefix='/')
+        print("Terminal routes registered.")
+        
         from app.routes.chart import chart_routes
         app.register_blueprint(chart_routes)
 
+        # The heatmap takes hour rulers from this table; report where the ontology disagrees
+        from app.routes.utils import hour_rulers
+        try:
+            hour_rulers.verify_against_ontology()
+        except Exception as e:
+            logger.warning("Hour ruler check skipped: %s", e)
+
 
     return app
\ No newline at end of file
@@ -44,29 +44,59 @@ class Topic:
 
 
     # TOPIC DIRECT AND INFERRED ANALOGIES
+    # MERGEs the direct pair both ways, then links the topic to every other direct
+    # analogy of the analogous topic (same system) with INFERRED_ANALOGY both ways.
+    # One row per (analogous_topic_id, system_id) pair, so a whole batch runs as a
+    # single statement.
+    ADD_ANALOGIES_QUERY = """
+    UNWIND $analogies AS analogy
+    MATCH (t:Topic {id: $topic_id}), (a:Topic {id: analogy.analogous_topic_id})
+    MERGE (t)-[:DIRECT_ANALOGY {system_id: analogy.system_id}]->(a)
+    MERGE (a)-[:DIRECT_ANALOGY {system_id: analogy.system_id}]->(t)
+    WITH t, a, analogy
+    OPTIONAL MATCH (a)-[:DIRECT_ANALOGY {system_id: analogy.system_id}]->(peer:Topic)
+    WHERE peer <> t
+    WITH t, analogy, collect(DISTINCT peer) AS peers
+    FOREACH (p IN peers |
+        MERGE (t)-[:INFERRED_ANALOGY {system_id: analogy.system_id}]->(p)
+        MERGE (p)-[:INFERRED_ANALOGY {system_id: analogy.system_id}]->(t)
+    )
+    RETURN count(*) AS pairs, sum(size(peers)) AS inferred
+    """
+
     def add_direct_analogy(self, topic_id, analogous_topic_id, system_id):
         """
         Creates a bidirectional DIRECT_ANALOGY relationship between two topics with a system ID.
         Automatically creates the reverse analogy and updates inferred analogies.
         """
-        topic_node = self.graph.nodes.match("Topic", id=topic_id).first()
-        analogous_topic_node = self.graph.nodes.match("Topic", id=analogous_topic_id).first()
-        
-        if topic_node and analogous_topic_node:
-            # Create the direct analogy relationship with the system_id property
-            rel = Relationship(topic_node, "DIRECT_ANALOGY", analogous_topic_node, system_id=system_id)
-            reverse_rel = Relationship(analogous_topic_node, "DIRECT_ANALOGY", topic_node, system_id=system_id)
-            self.graph.create(rel)
-            self.graph.create(reverse_rel)
+        return self.add_direct_analogies(topic_id, [
+            {"analogous_topic_id": analogous_topic_id, "system_id": system_id}
+        ])
 
-            # Fetch all existing direct analogies for the analogous topic
-            existing_analogies = self.get_direct_analogies(analogous_topic_id, system_id)
+    def add_direct_analogies(self, topic_id, analogies):
+        """
+        Adds several direct analogies (and their inferred analogies) for a topic
+        in a single Cypher statement, i.e. one round trip and one transaction.
+
+        Parameters:
+            - topic_id: ID of the topic receiving the analogies.
+            - analogies: List of {"analogous_topic_id": ..., "system_id": ...} dicts.
 
-            # Add inferred analogies between the new topic and each existing analogous topic
-            for existing_analogy in existing_analogies:
-                if existing_analogy != topic_id:
-                    self.add_inferred_analogy(topic_id, existing_analogy, system_id)
-                    self.add_inferred_analogy(existing_analogy, topic_id, system_id)
+        Returns:
+            dict: Number of direct pairs matched and inferred peers linked.
+        """
+        analogies = [
+            analogy for analogy in analogies
+            if analogy.get("analogous_topic_id") and analogy.get("system_id")
+            and analogy["analogous_topic_id"] != topic_id
+        ]
+        if not analogies:
+            return {"pairs": 0, "inferred": 0}
+
+        result = self.graph.run(self.ADD_ANALOGIES_QUERY, topic_id=topic_id, analogies=analogies).data()
+        if not result:
+            return {"pairs": 0, "inferred": 0}
+        return {"pairs": result[0]["pairs"], "inferred": result[0]["inferred"] or 0}
 
     def get_direct_analogies(self, topic_id, system_id):
         """
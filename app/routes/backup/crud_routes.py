@@ -94,9 +94,11 @@ def add_analogies():
     topic_model = Topic(graph)
 
     try:
-        for related_topic in analogies:
-            topic_model.add_direct_analogy(topic_id, related_topic, system_id)
-        
+        topic_model.add_direct_analogies(topic_id, [
+            {"analogous_topic_id": related_topic, "system_id": system_id}
+            for related_topic in analogies
+        ])
+
         return jsonify({"message": f"Analogies added to topic '{topic_id}'."}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -117,16 +119,15 @@ def process_analogies():
         graph = current_app.config['graph']
         topic_model = Topic(graph)
 
-        for analogy_system in analogy_list:
-            system_id = analogy_system.get('system_id')
-            topics = analogy_system.get('topics', [])
+        # Flatten every (system, related topic) pair so the whole submission
+        # is written by one statement in one transaction
+        analogies = [
+            {"analogous_topic_id": related_topic.get('id'), "system_id": analogy_system.get('system_id')}
+            for analogy_system in analogy_list
+            for related_topic in analogy_system.get('topics', [])
+        ]
+        topic_model.add_direct_analogies(topic_id, analogies)
 
-            for related_topic in topics:
-                related_topic_id = related_topic.get('id')
-                
-                # Add direct analogy relationships
-                topic_model.add_direct_analogy(topic_id, related_topic_id, system_id)
-        
         return jsonify({"message": "Analogies processed successfully!"}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,13 +1,23 @@
 # app/routes/chart.py
-from flask import Blueprint, jsonify, request, current_app, render_template
+import os
+
+from flask import Blueprint, Response, jsonify, request, current_app, render_template
 from app.routes.utils.chart_calculator import ChartCalculator
-from app.routes.ephemeris import get_ephemeris_data
+from app.services import ephemeris_service
+from app.utils.admission import Overloaded
+from app.utils.content_cache import ContentCache
+from app.utils.timing import span
 
 chart_routes = Blueprint('chart_routes', __name__)
 calculator = ChartCalculator()
 
-chart_routes = Blueprint('chart_routes', __name__)
-calculator = ChartCalculator()
+# Rendered SVGs keyed by the digest of their quantized inputs. Set CHART_SVG_CACHE_DIR
+# to share renders between worker processes through the filesystem.
+chart_svg_cache = ContentCache(
+    max_entries=int(os.getenv("CHART_SVG_CACHE_SIZE", "256")),
+    disk_dir=os.getenv("CHART_SVG_CACHE_DIR") or None,
+    suffix=".svg",
+)
 
 @chart_routes.route('/api/chart-svg', methods=['POST'])
 def generate_chart_svg():
@@ -20,23 +30,35 @@ def generate_chart_svg():
         if data and 'ephemeris' in data:
             ephemeris_data = data
         else:
-            # Call ephemeris endpoint with the data from the request
-            lat = data.get('latitude')
-            lon = data.get('longitude')
-            if lat is None or lon is None:
-                return jsonify({"error": "Missing latitude or longitude"}), 400
+            # Otherwise compute it for the given coordinates
+            data = data or {}
+            try:
+                dataset = ephemeris_service.compute(data.get('latitude'), data.get('longitude'))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            ephemeris_data = {"ephemeris": dataset}
 
-            # Create a new request context with the required data
-            with current_app.test_request_context('/api/ephemeris', 
-                method='POST',
-                json={'latitude': lat, 'longitude': lon}):
-                    ephemeris_data = get_ephemeris_data()[0]  # Get just the response data
-            
-        # Generate SVG using the chart calculator
-        svg = calculator.generate_chart_svg(ephemeris_data)
-        
-        return svg, 200, {'Content-Type': 'image/svg+xml'}
+        # ?defs=0 leaves out the planet symbol <defs> (the page already has them)
+        include_defs = request.args.get('defs', '1') != '0'
+
+        # Charts whose inputs round to the same values share one render and ETag
+        digest, canonical_data = calculator.canonical_chart_inputs(ephemeris_data, include_defs)
+        if request.if_none_match.contains(digest):
+            response = Response(status=304)
+        else:
+            svg = chart_svg_cache.get(digest)
+            if svg is None:
+                with span("chart.render"):
+                    svg = calculator.generate_chart_svg_bytes(canonical_data, include_defs)
+                chart_svg_cache.put(digest, svg)
+            response = Response(svg, mimetype='image/svg+xml')
+
+        response.set_etag(digest)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
+    except Overloaded:
+        raise
     except Exception as e:
         current_app.logger.error(f"Error generating chart: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -1,5 +1,7 @@
 from neo4j import GraphDatabase
+from app.utils.neo4j_instrumentation import ForkSafeDriver, InstrumentedDriver
 from skyfield.api import load
+from timezonefinder import TimezoneFinder
 from dotenv import load_dotenv
 import os
 
@@ -12,13 +14,24 @@ NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 if not NEO4J_URI or not NEO4J_USER or not NEO4J_PASSWORD:
     raise ValueError("Neo4j connection details are missing in the environment variables.")
 
-neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# Every session opened from this driver records per-query timings (see neo4j_instrumentation).
+# The underlying driver is created lazily in each process, so forked workers never share a pool.
+neo4j_driver = InstrumentedDriver(ForkSafeDriver(
+    lambda: GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), connection_timeout=120)
+))
+
+# Full-text index over entity names, created by ontologies/__ontology_upload.py
+FULLTEXT_INDEX_NAME = "entityNames"
 
 
 # Load ephemerides once
 ephemeris = load('de440s.bsp')
 ts = load.timescale()
 
+# Timezone polygons, loaded once into memory: lookups are then thread-safe and the
+# arrays are shared copy-on-write by preforked workers
+timezone_finder = TimezoneFinder(in_memory=True)
+
 # Planetary Order
 PLANETARY_ORDER = ['Sun', 'Venus', 'Mercury', 'Moon', 'Saturn', 'Jupiter', 'Mars']
 EXTENDED_PLANETARY_ORDER = PLANETARY_ORDER + ['Uranus', 'Neptune', 'Pluto']
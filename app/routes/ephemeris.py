@@ -1,7 +1,12 @@
 # app/routes/ephemeris.py
 
 from flask import Blueprint, jsonify, request
-from app.routes.utils.ephemeris_calculator import EphemerisCalculator
+from app.services import ephemeris_service
+from app.utils.admission import Overloaded
+from app.utils.json_provider import RawJSON
+from app.utils.logging_config import get_logger
+
+logger = get_logger("routes")
 
 ephemeris_bp = Blueprint('ephemeris', __name__)
 
@@ -9,21 +14,19 @@ ephemeris_bp = Blueprint('ephemeris', __name__)
 def get_ephemeris_data():
     """Base endpoint that provides pure ephemeris calculations."""
     try:
-        data = request.json
-        latitude = data.get('latitude')
-        longitude = data.get('longitude')
-
-        if latitude is None or longitude is None:
-            return jsonify({"error": "Missing latitude or longitude"}), 400
-
-        calculator = EphemerisCalculator(latitude=latitude, longitude=longitude)
-        dataset = calculator.generate_ephemeris_dataset()
+        data = request.json or {}
+        # The cached snapshot is spliced in as-is, without decoding it
+        snapshot = ephemeris_service.compute_snapshot(data.get('latitude'), data.get('longitude'))
 
         return jsonify({
-            "ephemeris": dataset,
+            "ephemeris": RawJSON(snapshot),
             "message": "Ephemeris data generated successfully"
         })
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Overloaded:
+        raise
     except Exception as e:
-        print("DEBUG: Error occurred in ephemeris calculation:", str(e))
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        logger.exception("Error occurred in ephemeris calculation: %s", e)
+        return jsonify({"error": str(e)}), 500
@@ -1,59 +1,175 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
 from flask import Blueprint, jsonify, request
 
-from app.routes.utils.ephemeris_calculator import EphemerisCalculator
+from app.routes.utils import hour_rulers
 from app.routes.utils.neo4j_queries import Neo4jQueries
 from app.routes.utils.heatmap_calculator import HeatmapCalculator
+from app.services import ephemeris_service
+from app.utils.admission import Overloaded
+from app.utils.json_provider import RawJSON, dumps_bytes
+from app.utils.logging_config import get_logger
+from app.utils.metrics import Counter
+from app.utils.ontology_index import get_ontology_index
+from app.utils.single_flight import SingleFlight
+from app.utils.timing import span
 
-from app.routes.ephemeris import get_ephemeris_data
+logger = get_logger("routes")
 
 geolocate_bp = Blueprint('geolocate', __name__)
 
-@geolocate_bp.route('/api/geolocation_ephemeris', methods=['POST'])
-def handle_geolocation_and_visualization():
-    """Handles the complete view with ephemeris, Neo4j data, and visualization."""
+# Concurrent requests from one snapshot cell and time bucket share a single build
+geolocation_flight = SingleFlight("geolocation")
+
+# The Neo4j hour data is fetched beside the heatmap and left out if it takes
+# longer than this (seconds) or fails, so the view never waits on the graph
+GRAPH_ENRICHMENT_TIMEOUT = float(os.getenv("GRAPH_ENRICHMENT_TIMEOUT", "2"))
+GRAPH_ENRICHMENT_WORKERS = int(os.getenv("GRAPH_ENRICHMENT_WORKERS", "4"))
+
+# After a fetch times out or fails, skip enrichment for this long (seconds)
+# rather than making every request wait for the timeout again
+GRAPH_ENRICHMENT_BACKOFF = float(os.getenv("GRAPH_ENRICHMENT_BACKOFF", "30"))
+graph_enrichment_pool = ThreadPoolExecutor(max_workers=GRAPH_ENRICHMENT_WORKERS, thread_name_prefix="graph-enrichment")
+
+# One slot per pool thread, so fetches never queue: while Neo4j hangs and every
+# thread is stuck, requests fall back at once instead of piling up behind them
+_enrichment_slots = threading.BoundedSemaphore(GRAPH_ENRICHMENT_WORKERS)
+_enrichment_suspended_until = 0.0
+
+ENRICHMENT_SKIPPED = Counter("graph_enrichment_skipped_total", "Geolocation views served without Neo4j hour data.",
+                             label="reason")
+
+
+def start_enrichment(hour_name, dataset):
+    """
+    Fetch the Neo4j hour data on the enrichment pool.
+
+    Returns:
+        tuple: (Future resolving to fetch_hour_data's result, None) or
+            (None, reason) when the fetch is skipped: "backoff" after a recent
+            failure, "busy" when every enrichment thread is taken.
+    """
+    if time.monotonic() < _enrichment_suspended_until:
+        return None, "backoff"
+    if not _enrichment_slots.acquire(blocking=False):
+        return None, "busy"
     try:
-        data = request.json
-        
-        # Get ephemeris data directly from the function
-        ephemeris_response = get_ephemeris_data()
-        if ephemeris_response.status_code != 200:
-            return ephemeris_response
-            
-        dataset = ephemeris_response.json['ephemeris']
-        
-        # Calculate Neo4j data
-        calculator = EphemerisCalculator(
-            latitude=data['latitude'], 
-            longitude=data['longitude']
-        )
-        hour_index = calculator.calculate_planetary_hour()
-        neo4j = Neo4jQueries(calculator)
-        hour_name = neo4j.format_hour_name(hour_index)
-        neo4j_data = neo4j.fetch_hour_data(hour_name, dataset)
+        enrichment = graph_enrichment_pool.submit(Neo4jQueries().fetch_hour_data, hour_name, dataset)
+    except BaseException:
+        _enrichment_slots.release()
+        raise
+    enrichment.add_done_callback(lambda _: _enrichment_slots.release())
+    return enrichment, None
+
+
+def suspend_enrichment():
+    global _enrichment_suspended_until
+    _enrichment_suspended_until = time.monotonic() + GRAPH_ENRICHMENT_BACKOFF
+
+
+def ontology_hour_data(hour_name, dataset):
+    """
+    The "hour" part of fetch_hour_data taken from the ontology files, used when
+    Neo4j doesn't answer in time. Connections are left empty.
+    """
+    entity = get_ontology_index().get(f"monsieur:MagicHourEntity/{hour_name}")
+    hour = None
+    if entity is not None:
+        hour = {
+            "label": entity["name"] or entity["label"],
+            "description": entity["description"],
+            "uri": entity["uri"],
+            **dataset,
+        }
+    return {"hour": hour, "connections": [], "source": "ontology"}
 
-        if neo4j_data.get("hour_ruler"):
-            dataset["additional_info"]["hour_ruler"] = neo4j_data["hour_ruler"]
 
-        
-        # Calculate visualization data
+def build_view(latitude, longitude, bucket=None):
+    """
+    Build the ephemeris, Neo4j and heatmap parts of the view for a location.
+
+    Args:
+        latitude (float): Observer latitude.
+        longitude (float): Observer longitude.
+        bucket (int): Snapshot time bucket the view is coalesced under, so the
+                      data matches its single-flight key (default the current one).
+
+    Returns:
+        tuple: (ephemeris, neo4j_data, heatmap_data) as encoded RawJSON fragments,
+            which are immutable and safe to hand to every coalesced request.
+    """
+    # Step 1: The shared "now" snapshot for the location's cell; its planetary
+    # hour comes from the sunrise-to-sunrise timetable, not the graph
+    dataset = ephemeris_service.compute(latitude, longitude, bucket=bucket)
+    info = dataset["additional_info"]
+    hour_name = hour_rulers.hour_name(info["planetary_day"], info["current_planetary_hour"])
+
+    # Step 2: Start the Neo4j enrichment in the background
+    enrichment, skipped = start_enrichment(hour_name, dataset)
+
+    # Step 3: Visualization data
+    with span("heatmap"):
         heatmap_data = HeatmapCalculator.calculate_heatmap_properties(
             ephemeris_data=dataset,
-            hour_ruler=dataset["additional_info"].get("hour_ruler"),
-            day_ruling_planet=dataset.get('additional_info', {}).get('day_ruling_planet'),
+            hour_ruler=info.get("hour_ruler"),
+            day_ruling_planet=info.get('day_ruling_planet'),
         )
-        
+
+    # Step 4: Collect the enrichment, or fall back to the ontology files without it
+    with span("neo4j"):
+        neo4j_data = None
+        if enrichment is None:
+            ENRICHMENT_SKIPPED.inc(skipped)
+        else:
+            try:
+                neo4j_data = enrichment.result(timeout=GRAPH_ENRICHMENT_TIMEOUT)
+            except FutureTimeoutError:
+                enrichment.cancel()
+                suspend_enrichment()
+                ENRICHMENT_SKIPPED.inc("timeout")
+                logger.warning("Neo4j hour data for %s not ready after %.1f s, skipping enrichment for %.0f s",
+                               hour_name, GRAPH_ENRICHMENT_TIMEOUT, GRAPH_ENRICHMENT_BACKOFF)
+            except Exception as e:
+                suspend_enrichment()
+                ENRICHMENT_SKIPPED.inc("error")
+                logger.warning("Neo4j hour data for %s unavailable, skipping enrichment for %.0f s: %s",
+                               hour_name, GRAPH_ENRICHMENT_BACKOFF, e)
+        if neo4j_data is None:
+            neo4j_data = ontology_hour_data(hour_name, dataset)
+
+    with span("serialize"):
+        return tuple(RawJSON(dumps_bytes(part)) for part in (dataset, neo4j_data, heatmap_data))
+
+
+@geolocate_bp.route('/api/geolocation_ephemeris', methods=['POST'])
+def handle_geolocation_and_visualization():
+    """Handles the complete view with ephemeris, Neo4j data, and visualization."""
+    try:
+        data = request.json or {}
+        latitude, longitude = data.get('latitude'), data.get('longitude')
+
+        try:
+            key = ephemeris_service.snapshot_key(latitude, longitude)
+            ephemeris, neo4j_data, heatmap_data = geolocation_flight.do(
+                key, lambda: build_view(latitude, longitude, key[1])
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         return jsonify({
             "latitude": data['latitude'],
             "longitude": data['longitude'],
-            "ephemeris": dataset,
+            "ephemeris": ephemeris,
             "neo4j_data": neo4j_data,
             "heatmap_data": heatmap_data,
             "message": "View data generated successfully"
         })
 
+    except Overloaded:
+        raise
     except Exception as e:
-        print("DEBUG: Error occurred in visualization generation:", str(e))
+        logger.exception("Error occurred in visualization generation: %s", e)
         return jsonify({"error": str(e)}), 500
-
-
@@ -1,8 +1,48 @@
-from flask import Blueprint, jsonify, request
+import os
+import threading
+import time
+
+from flask import Blueprint, current_app, jsonify, request
 from app.routes.utils.neo4j_queries import Neo4jQueries
+from app.utils.content_cache import ContentCache
+from app.utils.json_provider import RawJSON
 
 filter_viz_bp = Blueprint('filter_viz', __name__)
 
+# Encoded (nodes, edges) fragments per hour, keyed by graph version and hour name.
+# The graph only changes when a new ontology is uploaded, so responses splice the
+# cached bytes instead of re-querying and re-encoding.
+hour_graph_cache = ContentCache(max_entries=int(os.getenv("HOUR_GRAPH_CACHE_SIZE", "64")))
+
+# How often (seconds) the upload stamp is read from Neo4j; an upload shows up
+# in cached responses at most this much later
+GRAPH_VERSION_CHECK_INTERVAL = float(os.getenv("GRAPH_VERSION_CHECK_INTERVAL", "30"))
+
+_graph_version = None
+_graph_version_checked_at = None
+_graph_version_lock = threading.Lock()
+
+
+def get_graph_version():
+    """
+    The upload stamp of the graph in Neo4j (see ontologies/__ontology_upload.py),
+    re-read at most every GRAPH_VERSION_CHECK_INTERVAL seconds.
+
+    Returns:
+        str: The version, or None for a graph uploaded without a stamp.
+    """
+    global _graph_version, _graph_version_checked_at
+
+    now = time.monotonic()
+    with _graph_version_lock:
+        if _graph_version_checked_at is not None and now - _graph_version_checked_at < GRAPH_VERSION_CHECK_INTERVAL:
+            return _graph_version
+    version = Neo4jQueries().fetch_graph_version()
+    with _graph_version_lock:
+        _graph_version, _graph_version_checked_at = version, now
+    return version
+
+
 @filter_viz_bp.route('/api/filter_by_hour', methods=['POST'])
 def filter_by_hour():
     data = request.json
@@ -12,75 +52,95 @@ def filter_by_hour():
         return jsonify({"error": "Missing hour_name parameter"}), 400
 
     try:
-        neo4j = Neo4jQueries()
-        results = neo4j.fetch_hour_graph(hour_name)
-
-        filtered_nodes = []
-        filtered_edges = []
-        added_node_uris = set()
-
-        for record in results:
-            if record.get("connectedNode"):
-                node_id = record["connectedNode"].get("uri")
-                if node_id and node_id not in added_node_uris:
-                    added_node_uris.add(node_id)
-                    node_label = record["connectedNode"].get("hasName") or record["connectedNode"].get("label") or "Unnamed Node"
-                    node_description = record["connectedNode"].get("description", "")
-                    node_type = record.get("connectedNodeLabels", [])
+        # Without an upload stamp nothing tells us when the graph changes, so nothing is cached
+        version = get_graph_version()
+        cache_key = f"{version}:{hour_name}"
+        fragments = hour_graph_cache.get(cache_key) if version else None
+        if fragments is None:
+            nodes, edges = build_hour_graph(hour_name)
+            fragments = (RawJSON(current_app.json.dumps_bytes(nodes)), RawJSON(current_app.json.dumps_bytes(edges)))
+            if nodes and version:
+                hour_graph_cache.put(cache_key, fragments)
 
-                    filtered_nodes.append({
-                        "id": node_id,
-                        "label": node_label,
-                        "description": node_description,
-                        "type": node_type,
-                    })
+        return jsonify({
+            "nodes": fragments[0],
+            "edges": fragments[1],
+            "message": "Filtered data fetched successfully."
+        })
 
-                filtered_edges.append({
-                    "from": record["hour"]["uri"],
-                    "to": node_id,
-                    "label": record["hourRelationshipType"],
-                    "properties": record.get("hourRelationshipProperties", {})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def build_hour_graph(hour_name):
+    """
+    Fetch the graph around a planetary hour.
+
+    Returns:
+        tuple: (nodes, edges) lists in the shape the vis.js front end expects.
+    """
+    neo4j = Neo4jQueries()
+    results = neo4j.fetch_hour_graph(hour_name)
+
+    filtered_nodes = []
+    filtered_edges = []
+    added_node_uris = set()
+
+    for record in results:
+        if record.get("connectedNode"):
+            node_id = record["connectedNode"].get("uri")
+            if node_id and node_id not in added_node_uris:
+                added_node_uris.add(node_id)
+                node_label = record["connectedNode"].get("hasName") or record["connectedNode"].get("label") or "Unnamed Node"
+                node_description = record["connectedNode"].get("description", "")
+                node_type = record.get("connectedNodeLabels", [])
+
+                filtered_nodes.append({
+                    "id": node_id,
+                    "label": node_label,
+                    "description": node_description,
+                    "type": node_type,
                 })
 
-                if record.get("planet"):
-                    planet_id = record["planet"].get("uri")
-                    if planet_id and planet_id not in added_node_uris:
-                        added_node_uris.add(planet_id)
-                        planet_label = record["planet"].get("hasName") or record["planet"].get("label") or "Unnamed Planet"
-                        planet_description = record["planet"].get("description", "")
-                        planet_type = record.get("planetLabels", [])
-
-                        filtered_nodes.append({
-                            "id": planet_id,
-                            "label": planet_label,
-                            "description": planet_description,
-                            "type": planet_type
-                        })
-
-                    filtered_edges.append({
-                        "from": node_id,
-                        "to": planet_id,
-                        "label": record["planetRelationshipType"],
-                        "properties": record.get("planetRelationshipProperties", {})
+            filtered_edges.append({
+                "from": record["hour"]["uri"],
+                "to": node_id,
+                "label": record["hourRelationshipType"],
+                "properties": record.get("hourRelationshipProperties", {})
+            })
+
+            if record.get("planet"):
+                planet_id = record["planet"].get("uri")
+                if planet_id and planet_id not in added_node_uris:
+                    added_node_uris.add(planet_id)
+                    planet_label = record["planet"].get("hasName") or record["planet"].get("label") or "Unnamed Planet"
+                    planet_description = record["planet"].get("description", "")
+                    planet_type = record.get("planetLabels", [])
+
+                    filtered_nodes.append({
+                        "id": planet_id,
+                        "label": planet_label,
+                        "description": planet_description,
+                        "type": planet_type
                     })
 
-        hour_node = next((record["hour"] for record in results if record["hour"]), None)
-        if hour_node and hour_node["uri"] not in added_node_uris:
-            filtered_nodes.append({
-                "id": hour_node["uri"],
-                "label": hour_node.get("hasName") or "Hour",
-                "description": hour_node.get("description", ""),
-                "type": ["Hour"]
-            })
+                filtered_edges.append({
+                    "from": node_id,
+                    "to": planet_id,
+                    "label": record["planetRelationshipType"],
+                    "properties": record.get("planetRelationshipProperties", {})
+                })
 
-        return jsonify({
-            "nodes": filtered_nodes,
-            "edges": filtered_edges,
-            "message": "Filtered data fetched successfully."
+    hour_node = next((record["hour"] for record in results if record["hour"]), None)
+    if hour_node and hour_node["uri"] not in added_node_uris:
+        filtered_nodes.append({
+            "id": hour_node["uri"],
+            "label": hour_node.get("hasName") or "Hour",
+            "description": hour_node.get("description", ""),
+            "type": ["Hour"]
         })
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return filtered_nodes, filtered_edges
 
 
 
@@ -0,0 +1,146 @@
+from datetime import datetime, timezone as dt_timezone
+
+from flask import Blueprint, Response, jsonify, request
+
+from app.routes.utils.timeline_calculator import TimelineCalculator
+from app.routes.utils.heatmap_field import HeatmapFieldRenderer
+from app.routes.utils.heatmap_field import DEFAULT_FIELD_WIDTH, DEFAULT_FIELD_HEIGHT, MAX_FIELD_WIDTH, MAX_FIELD_HEIGHT
+from app.utils.admission import ConcurrencyLimiter, Overloaded, limited
+from app.utils.logging_config import get_logger
+
+heatmap_bp = Blueprint('heatmap', __name__)
+
+# A week-long timeline costs hundreds of ephemeris evaluations; run few at once
+timeline_limiter = ConcurrencyLimiter("heatmap_timeline", max_active=2, max_waiting=8)
+logger = get_logger("routes")
+
+
+def parse_utc(value):
+    """Parse an optional ISO 8601 time; naive times are taken as UTC."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed.astimezone(dt_timezone.utc)
+
+
+@heatmap_bp.route('/api/heatmap/timeline', methods=['GET'])
+@limited(timeline_limiter)
+def heatmap_timeline():
+    """
+    Per-planet heatmap intensity, radius and opacity for N frames over a day or week.
+
+    Query parameters:
+        lat, lon (float): Observer location.
+        span (day|week): Time covered by the frames (default day).
+        frames (int): Number of frames (default 96 for a day, 168 for a week).
+        start (str): ISO 8601 start time, UTC if no offset is given (default now).
+        format (json|f32): Columnar JSON (default) or raw little-endian Float32.
+
+    The f32 body is laid out as [field][planet][frame]; field, planet and frame
+    metadata are sent in the X-Timeline-* headers.
+    """
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lon', type=float)
+    if latitude is None or longitude is None:
+        return jsonify({"error": "Missing lat or lon"}), 400
+
+    try:
+        start_utc = parse_utc(request.args.get('start'))
+    except ValueError:
+        return jsonify({"error": "Invalid start time, expected ISO 8601"}), 400
+
+    try:
+        calculator = TimelineCalculator(
+            latitude=latitude,
+            longitude=longitude,
+            start_utc=start_utc,
+            span=request.args.get('span', 'day'),
+            frames=request.args.get('frames', type=int),
+        )
+        timeline = calculator.calculate_timeline()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("Error occurred in heatmap timeline generation: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+    values = timeline["values"]
+    if request.args.get('format') == 'f32':
+        return Response(values.tobytes(), mimetype='application/octet-stream', headers={
+            "X-Timeline-Fields": ",".join(timeline["fields"]),
+            "X-Timeline-Planets": ",".join(timeline["planets"]),
+            "X-Timeline-Frames": str(values.shape[2]),
+            "X-Timeline-Start": str(timeline["times"][0]),
+            "X-Timeline-Step-Ms": str(timeline["step_ms"]),
+        })
+
+    return jsonify({
+        "latitude": latitude,
+        "longitude": longitude,
+        "start": timeline["start"].isoformat(),
+        "step_ms": timeline["step_ms"],
+        "times": timeline["times"],
+        "planets": timeline["planets"],
+        "hours": timeline["hours"],
+        # One list per planet (in "planets" order) for each field
+        **{
+            field: values[i].astype(float).round(3).tolist()
+            for i, field in enumerate(timeline["fields"])
+        },
+    })
+
+
+@heatmap_bp.route('/api/heatmap/field', methods=['GET'])
+def heatmap_field():
+    """
+    Server-rendered intensity field over an alt/az grid, quantized to uint8.
+
+    Query parameters:
+        lat, lon (float): Observer location (snapped to a 0.1 degree cell).
+        at (str): ISO 8601 time, truncated to the minute (default now).
+        width, height (int): Grid size (default 360x180, max 1440x720).
+        tile (str): Optional "column,row" of a 256px tile.
+        format (raw|png): Raw row-major bytes (default) or grayscale PNG.
+
+    Fields are cached per (location cell, minute, grid size).
+    """
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lon', type=float)
+    if latitude is None or longitude is None:
+        return jsonify({"error": "Missing lat or lon"}), 400
+
+    width = min(max(request.args.get('width', DEFAULT_FIELD_WIDTH, type=int), 1), MAX_FIELD_WIDTH)
+    height = min(max(request.args.get('height', DEFAULT_FIELD_HEIGHT, type=int), 1), MAX_FIELD_HEIGHT)
+
+    try:
+        at = parse_utc(request.args.get('at'))
+    except ValueError:
+        return jsonify({"error": "Invalid time, expected ISO 8601"}), 400
+
+    try:
+        key, field = HeatmapFieldRenderer.get_field(latitude, longitude, at=at, width=width, height=height)
+        tile = request.args.get('tile')
+        if tile:
+            column, row = (int(part) for part in tile.split(','))
+            field = HeatmapFieldRenderer.tile(field, column, row)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.exception("Error occurred in heatmap field rendering: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+    (cell_lat, cell_lon), minute, _, _ = key
+    headers = {
+        "X-Field-Width": str(field.shape[1]),
+        "X-Field-Height": str(field.shape[0]),
+        "X-Field-Cell": f"{cell_lat},{cell_lon}",
+        "X-Field-Minute": minute,
+        "Cache-Control": "public, max-age=60",
+    }
+    if request.args.get('format') == 'png':
+        return Response(HeatmapFieldRenderer.encode_png(field), mimetype='image/png', headers=headers)
+    return Response(field.tobytes(), mimetype='application/octet-stream', headers=headers)
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, current_app, jsonify, request, Response
 from app.routes.constants import neo4j_driver
-import json
+from app.utils.neo4j_instrumentation import query_stats, render_query_metrics
+from app.utils.timing import STAGE_TIME, get_profile, is_admin_request
 
 
 
@@ -16,7 +17,7 @@ def get_graph_data():
     RETURN n, r, m
     """
     with driver.session() as session:
-        results = session.run(query)
+        results = session.run(query, query_name="graph_data")
         nodes = {}
         edges = []
 
@@ -31,7 +32,6 @@ def get_graph_data():
                     nodes[node.id] = {
                         "id": node.id,
                         "label": label,
-                        "title": json.dumps(dict(node.items()), indent=2),
                         "properties": dict(node.items()),
                     }
 
@@ -39,12 +39,44 @@ def get_graph_data():
                 "from": node1.id,
                 "to": node2.id,
                 "label": relationship.type,
-                "title": json.dumps(dict(relationship.items()), indent=2),
+                "properties": dict(relationship.items()),
             })
 
     return jsonify({"nodes": list(nodes.values()), "edges": edges})
 
 
+# Neo4j query statistics: per-query histograms and the recent slow queries
+@main_bp.route('/api/admin/query_stats')
+def get_query_stats():
+    # Slow query entries carry Cypher text with literal values
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    if request.args.get('format') == 'prometheus':
+        return Response(render_query_metrics(), mimetype='text/plain; version=0.0.4')
+    return jsonify(query_stats())
+
+
+# Per-stage timing histograms collected by app.utils.timing spans
+@main_bp.route('/api/admin/stage_stats')
+def get_stage_stats():
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    if request.args.get('format') == 'prometheus':
+        return Response(STAGE_TIME.render(), mimetype='text/plain; version=0.0.4')
+    return jsonify(STAGE_TIME.snapshot())
+
+
+# cProfile summary of a request made with ?profile=1 (see the X-Profile-Id response header)
+@main_bp.route('/api/admin/profiles/<profile_id>')
+def get_request_profile(profile_id):
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+    summary = get_profile(profile_id)
+    if summary is None:
+        return jsonify({"error": "Unknown or expired profile"}), 404
+    return Response(summary, mimetype='text/plain')
+
+
 # Landing page
 @main_bp.route('/')
 def landing_page():
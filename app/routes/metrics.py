@@ -0,0 +1,78 @@
+import os
+
+from flask import Blueprint, Response
+
+from app.routes.chart import chart_svg_cache
+from app.routes.constants import neo4j_driver
+from app.routes.graph import hour_graph_cache
+from app.routes.utils.ephemeris_calculator import sun_times_utc, timezone_name_at
+from app.services import ephemeris_service, sky_stream
+from app.utils.admission import LIMITERS
+from app.utils.single_flight import FLIGHTS
+from app.utils.metrics import Gauge, render_all
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def cache_counts():
+    """(hits, misses) per cache; shared/disk tier hits count as hits."""
+    sun_times, timezone = sun_times_utc.cache_info(), timezone_name_at.cache_info()
+    svg, hour_graph = chart_svg_cache.stats(), hour_graph_cache.stats()
+    snapshot = ephemeris_service.snapshot_cache.stats()
+    return {
+        "sun_times": (sun_times.hits, sun_times.misses),
+        "timezone": (timezone.hits, timezone.misses),
+        "chart_svg": (svg["hits"] + svg["disk_hits"], svg["misses"]),
+        "hour_graph": (hour_graph["hits"] + hour_graph["disk_hits"], hour_graph["misses"]),
+        "ephemeris_snapshot": (snapshot["hits"] + snapshot["shared_hits"], snapshot["misses"]),
+    }
+
+
+def cache_hit_ratios():
+    return {
+        cache: round(hits / (hits + misses), 4) if hits + misses else None
+        for cache, (hits, misses) in cache_counts().items()
+    }
+
+
+def resident_memory_bytes():
+    """Current RSS from /proc (Linux); None where it isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def neo4j_pool_connections():
+    stats = neo4j_driver.pool_stats()
+    return stats or {}
+
+
+# Values read at scrape time; the request path records nothing for these
+Gauge("cache_hits_total", "Cache hits.", lambda: {cache: counts[0] for cache, counts in cache_counts().items()},
+      label="cache", kind="counter")
+Gauge("cache_misses_total", "Cache misses.", lambda: {cache: counts[1] for cache, counts in cache_counts().items()},
+      label="cache", kind="counter")
+Gauge("cache_hit_ratio", "Hits over lookups since the process started.", cache_hit_ratios, label="cache")
+Gauge("neo4j_pool_connections", "Neo4j connections in this process's pool.", neo4j_pool_connections, label="state")
+Gauge("process_resident_memory_bytes", "Resident set size of this worker.", resident_memory_bytes)
+Gauge("ephemeris_in_flight", "Requests computing or waiting for an ephemeris snapshot.",
+      lambda: ephemeris_service.snapshot_cache.stats()["in_flight"])
+Gauge("admission_active", "Requests holding a concurrency limiter slot.",
+      lambda: {limiter.name: limiter.stats()["active"] for limiter in LIMITERS}, label="limiter")
+Gauge("admission_waiting", "Requests queued for a concurrency limiter slot.",
+      lambda: {limiter.name: limiter.stats()["waiting"] for limiter in LIMITERS}, label="limiter")
+Gauge("single_flight_shared_total", "Requests served by another request's in-flight computation.",
+      lambda: {flight.name: flight.shared for flight in FLIGHTS}, label="flight", kind="counter")
+Gauge("sky_stream_subscribers", "Open sky streams per location cell.", sky_stream.producer_stats, label="cell")
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """
+    Prometheus text exposition of every registered metric: request latency per
+    route, stage timings, Neo4j query histograms and pool, cache hits and
+    process memory. Values are per worker process.
+    """
+    return Response(render_all(), mimetype='text/plain; version=0.0.4')
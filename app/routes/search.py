@@ -0,0 +1,84 @@
+import re
+
+from flask import Blueprint, jsonify, request
+
+from app.routes.constants import neo4j_driver, FULLTEXT_INDEX_NAME
+from app.utils.logging_config import get_logger
+from app.utils.ontology_index import get_ontology_index
+
+search_bp = Blueprint('search', __name__)
+logger = get_logger("routes")
+
+MAX_SUGGESTIONS = 20
+
+# Characters with a meaning in Lucene query syntax
+LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+
+def fulltext_suggestions(query, limit):
+    """
+    Query the Neo4j full-text index created at upload time.
+
+    Used when the in-process trie has fewer than `limit` prefix matches: the
+    index also finds names that contain the query or are a close misspelling.
+    """
+    terms = [LUCENE_SPECIAL.sub(r'\\\1', term) for term in query.split()]
+    if not terms:
+        return []
+    lucene_query = " AND ".join(f"({term}* OR {term}~)" for term in terms)
+
+    with neo4j_driver.session() as session:
+        results = session.run(
+            """
+            CALL db.index.fulltext.queryNodes($index_name, $query) YIELD node, score
+            RETURN node.uri AS uri,
+                   coalesce(node.hasName, node.label) AS name,
+                   node.label AS label,
+                   labels(node) AS labels
+            LIMIT $limit
+            """,
+            {"index_name": FULLTEXT_INDEX_NAME, "query": lucene_query, "limit": limit},
+            query_name="autocomplete_fulltext",
+        )
+        return [
+            {"uri": record["uri"], "name": record["name"], "label": record["label"],
+             "type": next((label for label in record["labels"] if label != "Searchable"), None)}
+            for record in results
+        ]
+
+
+@search_bp.route('/api/autocomplete', methods=['GET'])
+def autocomplete():
+    """
+    Suggest entities whose name, label or synonym starts with `q`.
+
+    Query parameters:
+        q (str): The typed prefix.
+        limit (int): Maximum suggestions (default 10, max 20).
+        fulltext (0|1): Fall back to the Neo4j full-text index when the prefix
+                        trie has fewer than `limit` matches (default 0).
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Query parameter is required!"}), 400
+
+    limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_SUGGESTIONS)
+    index = get_ontology_index()
+    suggestions = index.suggest(query, limit)
+
+    if request.args.get('fulltext') == '1' and len(suggestions) < limit and len(query) >= 3:
+        try:
+            seen = {suggestion["uri"] for suggestion in suggestions}
+            for suggestion in fulltext_suggestions(query, limit):
+                if suggestion["uri"] not in seen and len(suggestions) < limit:
+                    seen.add(suggestion["uri"])
+                    suggestions.append(suggestion)
+        except Exception as e:
+            # The trie answer stands on its own if the database is unavailable
+            logger.warning("Full-text search failed: %s", e)
+
+    return jsonify({
+        "query": query,
+        "suggestions": suggestions,
+        "ontology_version": index.version,
+    })
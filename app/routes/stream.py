@@ -0,0 +1,79 @@
+import queue
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from app.services import sky_stream
+from app.services.ephemeris_service import parse_coordinates
+from app.utils.admission import ConcurrencyLimiter
+
+stream_bp = Blueprint('stream', __name__)
+
+# Comment line sent when nothing happened for this long, so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
+
+# Client reconnection delay (ms) advertised to EventSource
+RETRY_MS = 5000
+
+# Every open stream holds a server thread, so a worker serves at most
+# SKY_STREAM_MAX_ACTIVE of them (default 16) and answers 429 beyond that;
+# gunicorn.conf.py adds that many threads on top of WEB_THREADS
+stream_limiter = ConcurrencyLimiter("sky_stream", max_active=16, max_waiting=0)
+
+
+@stream_bp.route('/api/stream/sky', methods=['GET'])
+def stream_sky():
+    """
+    Server-Sent Events stream of the live sky for a location.
+
+    Query parameters:
+        lat, lon (float): Observer location; clients in the same 0.1 degree cell
+                          share one producer.
+
+    Events:
+        snapshot: Full state on connect (and after a client falls behind):
+                  "planets", the current "hour" and the "upcoming" events.
+        positions: Planets whose rounded position changed since the last tick.
+        hour, ingress, aspect: Sent at the instant the hour changes, a planet
+                  enters a sign or an aspect perfects.
+        error: The producer failed (for example no sunrise at the location);
+               the stream ends after it.
+
+    Answers 429 when this worker already serves its maximum number of streams.
+    """
+    try:
+        latitude, longitude = parse_coordinates(request.args.get('lat'), request.args.get('lon'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stream_limiter.acquire()
+    try:
+        producer, subscriber = sky_stream.subscribe(latitude, longitude)
+    except Exception:
+        stream_limiter.release()
+        raise
+    dumps = current_app.json.dumps
+
+    def events():
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            try:
+                message = subscriber.get(timeout=KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            name, payload = message
+            yield f"event: {name}\ndata: {dumps(payload)}\n\n"
+
+    def close():
+        sky_stream.unsubscribe(producer, subscriber)
+        stream_limiter.release()
+
+    response = Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # Runs when the server closes the response, even if the stream never started
+    response.call_on_close(close)
+    return response
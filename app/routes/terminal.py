@@ -0,0 +1,41 @@
+from flask import Blueprint, jsonify, request
+
+from app.services import terminal
+from app.services.ephemeris_service import parse_coordinates
+from app.utils.admission import Overloaded
+from app.utils.logging_config import get_logger
+
+terminal_bp = Blueprint('terminal', __name__)
+logger = get_logger("routes")
+
+
+@terminal_bp.route('/api/terminal', methods=['GET'])
+def terminal_command():
+    """
+    Answer a terminal command from cached state (see app/services/terminal.py).
+
+    Query parameters:
+        query (str): The command, e.g. "hour", "moon", "aspects", "planet mars",
+                     "whois Raphael" or "help".
+        lat, lon (float): Observer location, needed by the sky commands.
+
+    Returns "response" (text shown in the terminal), "command" and a small "data"
+    dict; errors carry the message in both "error" and "response".
+    """
+    latitude = longitude = None
+    if request.args.get('lat') is not None or request.args.get('lon') is not None:
+        try:
+            latitude, longitude = parse_coordinates(request.args.get('lat'), request.args.get('lon'))
+        except ValueError as e:
+            return jsonify({"error": str(e), "response": f"Error: {e}"}), 400
+
+    try:
+        return jsonify(terminal.execute(request.args.get('query', ''), latitude, longitude))
+    except ValueError as e:
+        # TerminalError, or a location the ephemeris can't handle
+        return jsonify({"error": str(e), "response": str(e)}), 400
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.exception("Terminal command failed: %s", e)
+        return jsonify({"error": str(e), "response": f"Error: {e}"}), 500
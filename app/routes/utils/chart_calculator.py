@@ -1,5 +1,9 @@
+import hashlib
+import json
 import math 
 from app.routes.constants import SIGN_SYMBOLS, TRIPLICITIES, PLANET_SYMBOLS, DEFAULT_ASPECT_CONFIG, ZODIAC_SIGNS
+from app.utils.svg_sprite import PLANET_SPRITE_DEFS, PLANET_SYMBOL_IDS
+from app.utils.logging_config import get_logger
 from typing import Dict, Any
  
 # <line x1="-{self.OUTER_CIRCLE_RADIUS}" y1="0" x2="{self.OUTER_CIRCLE_RADIUS}" y2="0" 
@@ -7,11 +11,17 @@ from typing import Dict, Any
 # <line x1="0" y1="-{self.OUTER_CIRCLE_RADIUS}" x2="0" y2="{self.OUTER_CIRCLE_RADIUS}" 
 #     stroke="#f5f5f5" stroke-width="1"/> 
  
+logger = get_logger("chart")
+
+
 class ChartCalculator:
     OUTER_CIRCLE_RADIUS = 180
     MAIN_CIRCLE_RADIUS = 160
     INNER_CIRCLE_RADIUS = 60
     CENTER_CIRCLE_RADIUS = 40
+
+    # Bump when the markup changes so cached SVGs and ETags are invalidated
+    RENDER_VERSION = 2
     
     def preprocess_chart_data(self, ephemeris_data):
         """
@@ -51,7 +61,67 @@ class ChartCalculator:
         }
     
    
-    def generate_chart_svg(self, ephemeris_data):
+    def canonical_chart_inputs(self, ephemeris_data, include_defs=True):
+        """
+        Reduce ephemeris data to exactly what the SVG depends on, rounded to the
+        .2f precision the markup is written with. `include_defs` is part of the
+        key because it changes the markup.
+
+        Returns:
+            tuple: (digest, canonical_data) - the sha256 hex digest of the canonical
+                   inputs and an ephemeris_data dict built only from them. Rendering
+                   canonical_data makes the SVG a pure function of the digest.
+        """
+        chart_data = ephemeris_data['ephemeris']['chart']
+        ascendant = chart_data['angles']['ascendant']
+        canonical = {
+            "planets": {
+                name: {"longitude": round(float(planet['longitude']), 2)}
+                for name, planet in ephemeris_data['ephemeris']['planets'].items()
+            },
+            "chart": {
+                "angles": {
+                    "ascendant": {
+                        "absolute_degree": round(float(ascendant['absolute_degree']), 2),
+                        "sign": ascendant['sign'],
+                    }
+                },
+                "houses": {
+                    str(house_num): {
+                        "absolute_degree": round(float(house['absolute_degree']), 2),
+                        "degree": round(float(house['degree']), 2),
+                        "sign": house['sign'],
+                        "planets": [{"name": planet['name']} for planet in house['planets']],
+                    }
+                    for house_num, house in chart_data['houses'].items()
+                },
+                "aspects": [
+                    {"planet1": aspect['planet1'], "planet2": aspect['planet2'], "aspect": aspect['aspect']}
+                    for aspect in chart_data['aspects']
+                ],
+            },
+        }
+        encoded = json.dumps([self.RENDER_VERSION, bool(include_defs), canonical], separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(encoded.encode()).hexdigest(), {"ephemeris": canonical}
+
+
+    def generate_chart_svg(self, ephemeris_data, include_defs=True):
+        return self.generate_chart_svg_bytes(ephemeris_data, include_defs).decode()
+
+
+    def generate_chart_svg_bytes(self, ephemeris_data, include_defs=True):
+        """
+        Render the chart as UTF-8 encoded SVG.
+
+        The static layers (base circles, sign divisions, sign names, degree markers
+        and the fixed frame) are pre-rendered bytes from STATIC_LAYERS; only the
+        rotation, aspects, house cusps and planets are generated per call, and all
+        layers are joined once.
+
+        Planets are drawn with <use> from the planet symbol sprite. With
+        include_defs=False the <defs> are left out, for pages that already hold
+        them from an earlier chart (references resolve document-wide inline).
+        """
         chart_data = self.preprocess_chart_data(ephemeris_data)
         abs_degree = chart_data['angles']['ascendant']['absolute_degree']
         asc_sign = chart_data['angles']['ascendant']['sign']
@@ -61,12 +131,19 @@ class ChartCalculator:
         
         # Calculate chart rotation here so we can pass it to all methods that need it
         reversed_abs_degree = 360 - abs_degree
-        chart_rotation = -(reversed_abs_degree - 270)  # Same calculation as in _start_svg
+        chart_rotation = -(reversed_abs_degree - 270)
   
-        svg = self._start_svg(abs_degree, asc_sign, houses, planets_data, chart_rotation, aspects_data)
-        svg += self._end_svg()
-
-        return svg
+        return b"".join([
+            STATIC_LAYERS["open"],
+            STATIC_LAYERS["defs"] if include_defs else b"",
+            self._start_svg(abs_degree, asc_sign, chart_rotation).encode(),
+            STATIC_LAYERS["base_circles"],
+            self._add_aspects(aspects_data, planets_data).encode(),  # Aspects go under the wheel markings
+            STATIC_LAYERS["wheel"],
+            self._add_house_cusps_and_numbers(houses).encode(),
+            self._add_planets(planets_data, chart_rotation).encode(),
+            STATIC_LAYERS["close"],
+        ])
  
  
     
@@ -98,42 +175,32 @@ class ChartCalculator:
     
 
         
-    def _start_svg(self, abs_degree, asc_sign, houses, planets_data, chart_rotation, aspects_data,):
+    def _start_svg(self, abs_degree, asc_sign, chart_rotation):
         """
-        Start the SVG generation with the zodiac wheel and fixed elements.
-        Rotate the wheel to align the Ascendant degree correctly at 9 o'clock,
-        and adjust for its relative degree within the sign.
+        Open the rotating group that aligns the Ascendant degree at 9 o'clock.
+        Everything up to this group is static and comes from STATIC_LAYERS["open"].
         """
 
-        print(f"\n=== Debug Info ===")
-        print(f"ASC degree: {abs_degree}° (Absolute)")
-        print(f"ASC sign: {asc_sign}")
-        print(f"Final Rotation: {chart_rotation}°")
+        logger.debug("ASC degree: %s° (Absolute), ASC sign: %s, Final Rotation: %s°", abs_degree, asc_sign, chart_rotation)
+
+        return f'''
+                <!-- Rotating group for zodiac wheel -->
+                <g transform="rotate({chart_rotation})">'''
 
 
-        return f'''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 400 400">
+    def _open_svg(self):
+        return '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 400 400">
             <!-- Background -->
             <rect width="400" height="400" fill="#f5f5f5"/>
             
             <!-- Fixed group for the cross and degree markers -->
-            <g transform="translate(200,200)">
-            
-                <!-- Rotating group for zodiac wheel -->
-                <g transform="rotate({chart_rotation})">
-                    {self._add_base_circles()}
-                    {self._add_aspects(aspects_data, planets_data)}  # Add aspects before planets
-                    {self._add_zodiac_divisions()}
-                    {self._add_zodiac_names()}
-                    {self._add_degree_markers()}
-                    {self._add_house_cusps_and_numbers(houses)}
-                    {self._add_planets(planets_data, chart_rotation)}
+            <g transform="translate(200,200)">'''
+
+
+    def _end_svg(self):
+        return f'''
                 </g>
-                
-                
-                <!-- Debug elements *removed after rotating group -->
-                <!-- Add here --> 
 
-  
                 <!-- Fixed ASC marker -->
                 <text x="{-self.OUTER_CIRCLE_RADIUS-10}" y="0" 
                     text-anchor="middle" dominant-baseline="middle" 
@@ -142,7 +209,6 @@ class ChartCalculator:
         </svg>'''
 
 
-
     def _add_base_circles(self):
         return f'''
             <!-- Outer black circle -->
@@ -200,9 +266,9 @@ class ChartCalculator:
         - The Ascendant marks the start of the 1st house.
         - Each subsequent cusp is determined by the provided `houses` data.
         """
-        svg = '''
+        svg = ['''
             <!-- House cusps -->
-            <g stroke="#2B303A" stroke-width="1" stroke-dasharray="4,4">'''
+            <g stroke="#2B303A" stroke-width="1" stroke-dasharray="4,4">''']
 
         house_positions = []  # To store cusp positions for house numbers
 
@@ -218,13 +284,16 @@ class ChartCalculator:
             x2 = self.MAIN_CIRCLE_RADIUS * math.cos(angle_radians)
             y2 = self.MAIN_CIRCLE_RADIUS * math.sin(angle_radians)
             
-            print(f"Cusp {house_num}: abs_degree={abs_degree}°, reversed_degree={reversed_degree}°, angle_radians={angle_radians} radians, x1={x1}, y1={y1}, x2={x2}, y2={y2}")
+            logger.debug(
+                "Cusp %s: abs_degree=%s°, reversed_degree=%s°, angle_radians=%s, x1=%s, y1=%s, x2=%s, y2=%s",
+                house_num, abs_degree, reversed_degree, angle_radians, x1, y1, x2, y2,
+            )
 
-            svg += f'''
+            svg.append(f'''
                 <!-- Cusp {house_num} -->
                 <line x1="{x1:.2f}" y1="{y1:.2f}"
                     x2="{x2:.2f}" y2="{y2:.2f}"
-                    stroke-dasharray="4,4"/>'''
+                    stroke-dasharray="4,4"/>''')
 
             # Store cusp data for house number placement
             house_positions.append((house_num, reversed_degree))
@@ -233,9 +302,9 @@ class ChartCalculator:
         house_positions.sort(key=lambda x: x[1], reverse=True)
 
         # Add house numbers at the midpoint between cusps
-        svg += '''
+        svg.append('''
             </g>
-            <g fill="#2B303A" font-size="9" font-family="Arial, sans-serif">'''
+            <g fill="#2B303A" font-size="9" font-family="Arial, sans-serif">''')
 
         for i in range(len(house_positions)):
             current = house_positions[i]
@@ -258,16 +327,16 @@ class ChartCalculator:
 
 
             # Add the house number
-            svg += f'''
+            svg.append(f'''
                 <text x="{number_x:.2f}" y="{number_y:.2f}"
                     text-anchor="middle" dominant-baseline="middle"
                     transform="rotate({text_rotation:.2f} {number_x:.2f} {number_y:.2f})">
                     {current[0]}
-                </text>'''
+                </text>''')
 
-        svg += '''
-            </g>'''
-        return svg
+        svg.append('''
+            </g>''')
+        return ''.join(svg)
     
     
     def _add_planets(self, planets_data, chart_rotation):
@@ -278,13 +347,11 @@ class ChartCalculator:
             svg_angle = (reversed_longitude - 90) % 360
             angle_radians = math.radians(svg_angle)
             
-            symbol_filename = f"static/svg/chart_planets/{planet_name.lower()}.svg"
-        
             planet_positions.append({
                 'name': planet_name,
                 'angle': svg_angle,
                 'radians': angle_radians,
-                'symbol_path': symbol_filename,
+                'symbol_id': PLANET_SYMBOL_IDS.get(planet_name.lower()),
                 'radius_offset': 0
             })
         
@@ -309,11 +376,11 @@ class ChartCalculator:
             if prev_dist < angle_threshold or next_dist < angle_threshold:
                 planet['radius_offset'] = radius_step if i % 2 == 0 else -radius_step
         
-        svg = '''
+        svg = ['''
             <!-- Planet positions and degree lines -->
             <g>
                 <!-- Degree lines -->
-                <g stroke="#2B303A" stroke-width="1">'''
+                <g stroke="#2B303A" stroke-width="1">''']
         
         # Draw degree lines
         for planet in planet_positions:
@@ -322,18 +389,18 @@ class ChartCalculator:
             line_end_x = (self.MAIN_CIRCLE_RADIUS - 5) * math.cos(planet['radians'])
             line_end_y = (self.MAIN_CIRCLE_RADIUS - 5) * math.sin(planet['radians'])
             
-            svg += f'''
+            svg.append(f'''
                     <line 
                         x1="{line_start_x:.2f}" 
                         y1="{line_start_y:.2f}" 
                         x2="{line_end_x:.2f}" 
                         y2="{line_end_y:.2f}"
-                    />'''
+                    />''')
         
-        svg += '''
+        svg.append('''
                 </g>
                 <!-- Planet symbols -->
-                <g>'''
+                <g>''')
         
         # Add planet symbols with center rotation to counter the chart rotation
         for planet in planet_positions:
@@ -348,22 +415,21 @@ class ChartCalculator:
             center_y = symbol_y + symbol_size/2
             
             # Counter-rotate by chart_rotation to keep symbols upright
-            svg += f'''
+            if planet['symbol_id']:
+                glyph = f'''<use href="#{planet['symbol_id']}" x="{-symbol_size/2}" y="{-symbol_size/2}" width="{symbol_size}" height="{symbol_size}"/>'''
+            else:
+                # No sprite symbol for this planet: fall back to its Unicode glyph
+                glyph = f'''<text text-anchor="middle" dominant-baseline="central" font-size="{symbol_size - 4}" fill="#2B303A">{PLANET_SYMBOLS.get(planet['name'], planet['name'][:2])}</text>'''
+            svg.append(f'''
                     <g transform="translate({center_x} {center_y}) rotate({-chart_rotation})">
-                        <image 
-                            href="{planet['symbol_path']}"
-                            x="{-symbol_size/2}"
-                            y="{-symbol_size/2}"
-                            width="{symbol_size}"
-                            height="{symbol_size}"
-                        />
-                    </g>'''
+                        {glyph}
+                    </g>''')
         
-        svg += '''
+        svg.append('''
                 </g>
-            </g>'''
+            </g>''')
         
-        return svg
+        return ''.join(svg)
     
     
     def _add_aspects(self, aspects_data, planets_data):
@@ -396,9 +462,9 @@ class ChartCalculator:
             planet_positions[planet_name] = {'x': x, 'y': y}
 
         # Generate SVG for aspects
-        svg = '''
+        svg = ['''
             <!-- Aspect lines -->
-            <g class="aspects">'''
+            <g class="aspects">''']
         
         # Draw lines for each aspect
         for aspect in aspects_data:
@@ -418,7 +484,7 @@ class ChartCalculator:
                 })
                 
                 # Draw the aspect line
-                svg += f'''
+                svg.append(f'''
                     <line
                         x1="{pos1['x']:.2f}"
                         y1="{pos1['y']:.2f}"
@@ -428,26 +494,28 @@ class ChartCalculator:
                         stroke-width="{style['stroke_width']}"
                         stroke-dasharray="{style['dash_array']}"
                         opacity="0.6"
-                    />'''
+                    />''')
         
-        svg += '''
-            </g>'''
+        svg.append('''
+            </g>''')
         
-        return svg
+        return ''.join(svg)
 
-         
-    def _end_svg(self):
-        return '''
-            </g>
-        </svg>'''            
-                
-                
-                
-       
-       
-       
-       
-       
-       
-       
-   
\ No newline at end of file
+
+def _render_static_layers():
+    """Render the layers that depend only on class constants, once, as bytes."""
+    calculator = ChartCalculator()
+    return {
+        "open": calculator._open_svg().encode(),
+        "defs": PLANET_SPRITE_DEFS.encode(),
+        "base_circles": calculator._add_base_circles().encode(),
+        "wheel": (
+            calculator._add_zodiac_divisions() +
+            calculator._add_zodiac_names() +
+            calculator._add_degree_markers()
+        ).encode(),
+        "close": calculator._end_svg().encode(),
+    }
+
+
+STATIC_LAYERS = _render_static_layers()
@@ -1,35 +1,89 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
 from pytz import timezone as pytz_timezone
 from skyfield.api import wgs84
 from skyfield.almanac import find_discrete, sunrise_sunset
 import swisseph as swe
 import numpy as np
-from timezonefinder import TimezoneFinder
+import logging
 import math
+import os
 import uuid
 
-from app.routes.constants import DAY_RULERS, ZODIAC_SIGNS, EXTENDED_PLANETARY_ORDER, EXTENDED_SKYFIELD_IDS, DEFAULT_ASPECT_CONFIG
-from app.routes.constants import ephemeris, ts
+from app.routes.constants import ZODIAC_SIGNS, EXTENDED_PLANETARY_ORDER, EXTENDED_SKYFIELD_IDS, DEFAULT_ASPECT_CONFIG
+from app.routes.constants import ephemeris, ts, timezone_finder
+from app.utils.logging_config import get_logger
+from app.utils.timing import span
+
+logger = get_logger("ephemeris")
+
+# Precision mode takes planet distances from the topocentric astrometric vectors of
+# the positions pass instead of a separate geocentric pass (opt-in, it changes the
+# Moon's distance by up to ~1.7% versus geocentric)
+PRECISION_MODE = os.getenv("EPHEMERIS_PRECISION_MODE", "0") == "1"
+
+# Sunrise/sunset searches and timezone lookups are pure functions of the location
+# (and local date), so repeated requests for the same place reuse them
+SUN_TIMES_CACHE_SIZE = 4096
+TIMEZONE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TIMEZONE_CACHE_SIZE)
+def timezone_name_at(latitude, longitude):
+    """IANA timezone name at a location, or None (e.g. far out at sea)."""
+    return timezone_finder.timezone_at(lat=latitude, lng=longitude)
+
+
+@lru_cache(maxsize=SUN_TIMES_CACHE_SIZE)
+def sun_times_utc(latitude, longitude, local_date):
+    """
+    Search sunrise and sunset events during the UTC day of `local_date`.
+
+    Returns:
+        tuple: (sunrise_utc, sunset_utc) datetimes.
+
+    Raises:
+        ValueError: If no sunrise or sunset occurs (not cached).
+    """
+    f = sunrise_sunset(ephemeris, wgs84.latlon(latitude, longitude))
+
+    t0 = ts.utc(local_date.year, local_date.month, local_date.day)
+    t1 = ts.utc(local_date.year, local_date.month, local_date.day, 23, 59, 59)
+
+    times, events = find_discrete(t0, t1, f)
+    sunrise_indices = np.where(events == 0)[0]
+    sunset_indices = np.where(events == 1)[0]
+
+    if not sunrise_indices.size or not sunset_indices.size:
+        raise ValueError("Could not determine sunrise or sunset times.")
+
+    return times[sunrise_indices[0]].utc_datetime(), times[sunset_indices[-1]].utc_datetime()
+
+
+# Leaf types _convert_to_serializable passes through unchanged
+JSON_SCALAR_TYPES = frozenset((int, float, str, bool, type(None)))
 
 
 class EphemerisCalculator:
-    def __init__(self, latitude, longitude):
+    def __init__(self, latitude, longitude, at=None, precision_mode=None):
         self.latitude = latitude
         self.longitude = longitude
         self.observer = wgs84.latlon(latitude, longitude)
+        self.precision_mode = PRECISION_MODE if precision_mode is None else precision_mode
 
         # Determine timezone
-        tz_finder = TimezoneFinder()
-        self.timezone_name = tz_finder.timezone_at(lat=latitude, lng=longitude)
+        with span("ephemeris.timezone"):
+            self.timezone_name = timezone_name_at(latitude, longitude)
         if not self.timezone_name:
             raise ValueError("Could not determine timezone for the given location.")
         self.timezone = pytz_timezone(self.timezone_name)
 
-        # Initialize times
-        self.now_utc = datetime.now(dt_timezone.utc)
+        # Initialize times (`at` is an aware datetime; defaults to now)
+        self.now_utc = at.astimezone(dt_timezone.utc) if at else datetime.now(dt_timezone.utc)
         self.now_local = self.now_utc.astimezone(self.timezone)
-        self.sunrise_local, self.sunset_local = self._calculate_sun_times()
+        with span("ephemeris.sun_times"):
+            self.sunrise_local, self.sunset_local = self._calculate_sun_times()
   
         
     def _convert_to_serializable(self, data):
@@ -42,6 +96,8 @@ class EphemerisCalculator:
         Returns:
             any: JSON-serializable data.
         """
+        if type(data) in JSON_SCALAR_TYPES:  # Most leaves; skip the isinstance chain
+            return data
         if isinstance(data, dict):
             return {key: self._convert_to_serializable(value) for key, value in data.items()}
         elif isinstance(data, list):
@@ -70,10 +126,12 @@ class EphemerisCalculator:
             dict: A comprehensive dataset of planetary and additional data.
         """
         # Step 1: Calculate planetary positions
-        planetary_positions = self.calculate_planetary_positions()
+        with span("ephemeris.positions"):
+            planetary_positions = self.calculate_planetary_positions()
 
         # Step 2: Add distances to planetary positions
-        planetary_distances = self.calculate_planetary_distances()
+        with span("ephemeris.distances"):
+            planetary_distances = self.calculate_planetary_distances()
         for planet, distance in planetary_distances.items():
             if planet in planetary_positions:
                 if isinstance(distance, dict) and "error" in distance:
@@ -83,23 +141,27 @@ class EphemerisCalculator:
                     planetary_positions[planet]["distance_au"] = float(distance)
 
         # Step 3: Add combustion and cazimi status
-        combustion_cazimi = self.calculate_combustion_and_cazimi()
+        with span("ephemeris.combustion"):
+            combustion_cazimi = self.calculate_combustion_and_cazimi()
         for planet, data in combustion_cazimi.items():
             if planet in planetary_positions:
                 planetary_positions[planet].update(data)
 
         # Step 4: Add Moon-specific properties
-        moon_data = self.calculate_moon_properties(
-            positions=planetary_positions, precomputed_results=combustion_cazimi
-        )
+        with span("ephemeris.moon"):
+            moon_data = self.calculate_moon_properties(
+                positions=planetary_positions, precomputed_results=combustion_cazimi
+            )
         planetary_positions["Moon"].update(moon_data)
         # print(f"DEBUG: Updated Moon Data: {planetary_positions['Moon']}")
 
         # Step 5: Calculate aspects between planets
-        aspects = self.calculate_aspects()
+        with span("ephemeris.aspects"):
+            aspects = self.calculate_aspects()
         
         # Step 6: Calculate complete chart
-        chart_data = self.calculate_complete_chart()
+        with span("ephemeris.houses"):
+            chart_data = self.calculate_complete_chart()
 
         # Step 7: Add additional information
         current_date = self.now_local.strftime('%Y-%m-%d')
@@ -107,27 +169,29 @@ class EphemerisCalculator:
         utc_time = self.now_utc.strftime('%H:%M:%S')
         sunrise = self.sunrise_local.strftime('%H:%M:%S')
         sunset = self.sunset_local.strftime('%H:%M:%S')
-        hour_index = self.calculate_planetary_hour()
-        day_ruling_planet = DAY_RULERS[self.now_local.weekday()]
+        planetary_hour = self.calculate_current_hour()
 
         # Step 8: Combine all data into a unified dataset
-        ephemeris_dataset = {
-            "planets": self._convert_to_serializable(planetary_positions),  # Centralized planetary data
-            "chart": {
-                "houses": self._convert_to_serializable(chart_data["houses"]),  
-                "angles": self._convert_to_serializable(chart_data["angles"]),
-                "aspects": self._convert_to_serializable(aspects),
-            },
-            "additional_info": {
-                "current_date": current_date,
-                "current_time": current_time,
-                "utc_time": utc_time,
-                "current_planetary_hour": hour_index,
-                "day_ruling_planet": day_ruling_planet,
-                "sunrise": sunrise,
-                "sunset": sunset,
-            },
-        }
+        with span("ephemeris.convert"):
+            ephemeris_dataset = {
+                "planets": self._convert_to_serializable(planetary_positions),  # Centralized planetary data
+                "chart": {
+                    "houses": self._convert_to_serializable(chart_data["houses"]),  
+                    "angles": self._convert_to_serializable(chart_data["angles"]),
+                    "aspects": self._convert_to_serializable(aspects),
+                },
+                "additional_info": {
+                    "current_date": current_date,
+                    "current_time": current_time,
+                    "utc_time": utc_time,
+                    "current_planetary_hour": planetary_hour["hour"],
+                    "planetary_day": planetary_hour["weekday"],
+                    "day_ruling_planet": planetary_hour["day_ruler"],
+                    "hour_ruler": planetary_hour["hour_ruler"],
+                    "sunrise": sunrise,
+                    "sunset": sunset,
+                },
+            }
 
         return ephemeris_dataset
 
@@ -141,21 +205,7 @@ class EphemerisCalculator:
         Returns:
             tuple: A tuple containing sunrise_local and sunset_local (timezone-aware datetime).
         """
-        f = sunrise_sunset(ephemeris, self.observer)
-        local_date = self.now_local.date()
-
-        t0 = ts.utc(local_date.year, local_date.month, local_date.day)
-        t1 = ts.utc(local_date.year, local_date.month, local_date.day, 23, 59, 59)
-
-        times, events = find_discrete(t0, t1, f)
-        sunrise_indices = np.where(events == 0)[0]
-        sunset_indices = np.where(events == 1)[0]
-
-        if not sunrise_indices.size or not sunset_indices.size:
-            raise ValueError("Could not determine sunrise or sunset times.")
-
-        sunrise_utc = times[sunrise_indices[0]].utc_datetime()
-        sunset_utc = times[sunset_indices[-1]].utc_datetime()
+        sunrise_utc, sunset_utc = sun_times_utc(self.latitude, self.longitude, self.now_local.date())
 
         sunrise_local = sunrise_utc.replace(tzinfo=dt_timezone.utc).astimezone(self.timezone)
         sunset_local = sunset_utc.replace(tzinfo=dt_timezone.utc).astimezone(self.timezone)
@@ -168,6 +218,24 @@ class EphemerisCalculator:
     
  
    
+    def calculate_current_hour(self):
+        """
+        Look up the current planetary hour in the sunrise-to-sunrise timetable.
+
+        Planetary days start at sunrise, so between midnight and sunrise this is
+        a night hour of the previous weekday.
+
+        Returns:
+            dict: "hour" (1 to 12 for day hours, -1 to -12 for night hours),
+                  "weekday" of the planetary day, "hour_ruler", "day_ruler" and
+                  "start" (unix ms).
+        """
+        # Imported here: timeline_calculator imports this module
+        from app.routes.utils.timeline_calculator import planetary_hour_at
+
+        return planetary_hour_at(self.latitude, self.longitude, self.now_utc)[0]
+
+
     def calculate_planetary_hour(self):
         """
         Calculate the current planetary hour index.
@@ -175,63 +243,48 @@ class EphemerisCalculator:
         Returns:
             int: The hour number (1 to 12 for day hours, -1 to -12 for night hours)
         """
-        if not hasattr(self, 'sunrise_local') or not hasattr(self, 'sunset_local'):
-            raise ValueError("Sunrise and sunset times must be calculated before determining the planetary hour.")
-
-        is_daytime = self.sunrise_local <= self.now_local <= self.sunset_local
-
-        if is_daytime:
-            # Daytime: Calculate positive hour index (1 to 12)
-            duration = (self.sunset_local - self.sunrise_local).total_seconds() / 12
-            time_since_sunrise = (self.now_local - self.sunrise_local).total_seconds()
-            hour_index = int(time_since_sunrise // duration) + 1
-            return min(12, max(1, hour_index))  # Ensure between 1 and 12
-        else:
-            # Nighttime: Calculate negative hour index (-1 to -12)
-            next_sunrise_local = self.sunrise_local + timedelta(days=1)
-            duration = (next_sunrise_local - self.sunset_local).total_seconds() / 12
-            time_since_sunset = (self.now_local - self.sunset_local).total_seconds()
-            hour_index = -(int(time_since_sunset // duration) + 1)
-            return max(-12, min(-1, hour_index))  # Ensure between -12 and -1
+        return self.calculate_current_hour()["hour"]
     
     
     def get_day_ruler(self):
         """
-        Determine the day ruler based on the current day of the week.
+        Determine the day ruler of the current planetary day (sunrise to sunrise).
 
         Returns:
             str: The ruling planet of the current day.
         """
-        day_index = self.now_local.weekday()
-        return DAY_RULERS[day_index]
+        return self.calculate_current_hour()["day_ruler"]
 
 
     def calculate_planetary_positions(self):
         """
         Calculate positions for all planets using constants from constants.py.
+
+        Each planet is observed once, for now and now + 1 day together: longitude,
+        daily motion, altitude/azimuth and the topocentric distance all come from
+        that one astrometric vector pair.
         """
         positions = {}
-        observer_time = ts.from_datetime(self.now_utc)
-        observer_time_tomorrow = ts.from_datetime(self.now_utc + timedelta(days=1))
+        self.topocentric_distances = {}
+        observer_times = ts.from_datetimes([self.now_utc, self.now_utc + timedelta(days=1)])
 
         earth = ephemeris['earth']
-        topos = earth + self.observer
+        observer_at = (earth + self.observer).at(observer_times)
 
         for planet_name in EXTENDED_PLANETARY_ORDER:
             try:
                 planet = ephemeris[EXTENDED_SKYFIELD_IDS[planet_name]]
+                astrometric = observer_at.observe(planet)
 
                 # Calculate ecliptic longitude and daily motion
-                longitude, daily_motion, is_retrograde, is_stationary = self._calculate_longitude_and_motion(
-                    topos, observer_time, observer_time_tomorrow, planet
-                )
+                longitude, daily_motion, is_retrograde, is_stationary = self._calculate_longitude_and_motion(astrometric)
 
                 # Normalize position to zodiac
                 sign_index = int(longitude // 30)
                 sign_degree = longitude % 30
 
                 # Calculate altitude and azimuth
-                alt, az = self._calculate_alt_az(topos, observer_time, planet)
+                alt, az = self._calculate_alt_az(astrometric)
 
                 # Build position data
                 positions[planet_name] = {
@@ -245,31 +298,29 @@ class EphemerisCalculator:
                     "azimuth": round(az, 2),
                 }
 
+                distance_au = float(astrometric.distance().au[0])
+                self.topocentric_distances[planet_name] = distance_au
+
                 # Add Moon-specific distance (AU and KM)
                 if planet_name == 'Moon':
-                    distance_au = topos.at(observer_time).observe(planet).distance().au
                     positions['Moon']["distance_au"] = round(distance_au, 6)
                     positions['Moon']["distance_km"] = round(distance_au * 149597870.7, 2)  # AU to KM
 
             except Exception as e:
-                print(f"Error calculating {planet_name}: {e}")
+                logger.error("Error calculating %s: %s", planet_name, e)
                 positions[planet_name] = self._fallback_position_data(e)
 
         self.planetary_positions = positions  # Assign to instance
         return positions
 
-    def _calculate_longitude_and_motion(self, topos, observer_time, observer_time_tomorrow, planet):
+    def _calculate_longitude_and_motion(self, astrometric):
         """
-        Calculate ecliptic longitude, daily motion, retrograde, and stationary status.
+        Calculate ecliptic longitude, daily motion, retrograde, and stationary status
+        from an astrometric position observed at [now, now + 1 day].
         """
-        astrometric = topos.at(observer_time).observe(planet)
-        ecliptic_pos = astrometric.ecliptic_latlon()
-        longitude = float(ecliptic_pos[1].degrees)
-
-        # Calculate tomorrow's position for motion
-        astrometric_tomorrow = topos.at(observer_time_tomorrow).observe(planet)
-        ecliptic_pos_tomorrow = astrometric_tomorrow.ecliptic_latlon()
-        longitude_tomorrow = float(ecliptic_pos_tomorrow[1].degrees)
+        ecliptic_longitudes = astrometric.ecliptic_latlon()[1].degrees
+        longitude = float(ecliptic_longitudes[0])
+        longitude_tomorrow = float(ecliptic_longitudes[1])
 
         # Calculate daily motion
         daily_motion = longitude_tomorrow - longitude
@@ -289,13 +340,12 @@ class EphemerisCalculator:
 
         return longitude, daily_motion, is_retrograde, is_stationary
 
-    def _calculate_alt_az(self, topos, observer_time, planet):
+    def _calculate_alt_az(self, astrometric):
         """
-        Calculate altitude and azimuth of a planet.
+        Calculate altitude and azimuth of a planet at the first observed epoch.
         """
-        astrometric = topos.at(observer_time).observe(planet)
         alt, az, _ = astrometric.apparent().altaz()
-        return alt.degrees, az.degrees
+        return float(alt.degrees[0]), float(az.degrees[0])
 
     def _fallback_position_data(self, error):
         """
@@ -317,54 +367,49 @@ class EphemerisCalculator:
 
     def calculate_planetary_distances(self):
         """
-        Calculate the distance of each planet (including outer planets) from Earth using Skyfield,
-        with detailed debugging information.
+        Calculate the distance of each planet (including outer planets) from Earth using Skyfield.
+
+        In precision mode the distances are the topocentric ones already computed by
+        calculate_planetary_positions; otherwise each planet is observed once from the
+        geocenter.
 
         Returns:
             dict: A dictionary with planet names as keys and their distances (in AU) as values.
         """
+        if self.precision_mode:
+            if not hasattr(self, 'topocentric_distances'):
+                self.calculate_planetary_positions()
+            return {
+                planet_name: round(self.topocentric_distances[planet_name], 6)
+                if planet_name in self.topocentric_distances
+                else {"error": f"Failed to calculate distance for {planet_name}: position unavailable"}
+                for planet_name in EXTENDED_SKYFIELD_IDS
+            }
+
         try:
             # Convert the current UTC time
             observer_time = ts.from_datetime(self.now_utc)
-            print(f"DEBUG: Observer Time: {observer_time.utc_iso()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Observer Time: %s", observer_time.utc_iso())
 
             distances = {}
-            earth = ephemeris['earth']
+            earth_at = ephemeris['earth'].at(observer_time)
 
             for planet_name, skyfield_id in EXTENDED_SKYFIELD_IDS.items():
                 try:
-                    
-                    # Log the planet and identifier being processed
-                    # print(f"DEBUG: Calculating distance for {planet_name} using ID '{skyfield_id}'")
-
-                    planet_obj = ephemeris[skyfield_id]
                     # Calculate distance from Earth to the planet
-                    distance = earth.at(observer_time).observe(planet_obj).distance().au
-
-                    # Log the calculated distance
-                    # print(f"DEBUG: Distance for {planet_name}: {distance:.6f} AU")
-
-                    # Store the result
+                    distance = earth_at.observe(ephemeris[skyfield_id]).distance().au
                     distances[planet_name] = round(distance, 6)
 
-                    # Additional debug for barycenter vs direct (if applicable)
-                    if "barycenter" in skyfield_id:
-                        direct_id = skyfield_id.replace(" barycenter", "")
-                        if direct_id in ephemeris:
-                            direct_distance = earth.at(observer_time).observe(ephemeris[direct_id]).distance().au
-                            print(f"DEBUG: Direct ID ({direct_id}) distance for {planet_name}: {direct_distance:.6f} AU")
-                            distances[f"{planet_name} (direct)"] = round(direct_distance, 6)
-
                 except Exception as e:
                     error_message = f"Failed to calculate distance for {planet_name}: {str(e)}"
-                    print(f"ERROR: {error_message}")
+                    logger.error(error_message)
                     distances[planet_name] = {"error": error_message}
 
-            # print("DEBUG: Final distances:", distances)
             return distances
 
         except Exception as e:
-            print(f"ERROR: Failed to calculate planetary distances: {str(e)}")
+            logger.error("Failed to calculate planetary distances: %s", e)
             return {"error": str(e)}
 
     
@@ -648,8 +693,8 @@ class EphemerisCalculator:
         4. Determine important chart angles (Ascendant, MC, etc.)
         """
         try:
-            # 1. Calculate planetary positions
-            planetary_positions = self.calculate_planetary_positions()
+            # 1. Reuse the planetary positions if they were already calculated
+            planetary_positions = getattr(self, 'planetary_positions', None) or self.calculate_planetary_positions()
 
             # 2. Calculate house cusps using Swiss Ephemeris
             jd = swe.julday(
@@ -730,7 +775,7 @@ class EphemerisCalculator:
             }
 
         except Exception as e:
-            print(f"Error calculating chart: {str(e)}")
+            logger.error("Error calculating chart: %s", e)
             return {"error": f"Chart calculation failed: {str(e)}"}
 
 
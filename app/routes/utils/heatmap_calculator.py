@@ -1,450 +1,313 @@
 from app.routes.constants import PLANETARY_COLORS, ESSENTIAL_DIGNITIES, PLANET_DIAMETERS
-import math
+from app.routes.constants import EXTENDED_PLANETARY_ORDER, ZODIAC_SIGNS
+import numpy as np
 from typing import List, Dict
 
+from app.utils.logging_config import get_logger
+
+logger = get_logger("heatmap")
+
+
+# ------------------------------------
+# PRECOMPUTED TABLES (built once at import)
+# ------------------------------------
+
+HEATMAP_PLANETS = list(EXTENDED_PLANETARY_ORDER)
+PLANET_INDEX = {name: i for i, name in enumerate(HEATMAP_PLANETS)}
+SIGN_INDEX = {sign: i for i, sign in enumerate(ZODIAC_SIGNS)}
+
+# Size constants
+MAX_DISTANCE_SIZE = 35
+MIN_DISTANCE_SIZE = 5
+MAX_DIAMETER_SIZE = 15
+MIN_DIAMETER_SIZE = 5
+
+# Dignity modifier per (planet, sign); the extra last column (index -1) is for unknown signs
+DIGNITY_TABLE = np.ones((len(HEATMAP_PLANETS), len(ZODIAC_SIGNS) + 1))
+for _name, _i in PLANET_INDEX.items():
+    # Reverse priority order so rulership wins if a sign appears twice
+    for _dignity, _modifier in (("fall", 0.5), ("detriment", 0.75), ("exaltation", 1.25), ("rulership", 1.5)):
+        _sign = ESSENTIAL_DIGNITIES.get(_name, {}).get(_dignity)
+        if _sign in SIGN_INDEX:
+            DIGNITY_TABLE[_i, SIGN_INDEX[_sign]] = _modifier
+
+# Physical diameter contribution to the planet size, per planet
+_MIN_DIAMETER = min(PLANET_DIAMETERS.values())
+_MAX_DIAMETER = max(PLANET_DIAMETERS.values())
+DIAMETER_SIZES = np.array([
+    ((PLANET_DIAMETERS[name] - _MIN_DIAMETER) / (_MAX_DIAMETER - _MIN_DIAMETER)) *
+    (MAX_DIAMETER_SIZE - MIN_DIAMETER_SIZE) + MIN_DIAMETER_SIZE
+    for name in HEATMAP_PLANETS
+])
+
+# Gradient colour stops per planet (None when the planet has no colours)
+GRADIENT_STOPS = [
+    (PLANETARY_COLORS.get(name) or {}).get("gradient_stops") if isinstance(PLANETARY_COLORS.get(name), dict) else None
+    for name in HEATMAP_PLANETS
+]
+
+# Two-digit uppercase hex alpha for every opacity step
+OPACITY_HEX = [format(i, '02x').upper() for i in range(256)]
+
 
 class HeatmapCalculator:
     
     @staticmethod
-    def calculate_dignity_modifier(planet, sign):
+    def _default_gradient(planet_name: str, normalized_size: float) -> dict:
         """
-        Determine the essential dignity of a planet based on its zodiac sign.
+        Provide a fallback gradient if the planet's colors or gradient stops are missing,
+        now with a debug log.
         """
-        dignity = ESSENTIAL_DIGNITIES.get(planet, {})
-        if sign == dignity.get('rulership'):
-            return 1.5
-        elif sign == dignity.get('exaltation'):
-            return 1.25
-        elif sign == dignity.get('detriment'):
-            return 0.75
-        elif sign == dignity.get('fall'):
-            return 0.5
-        else:
-            return 1.0
-
-     
+        logger.debug("_default_gradient() called for %s; normalized_size=%.2f", planet_name, normalized_size)
+        fallback = {
+            "core": {
+                "radius": normalized_size,
+                "color": "#FFFFFF"
+            },
+            "inner": {
+                "radius": normalized_size * 1.5,
+                "color": "#DDDDDD"
+            },
+            "outer": {
+                "radius": normalized_size * 2.0,
+                "color": "#AAAAAA"
+            }
+        }
+        # print(f"[LOG] Fallback gradient for {planet_name}: {fallback}")
+        return fallback
+    
+
+
+   
     @staticmethod
-    def calculate_moon_phase_modifier(planets_data):
+    def planets_to_columns(planetary_positions):
         """
-        Calculate the Moon-specific phase modifier based on its phase angle within planets data.
+        Convert the per-planet dicts of an ephemeris dataset into column arrays.
 
         Args:
-            planets_data (dict): Dictionary containing data for all planets, including the Moon.
+            planetary_positions (dict): ephemeris_data["planets"].
 
         Returns:
-            dict: A dictionary with the phase modifier and the phase angle for the Moon.
+            tuple: (names, columns) where columns maps each scored field to a 1-D array
+                   in the order of `names`. Planets the engine has no tables for are skipped.
         """
-        # Extract the Moon's data
-        moon_data = planets_data.get("Moon", {})
-        phase_angle = moon_data.get("phase_angle")
-
-        if phase_angle is None:
-            return {"phase_modifier": 0, "phase_angle": None}
-
-        # Calculate phase modifier based on the angle
-        if phase_angle <= 90:  # New Moon to First Quarter (Waxing)
-            phase_modifier = -0.7 + (phase_angle / 90) * 1.0
-        elif phase_angle <= 180:  # First Quarter to Full Moon (Waxing)
-            phase_modifier = 0.3 + ((phase_angle - 90) / 90) * 0.9
-        elif phase_angle <= 270:  # Full Moon to Last Quarter (Waning)
-            phase_modifier = 1.2 - ((phase_angle - 180) / 90) * 1.6
-        else:  # Last Quarter to New Moon (Waning)
-            phase_modifier = -0.4 - ((phase_angle - 270) / 90) * 0.3
-
-        return {
-            "phase_modifier": round(phase_modifier, 2),
-            "phase_angle": round(phase_angle, 2),
+        names = [name for name in planetary_positions if name in PLANET_INDEX]
+        positions = [planetary_positions[name] for name in names]
+
+        def column(field, default, dtype=float):
+            return np.array([
+                default if position.get(field) is None else position.get(field)
+                for position in positions
+            ], dtype=dtype)
+
+        columns = {
+            "planet_index": np.array([PLANET_INDEX[name] for name in names], dtype=np.intp),
+            "distance_au": column("distance_au", 1.0),
+            "altitude": column("altitude", 0.0),
+            "sign_index": np.array([SIGN_INDEX.get(position.get("sign"), -1) for position in positions], dtype=np.intp),
+            "is_combust": column("is_combust", False, bool),
+            "is_cazimi": column("is_cazimi", False, bool),
+            # Only the Moon carries a phase modifier
+            "phase_angle": np.array([
+                position.get("phase_angle", np.nan) if name == "Moon" and position.get("phase_angle") is not None else np.nan
+                for name, position in zip(names, positions)
+            ], dtype=float),
         }
-   
+        return names, columns
 
 
     @staticmethod
-    def calculate_combustion_cazimi_modifier(planet_data):
-        """
-        Calculate the combustion or cazimi modifier for a planet based on its data.
+    def ruler_masks(planet_index, hour_ruler, day_ruling_planet):
+        """Boolean hour/day ruler masks for a planet index array (rulers may be None)."""
+        hour_index = PLANET_INDEX.get((hour_ruler or "").capitalize(), -1)
+        day_index = PLANET_INDEX.get((day_ruling_planet or "").capitalize(), -1)
+        return planet_index == hour_index, planet_index == day_index
 
-        Args:
-            planet_data (dict): Dictionary containing data for a specific planet,
-                                including 'is_cazimi' and 'is_combust' flags.
 
-        Returns:
-            dict: A dictionary with the combustion modifier and combustion status.
+    @staticmethod
+    def score_arrays(planet_index, distance_au, altitude, sign_index, is_combust, is_cazimi,
+                     phase_angle, is_hour_ruler, is_day_ruler):
         """
-        is_cazimi = planet_data.get("is_cazimi", False)
-        is_combust = planet_data.get("is_combust", False)
-
-        if is_cazimi:
-            return {
-                "combustion_modifier": 0.5,  # Bonus for cazimi
-                "combustion_status": "Cazimi",
-            }
-        elif is_combust:
-            return {
-                "combustion_modifier": -1.8,  # Penalty for combustion
-                "combustion_status": "Combust",
-            }
-        else:
-            return {
-                "combustion_modifier": 0,
-                "combustion_status": "None",
-            }
+        Vectorized intensity, size and gradient scoring.
 
-    
+        All arguments are NumPy arrays that broadcast together; the last axis is the
+        planet axis, so a (timestamps, planets) layout scores a whole time series at
+        once. Size normalization uses the min/max distance along the planet axis.
 
-    @staticmethod
-    def normalize_planet_size(planet_name: str, planets_data: dict) -> float:
-        """Calculate normalized size based primarily on distance, with minimal physical diameter influence."""
-        # Get all distances and current distance
-        distances = [position.get("distance_au", 1.0) for position in planets_data.values()]
-        min_distance = min(distances)
-        max_distance = max(distances)
-        current_distance = planets_data[planet_name].get("distance_au", 1.0)
-        
-        # Constants - reduced overall sizes and range
-        max_distance_size = 35  # Reduced from 50
-        min_distance_size = 5
-        max_diameter_size = 15  # Reduced from 25
-        min_diameter_size = 5
-
-        # Calculate distance size with logarithmic scaling
-        log_distance = math.log10(current_distance + 1)
-        min_log = math.log10(min_distance + 1)
-        max_log = math.log10(max_distance + 1)
-        
-        distance_size = (
-            ((max_log - log_distance) / (max_log - min_log)) *
-            (max_distance_size - min_distance_size) +
-            min_distance_size
-        )
+        Returns:
+            dict: Arrays for intensity, combustion_modifier, phase_modifier,
+                  normalized_size, ruling_multiplier, the three gradient radii and
+                  the three gradient opacities.
+        """
+        # 1) Proximity, capped so it's not extreme
+        intensity_proximity = np.minimum(1 / distance_au, 10)
 
-        # Physical size normalization - but with much less influence
-        diameter = PLANET_DIAMETERS[planet_name]
-        max_diameter = max(PLANET_DIAMETERS.values())
-        min_diameter = min(PLANET_DIAMETERS.values())
-        
-        diameter_size = (
-            ((diameter - min_diameter) / (max_diameter - min_diameter)) *
-            (max_diameter_size - min_diameter_size) +
-            min_diameter_size
-        )
+        # 2) Visibility: below the horizon it never drops under 0.1
+        visibility_factor = np.where(altitude >= 0, altitude / 90, np.maximum((altitude / 90) * 0.4, 0.1))
 
-        # Combined size with much stronger weight on distance
-        return 0.85 * distance_size + 0.15 * diameter_size  # Changed from 0.6/0.4 split
-    
-    
+        # 3) Ruling bonuses
+        rules_both = is_hour_ruler & is_day_ruler
+        bonus = np.where(rules_both, 1.5, np.where(is_hour_ruler, 9.0, np.where(is_day_ruler, 6.5, 0.0)))
 
+        # 4) Dignity
+        dignity_modifier = DIGNITY_TABLE[planet_index, sign_index]
 
+        # 5) Combustion & cazimi
+        combustion_modifier = np.where(is_cazimi, 0.5, np.where(is_combust, -1.8, 0.0))
 
-    @staticmethod
-    def calculate_planet_intensity(
-        planet_name,
-        position,
-        hour_ruler,
-        day_ruling_planet
-    ):
-        """
-        Calculate the intensity of a planet based on various factors,
-        with debug logs at each step.
-        
-        Args:
-            planet_name (str): Name of the planet being evaluated.
-            position (dict): Data for the planet, including altitude, sign, distance, etc.
-            hour_ruler (str): Planet ruling the current hour.
-            day_ruling_planet (str): Planet ruling the current day.
+        # 6) Moon phase (NaN for every other planet)
+        angle = np.nan_to_num(phase_angle)
+        phase_modifier = np.select(
+            [angle <= 90, angle <= 180, angle <= 270],
+            [-0.7 + (angle / 90) * 1.0, 0.3 + ((angle - 90) / 90) * 0.9, 1.2 - ((angle - 180) / 90) * 1.6],
+            -0.4 - ((angle - 270) / 90) * 0.3,
+        )
+        phase_modifier = np.where(np.isnan(phase_angle), 0.0, np.round(phase_modifier, 2))
 
-        Returns:
-            tuple: (intensity, combustion_status)
-        """
-        # print(f"[LOG] --- Calculating intensity for {planet_name} ---")
-
-        # 1) PROXIMITY INTENSITY
-        distance_au = position.get("distance_au", 1.0)
-        intensity_proximity = 1 / distance_au
-        intensity_proximity = min(intensity_proximity, 10)  # Cap so it's not extreme
-        # print(f"[LOG] distance_au: {distance_au:.3f}, intensity_proximity (capped): {intensity_proximity:.3f}")
-
-        # 2) VISIBILITY FACTOR (Altitude)
-        altitude = position.get("altitude", 0)
-        if altitude >= 0:
-            visibility_factor = altitude / 90
-        else:
-            # If below horizon, reduce factor significantly but never below 0.1
-            visibility_factor = max((altitude / 90) * 0.4, 0.1)
-        # print(f"[LOG] altitude: {altitude:.2f}, visibility_factor: {visibility_factor:.3f}")
-
-        # 3) RULING BONUSES
-        bonus = 0
-        if planet_name == hour_ruler and planet_name == day_ruling_planet:
-            bonus += 1.5  # smaller bonus if it rules both simultaneously
-            # print(f"[LOG] {planet_name} rules both hour & day -> bonus = {bonus}")
-        elif planet_name == hour_ruler:
-            bonus += 9.0
-            # print(f"[LOG] {planet_name} is the hour ruler -> bonus = {bonus}")
-        elif planet_name == day_ruling_planet:
-            bonus += 6.5
-            # print(f"[LOG] {planet_name} is the day ruler -> bonus = {bonus}")
-
-        # 4) DIGNITY MODIFIER
-        sign = position.get("sign", "")
-        dignity_modifier = HeatmapCalculator.calculate_dignity_modifier(planet_name, sign)
-        # print(f"[LOG] sign: {sign}, dignity_modifier: {dignity_modifier:.2f}")
-
-        # 5) COMBUSTION & CAZIMI
-        combustion_data = HeatmapCalculator.calculate_combustion_cazimi_modifier(position)
-        combustion_modifier = combustion_data["combustion_modifier"]
-        combustion_status = combustion_data["combustion_status"]
-        # print(f"[LOG] combustion_modifier: {combustion_modifier:.2f}, combustion_status: {combustion_status}")
-
-        # 6) MOON-SPECIFIC PHASE MODIFIER
-        phase_modifier = 0
-        if planet_name == "Moon":
-            phase_modifier_data = HeatmapCalculator.calculate_moon_phase_modifier(position)
-            phase_modifier = phase_modifier_data["phase_modifier"]
-            # print(f"[LOG] Moon phase_modifier: {phase_modifier:.2f}")
-
-        # 7) FINAL INTENSITY CALCULATION
+        # 7) Final intensity
         intensity = (
             0.15 * intensity_proximity +
             0.20 * visibility_factor +
-            0.2  * dignity_modifier +
-            0.40  * bonus +
-            0.10  * phase_modifier +
+            0.2 * dignity_modifier +
+            0.40 * bonus +
+            0.10 * phase_modifier +
             combustion_modifier
         )
-        intensity = min(max(intensity * 1.5, 0), 10)  # Scale up by 1.5x but cap at 10
-        intensity = round(intensity, 2)
-
-        # print(f"[LOG] >>> Final intensity for {planet_name}: {intensity:.2f}")
-        # print("[LOG] ----------------------------------------\n")
-
-        # Return numeric intensity + a label if combust/cazimi
-        return intensity, combustion_status
+        intensity = np.round(np.clip(intensity * 1.5, 0, 10), 2)
 
+        # Size: logarithmic distance scaling, lightly weighted by physical diameter
+        log_distance = np.log10(distance_au + 1)
+        min_log = log_distance.min(axis=-1, keepdims=True)
+        max_log = log_distance.max(axis=-1, keepdims=True)
+        spread = np.where(max_log > min_log, max_log - min_log, 1.0)
+        distance_size = (
+            ((max_log - log_distance) / spread) * (MAX_DISTANCE_SIZE - MIN_DISTANCE_SIZE) + MIN_DISTANCE_SIZE
+        )
+        normalized_size = 0.85 * distance_size + 0.15 * DIAMETER_SIZES[planet_index]
 
-    
-    
-    @staticmethod
-    def calculate_gradient_properties(planet_name: str, intensity: float, normalized_size: float, hour_ruler: str, day_ruling_planet: str) -> dict:
-        """
-        Refined gradient generation with balanced ruling effects and dynamic scaling.
-        """
-        # print(f"\n[LOG] --- Calculating gradient for {planet_name} ---")
-        # print(f"[LOG] Incoming normalized_size: {normalized_size:.2f}")
-        # print(f"[LOG] Incoming intensity: {intensity:.2f}")
-        
-        # Verify planet colors
-        planet_colors = PLANETARY_COLORS.get(planet_name)
-        if not planet_colors or not isinstance(planet_colors, dict):
-            return HeatmapCalculator._default_gradient(planet_name, normalized_size)
-        
-        gradient_stops = planet_colors.get("gradient_stops")
-        if not gradient_stops:
-            return HeatmapCalculator._default_gradient(planet_name, normalized_size)
-        
-        # Ruling multiplier adjustments
-        ruling_multiplier = 1.0
-        if planet_name == hour_ruler and planet_name == day_ruling_planet:
-            ruling_multiplier = 2.5  # Rules both
-            # print(f"[LOG] {planet_name} rules both hour & day -> multiplier = {ruling_multiplier}")
-        elif planet_name == hour_ruler:
-            ruling_multiplier = 1.8  # Hour ruler
-            # print(f"[LOG] {planet_name} is hour ruler -> multiplier = {ruling_multiplier}")
-        elif planet_name == day_ruling_planet:
-            ruling_multiplier = 1.3  # Day ruler
-            # print(f"[LOG] {planet_name} is day ruler -> multiplier = {ruling_multiplier}")
-        
+        # Gradient radii and opacities
+        ruling_multiplier = np.where(rules_both, 2.5, np.where(is_hour_ruler, 1.8, np.where(is_day_ruler, 1.3, 1.0)))
         relative_intensity = intensity / 10
-        # print(f"[LOG] Relative intensity (0-1): {relative_intensity:.3f}")
-        # print(f"[LOG] Ruling multiplier: {ruling_multiplier}")
-        
-        # Logarithmic scaling for base size
-        base_size = math.log(normalized_size + 1) * 200 * ruling_multiplier
-        core_radius = base_size
-        
-        # Dynamic gradient length based on intensity
-        gradient_length = base_size * (0.2 + relative_intensity * 0.1)
-        inner_radius = core_radius + gradient_length * 0.2
-        outer_radius = core_radius + gradient_length * 0.4
-        
-        # print(f"\n[LOG] Size calculations:")
-        # print(f"[LOG] Base size (with ruling multiplier) = {base_size:.2f}")
-        # print(f"[LOG] Core radius = {core_radius:.2f}")
-        # print(f"[LOG] Gradient length = {gradient_length:.2f}")
-        # print(f"[LOG] Additional spread beyond core:")
-        # print(f"[LOG] - Inner: +{inner_radius - core_radius:.2f}")
-        # print(f"[LOG] - Outer: +{outer_radius - core_radius:.2f}")
-        
-        # Adjust opacity for contrast
-        core_opacity = min(1.0, 0.5 + relative_intensity * 0.4 + ruling_multiplier * 0.2)
-        inner_opacity = max(0.05, 0.15 * ruling_multiplier)
-        outer_opacity = max(0.01, 0.02 * ruling_multiplier)
-        
-        def opacity_to_hex(opacity):
-            opacity = max(0, min(1, opacity))
-            return format(int(opacity * 255), '02x').upper()
-        
-        gradient_data = {
-            "core": {
-                "radius": core_radius,
-                "color": f"{gradient_stops['core']}{opacity_to_hex(core_opacity)}"
-            },
-            "inner": {
-                "radius": inner_radius,
-                "color": f"{gradient_stops['inner']}{opacity_to_hex(inner_opacity)}"
-            },
-            "outer": {
-                "radius": outer_radius,
-                "color": f"{gradient_stops['outer']}{opacity_to_hex(outer_opacity)}"
-            }
-        }
-        
-        # print(f"[LOG] Final gradient data for {planet_name}: {gradient_data}")
-        # print("[LOG] ----------------------------------------\n")
-        return gradient_data
+        core_radius = np.log(normalized_size + 1) * 200 * ruling_multiplier
+        gradient_length = core_radius * (0.2 + relative_intensity * 0.1)
 
+        return {
+            "intensity": intensity,
+            "combustion_modifier": combustion_modifier,
+            "phase_modifier": phase_modifier,
+            "normalized_size": normalized_size,
+            "ruling_multiplier": ruling_multiplier,
+            "core_radius": core_radius,
+            "inner_radius": core_radius + gradient_length * 0.2,
+            "outer_radius": core_radius + gradient_length * 0.4,
+            "core_opacity": np.minimum(1.0, 0.5 + relative_intensity * 0.4 + ruling_multiplier * 0.2),
+            "inner_opacity": np.maximum(0.05, 0.15 * ruling_multiplier),
+            "outer_opacity": np.maximum(0.01, 0.02 * ruling_multiplier),
+        }
 
 
     @staticmethod
-    def _default_gradient(planet_name: str, normalized_size: float) -> dict:
-        """
-        Provide a fallback gradient if the planet's colors or gradient stops are missing,
-        now with a debug log.
-        """
-        print(f"[LOG] _default_gradient() called for {planet_name}; normalized_size={normalized_size:.2f}")
-        fallback = {
-            "core": {
-                "radius": normalized_size,
-                "color": "#FFFFFF"
-            },
-            "inner": {
-                "radius": normalized_size * 1.5,
-                "color": "#DDDDDD"
-            },
-            "outer": {
-                "radius": normalized_size * 2.0,
-                "color": "#AAAAAA"
-            }
-        }
-        # print(f"[LOG] Fallback gradient for {planet_name}: {fallback}")
-        return fallback
-    
+    def _opacity_hex(opacity):
+        return OPACITY_HEX[int(max(0.0, min(1.0, opacity)) * 255)]
 
 
-   
     @staticmethod
     def calculate_heatmap_properties(ephemeris_data, hour_ruler, day_ruling_planet):
         """
         Process planetary positions to generate heatmap data, accessing fields as dictionaries.
 
+        Scoring runs once over column arrays (see score_arrays); this method only
+        converts the dataset to columns and the result arrays back to entries.
+
         Args:
             ephemeris_data (dict): Ephemeris data containing "planets" key.
-            ruling_planet (str): The planet ruling the current hour.
+            hour_ruler (str): The planet ruling the current hour (may be None).
             day_ruling_planet (str): The planet ruling the current day.
 
         Returns:
             list: A list of dictionaries, each representing a planet's heatmap data.
         """
-        heatmap_data = []
         planetary_positions = ephemeris_data.get("planets", {})
-        
-        for planet_name, position in planetary_positions.items():
-            try:
-                # Access fields dynamically from position
-                altitude = position.get("altitude", 0)
-                azimuth = position.get("azimuth", 0)
-                distance_au = position.get("distance_au", 1.0)
-                angular_distance = position.get("angular_distance", 1.0)  # Fixed typo here
-                is_retrograde = position.get("is_retrograde", False)
-                is_stationary = position.get("is_stationary", False)
-                daily_motion = position.get("daily_motion", 0)
-                longitude = position.get("longitude", 0)
-                sign = position.get("sign", "")
-                phase_angle = position.get("phase_angle", 0)
-                is_cazimi = position.get("is_cazimi", False)
-                is_combust = position.get("is_combust", False)
-                is_out_of_bounds = position.get("is_out_of_bounds", False)
-
-                # Determine if the current planet is ruling or day ruling
-                is_ruling_planet = planet_name.lower() == hour_ruler.lower()
-                is_day_ruling_planet = planet_name.lower() == day_ruling_planet.lower()
-
-                # Combustion and cazimi data
-                combustion_data = HeatmapCalculator.calculate_combustion_cazimi_modifier(position)
-
-                # Moon-specific modifiers and warnings
-                phase_modifier = 0
-                moon_warning = None
-                if planet_name == "Moon":
-                    # Phase modifier
-                    moon_phase_data = HeatmapCalculator.calculate_moon_phase_modifier(position)
-                    phase_modifier = moon_phase_data["phase_modifier"]
-                    # Add Moon-specific warnings
-                    moon_warning = []
-                    if is_combust:
-                        moon_warning.append("The Moon is combust. Avoid critical actions.")
-                    if is_out_of_bounds:
-                        moon_warning.append("The Moon is out of bounds. Exercise caution in decisions.")
-
-                # Calculate intensity
-                intensity = HeatmapCalculator.calculate_planet_intensity(
-                    planet_name, position, hour_ruler, day_ruling_planet
-                )[0]  # Only take intensity, not status
-                
-                # Calculate planet normalized size 
-                normalized_planet_size = HeatmapCalculator.normalize_planet_size(
-                    planet_name,
-                    planetary_positions
-                )
-                
-                gradient_props = HeatmapCalculator.calculate_gradient_properties(
-                    planet_name, 
-                    intensity,
-                    normalized_planet_size,
-                    hour_ruler,
-                    day_ruling_planet 
-                )
-                
-                # Create a heatmap entry
-                heatmap_entry = {
-                    # Raw Planets Data
-                    "planet": planet_name,
-                    "altitude": round(altitude, 2),
-                    "azimuth": round(azimuth, 2),
-                    "distance_au": round(distance_au, 3),
-                    "angular_distance": angular_distance,
-                    "is_retrograde": is_retrograde,
-                    "is_stationary": is_stationary,
-                    "daily_motion": daily_motion,
-                    "longitude": round(longitude, 2),
-                    "sign": sign,
-                    "is_ruling_planet": is_ruling_planet,
-                    "is_day_ruling_planet": is_day_ruling_planet,
-                    "is_cazimi": is_cazimi,
-                    "is_combust": is_combust,
-                    
-                    # Heatmap Calculator Data
-                    "combustion_modifier": combustion_data["combustion_modifier"],
-                    "combustion_status": combustion_data["combustion_status"],
-                    "phase_angle": round(phase_angle, 2) if planet_name == "Moon" else None,
-                    "is_out_of_bounds": is_out_of_bounds if planet_name == "Moon" else None,
-                    "phase_modifier": phase_modifier,
-                    "intensity": intensity,
-                    "color": PLANETARY_COLORS[planet_name]["gradient_stops"]["core"],
-                    "normalized_planet_size": normalized_planet_size,
-                    "gradient": gradient_props,
-                    
-                    "warnings": moon_warning if planet_name == "Moon" else None,
-                }
-
-                heatmap_data.append(heatmap_entry)
-
-            except Exception as e:
-                print(f"Error processing {planet_name}: {e}")
-                      
-        return heatmap_data
-    
+        names, columns = HeatmapCalculator.planets_to_columns(planetary_positions)
+        if not names:
+            return []
 
+        is_hour_ruler, is_day_ruler = HeatmapCalculator.ruler_masks(
+            columns["planet_index"], hour_ruler, day_ruling_planet
+        )
+        scores = HeatmapCalculator.score_arrays(
+            columns["planet_index"], columns["distance_au"], columns["altitude"], columns["sign_index"],
+            columns["is_combust"], columns["is_cazimi"], columns["phase_angle"], is_hour_ruler, is_day_ruler,
+        )
+        scores = {key: value.tolist() for key, value in scores.items()}
+        is_hour_ruler = is_hour_ruler.tolist()
+        is_day_ruler = is_day_ruler.tolist()
 
+        heatmap_data = []
+        for i, planet_name in enumerate(names):
+            position = planetary_positions[planet_name]
+            is_moon = planet_name == "Moon"
+            is_combust = position.get("is_combust", False)
+            is_out_of_bounds = position.get("is_out_of_bounds", False)
+            combustion_modifier = scores["combustion_modifier"][i]
+
+            # Moon-specific warnings
+            moon_warning = None
+            if is_moon:
+                moon_warning = []
+                if is_combust:
+                    moon_warning.append("The Moon is combust. Avoid critical actions.")
+                if is_out_of_bounds:
+                    moon_warning.append("The Moon is out of bounds. Exercise caution in decisions.")
+
+            stops = GRADIENT_STOPS[PLANET_INDEX[planet_name]]
+            if stops:
+                gradient_props = {
+                    "core": {
+                        "radius": scores["core_radius"][i],
+                        "color": f"{stops['core']}{HeatmapCalculator._opacity_hex(scores['core_opacity'][i])}"
+                    },
+                    "inner": {
+                        "radius": scores["inner_radius"][i],
+                        "color": f"{stops['inner']}{HeatmapCalculator._opacity_hex(scores['inner_opacity'][i])}"
+                    },
+                    "outer": {
+                        "radius": scores["outer_radius"][i],
+                        "color": f"{stops['outer']}{HeatmapCalculator._opacity_hex(scores['outer_opacity'][i])}"
+                    },
+                }
+            else:
+                gradient_props = HeatmapCalculator._default_gradient(planet_name, scores["normalized_size"][i])
+
+            heatmap_data.append({
+                # Raw Planets Data
+                "planet": planet_name,
+                "altitude": round(position.get("altitude", 0), 2),
+                "azimuth": round(position.get("azimuth", 0), 2),
+                "distance_au": round(columns["distance_au"][i].item(), 3),
+                "angular_distance": position.get("angular_distance", 1.0),
+                "is_retrograde": position.get("is_retrograde", False),
+                "is_stationary": position.get("is_stationary", False),
+                "daily_motion": position.get("daily_motion", 0),
+                "longitude": round(position.get("longitude", 0), 2),
+                "sign": position.get("sign", ""),
+                "is_ruling_planet": is_hour_ruler[i],
+                "is_day_ruling_planet": is_day_ruler[i],
+                "is_cazimi": position.get("is_cazimi", False),
+                "is_combust": is_combust,
+
+                # Heatmap Calculator Data
+                "combustion_modifier": 0.5 if combustion_modifier == 0.5 else (-1.8 if combustion_modifier < 0 else 0),
+                "combustion_status": "Cazimi" if combustion_modifier > 0 else ("Combust" if combustion_modifier < 0 else "None"),
+                "phase_angle": round(position.get("phase_angle", 0), 2) if is_moon else None,
+                "is_out_of_bounds": is_out_of_bounds if is_moon else None,
+                "phase_modifier": scores["phase_modifier"][i] if is_moon else 0,
+                "intensity": scores["intensity"][i],
+                "color": stops["core"] if stops else "#FFFFFF",
+                "normalized_planet_size": scores["normalized_size"][i],
+                "gradient": gradient_props,
+
+                "warnings": moon_warning,
+            })
 
-   
-    
\ No newline at end of file
+        return heatmap_data
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+from app.routes.utils.timeline_calculator import TimelineCalculator
+from app.utils.admission import ConcurrencyLimiter
+from app.utils.single_flight import SingleFlight
+
+# Locations are snapped to cells of this size (degrees) so nearby clients share a field
+FIELD_CELL_DEGREES = 0.1
+
+# Grid limits (pixels); the default grid is one pixel per degree
+DEFAULT_FIELD_WIDTH = 360
+DEFAULT_FIELD_HEIGHT = 180
+MAX_FIELD_WIDTH = 1440
+MAX_FIELD_HEIGHT = 720
+TILE_SIZE = 256
+
+# Summed intensity mapped to 255; a single planet peaks at 10 and the wide
+# kernels overlap, so the scale leaves room for two planets at full strength
+FIELD_FULL_SCALE = 20.0
+
+# The front end draws 90 degrees of altitude over roughly 360px, so a gradient
+# radius of N px spans N / 4 degrees of sky
+GRADIENT_PIXELS_PER_DEGREE = 4.0
+
+FIELD_CACHE_SIZE = 128
+
+_field_cache = OrderedDict()
+_field_cache_lock = threading.Lock()
+
+# Concurrent misses on one key share a render; distinct renders are bounded
+field_flight = SingleFlight("heatmap_field")
+field_limiter = ConcurrencyLimiter("heatmap_field", max_active=2, max_waiting=16)
+
+
+def field_cell(latitude, longitude):
+    """Snap a location to the centre of its cache cell."""
+    return (
+        round(round(latitude / FIELD_CELL_DEGREES) * FIELD_CELL_DEGREES, 4),
+        round(round(longitude / FIELD_CELL_DEGREES) * FIELD_CELL_DEGREES, 4),
+    )
+
+
+class HeatmapFieldRenderer:
+    """
+    Server-side rendering of the combined planetary intensity field.
+
+    The sky is sampled on an equirectangular alt/az grid (azimuth 0-360 left to
+    right, altitude +90 at the top to -90 at the bottom). Every planet adds a
+    kernel centred on its position whose falloff follows the client's radial
+    gradient stops (core, inner at half radius, transparent at the outer
+    radius), weighted by the planet's intensity.
+    """
+
+    @staticmethod
+    def render_field(altitude, azimuth, intensity, outer_radius, core_opacity, inner_opacity,
+                     width=DEFAULT_FIELD_WIDTH, height=DEFAULT_FIELD_HEIGHT):
+        """
+        Evaluate the field for one instant.
+
+        Args:
+            altitude, azimuth (np.ndarray): Planet positions in degrees, shape (planets,).
+            intensity (np.ndarray): Heatmap intensity per planet (0-10).
+            outer_radius (np.ndarray): Gradient outer radius per planet (client px).
+            core_opacity, inner_opacity (np.ndarray): Gradient stop opacities per planet.
+            width, height (int): Grid size in pixels.
+
+        Returns:
+            np.ndarray: (height, width) uint8 field, 255 = FIELD_FULL_SCALE.
+        """
+        # Pixel centres as column/row vectors so every kernel broadcasts to (height, width)
+        grid_alt = np.radians(90 - (np.arange(height) + 0.5) * (180 / height))[:, None]
+        grid_az = np.radians((np.arange(width) + 0.5) * (360 / width))[None, :]
+        sin_alt, cos_alt = np.sin(grid_alt), np.cos(grid_alt)
+
+        field = np.zeros((height, width), dtype=np.float32)
+        for i in range(len(intensity)):
+            if intensity[i] <= 0 or outer_radius[i] <= 0:
+                continue
+            planet_alt = np.radians(altitude[i])
+            planet_az = np.radians(azimuth[i])
+
+            # Great-circle separation from the planet, in degrees
+            cos_separation = (
+                sin_alt * np.sin(planet_alt) +
+                cos_alt * np.cos(planet_alt) * np.cos(grid_az - planet_az)
+            )
+            separation = np.degrees(np.arccos(np.clip(cos_separation, -1, 1)))
+
+            # Piecewise-linear falloff through the gradient stops, relative to the core
+            r = separation / (outer_radius[i] / GRADIENT_PIXELS_PER_DEGREE)
+            inner = inner_opacity[i] / core_opacity[i] if core_opacity[i] > 0 else 0.0
+            kernel = np.where(r < 0.5, 1 - (1 - inner) * 2 * r, np.maximum(inner * (2 - 2 * r), 0))
+            field += (intensity[i] * kernel).astype(np.float32)
+
+        return np.clip(field * (255 / FIELD_FULL_SCALE), 0, 255).round().astype(np.uint8)
+
+
+    @staticmethod
+    def get_field(latitude, longitude, at=None, width=DEFAULT_FIELD_WIDTH, height=DEFAULT_FIELD_HEIGHT):
+        """
+        Return the field for a location and minute, rendering it at most once.
+
+        Fields are cached by (location cell, minute, grid size) in a small LRU, so
+        every client in the same cell during the same minute gets the same buffer.
+        Concurrent misses on the same key wait for one render.
+
+        Returns:
+            tuple: (cache key, (height, width) uint8 array)
+
+        Raises:
+            Overloaded: Too many distinct fields are already being rendered.
+        """
+        at = (at or datetime.now(dt_timezone.utc)).replace(second=0, microsecond=0)
+        cell = field_cell(latitude, longitude)
+        key = (cell, at.strftime('%Y-%m-%dT%H:%M'), width, height)
+
+        with _field_cache_lock:
+            field = _field_cache.get(key)
+            if field is not None:
+                _field_cache.move_to_end(key)
+                return key, field
+
+        def render():
+            with field_limiter.slot():
+                calculator = TimelineCalculator(latitude=cell[0], longitude=cell[1], start_utc=at, frames=1)
+                series, scores, _, _ = calculator.score_frames()
+                field = HeatmapFieldRenderer.render_field(
+                    series["altitude"][0],
+                    series["azimuth"][0],
+                    scores["intensity"][0],
+                    scores["outer_radius"][0],
+                    scores["core_opacity"][0],
+                    scores["inner_opacity"][0],
+                    width=width,
+                    height=height,
+                )
+            field.setflags(write=False)
+
+            with _field_cache_lock:
+                _field_cache[key] = field
+                _field_cache.move_to_end(key)
+                while len(_field_cache) > FIELD_CACHE_SIZE:
+                    _field_cache.popitem(last=False)
+            return field
+
+        return key, field_flight.do(key, render)
+
+
+    @staticmethod
+    def tile(field, column, row, tile_size=TILE_SIZE):
+        """Slice one tile out of a field (edge tiles may be smaller)."""
+        height, width = field.shape
+        if column < 0 or row < 0 or column * tile_size >= width or row * tile_size >= height:
+            raise ValueError(f"Tile {column},{row} is outside the {width}x{height} field.")
+        return field[row * tile_size:(row + 1) * tile_size, column * tile_size:(column + 1) * tile_size]
+
+
+    @staticmethod
+    def encode_png(field):
+        """Encode a uint8 field as an 8-bit grayscale PNG (no imaging dependency needed)."""
+        height, width = field.shape
+
+        def chunk(kind, data):
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+        # Every scanline starts with filter type 0
+        scanlines = np.hstack([np.zeros((height, 1), dtype=np.uint8), field]).tobytes()
+        return b"".join([
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(scanlines, 6)),
+            chunk(b"IEND", b""),
+        ])
@@ -0,0 +1,107 @@
+from app.routes.constants import DAY_RULERS, ORDINAL_NAMES, PLANETARY_ORDER
+from app.utils.logging_config import get_logger
+
+logger = get_logger("time")
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Ruler of every planetary hour: one row per weekday (Monday first, like
+# datetime.weekday()), one column per hour from sunrise: the 12 day hours then
+# the 12 night hours. Each day starts with its own ruler and the hours follow
+# the Chaldean order without a break, so the next day's first hour continues it.
+HOUR_RULERS = tuple(
+    tuple(
+        PLANETARY_ORDER[(PLANETARY_ORDER.index(day_ruler) + position) % len(PLANETARY_ORDER)]
+        for position in range(24)
+    )
+    for day_ruler in DAY_RULERS
+)
+
+
+def hour_position(hour):
+    """
+    Column of an hour in HOUR_RULERS.
+
+    Args:
+        hour (int): 1 to 12 for day hours, -1 to -12 for night hours.
+
+    Returns:
+        int: 0 to 23, counted from sunrise.
+    """
+    if 1 <= hour <= 12:
+        return hour - 1
+    if -12 <= hour <= -1:
+        return 11 - hour
+    raise ValueError(f"Invalid planetary hour {hour}, expected 1..12 or -1..-12")
+
+
+def weekday_index(weekday):
+    """Accept a datetime.weekday() number or a day name."""
+    if isinstance(weekday, str):
+        return WEEKDAYS.index(weekday.capitalize())
+    return weekday
+
+
+def hour_ruler(weekday, hour):
+    """
+    Planet ruling an hour of a planetary day.
+
+    Args:
+        weekday (int | str): Day the hour belongs to (0 = Monday, or "Monday").
+        hour (int): 1 to 12 for day hours, -1 to -12 for night hours.
+
+    Returns:
+        str: The ruling planet.
+    """
+    return HOUR_RULERS[weekday_index(weekday)][hour_position(hour)]
+
+
+def hour_name(weekday, hour):
+    """MagicHourEntity label of an hour, e.g. Hour_3rd_Of_Night_Friday."""
+    segment = "Day" if hour > 0 else "Night"
+    return f"Hour_{ORDINAL_NAMES[abs(hour) - 1]}_Of_{segment}_{WEEKDAYS[weekday_index(weekday)]}"
+
+
+def verify_against_ontology(index=None):
+    """
+    Compare HOUR_RULERS with the hour_ruled_by planets of the MagicHourEntity
+    instances and log every hour where they disagree. The table stays the
+    source of truth; the check only reports drift in the ontology.
+
+    Args:
+        index (OntologyIndex): Index to check (default the shared one).
+
+    Returns:
+        list: (hour name, table ruler, ontology rulers) for each disagreement.
+    """
+    if index is None:
+        from app.utils.ontology_index import get_ontology_index
+        index = get_ontology_index()
+
+    mismatches = []
+    for weekday in range(len(WEEKDAYS)):
+        for hour in [*range(1, 13), *range(-1, -13, -1)]:
+            name = hour_name(weekday, hour)
+            entity = index.get(f"monsieur:MagicHourEntity/{name}")
+            if entity is None:
+                continue
+            relationships = (entity["data"].get("discoveredRelationships") or {}).get("hasRelationshipWith") or []
+            rulers = [
+                (relationship.get("relatedEntity") or {}).get("label")
+                for relationship in relationships
+                if relationship.get("relationshipType") == "hour_ruled_by"
+                and str((relationship.get("relatedEntity") or {}).get("uri", "")).startswith("monsieur:PlanetEntity/")
+            ]
+            expected = hour_ruler(weekday, hour)
+            if rulers and expected not in rulers:
+                mismatches.append((name, expected, rulers))
+
+    if mismatches:
+        logger.warning(
+            "Ontology disagrees with the Chaldean hour rulers for %d hours (using the table): %s",
+            len(mismatches),
+            ", ".join(f"{name} {'/'.join(rulers)} != {expected}" for name, expected, rulers in mismatches),
+        )
+    else:
+        logger.info("Hour ruler table matches the ontology")
+    return mismatches
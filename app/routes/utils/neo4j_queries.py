@@ -1,6 +1,9 @@
 from app.routes.constants import neo4j_driver
 from app.routes.utils.ephemeris_calculator import EphemerisCalculator
 from app.routes.constants import ORDINAL_NAMES
+from app.utils.logging_config import get_logger
+
+logger = get_logger("neo4j")
 
 
 class Neo4jQueries:
@@ -11,25 +14,26 @@ class Neo4jQueries:
     def __init__(self, ephemeris_calculator: EphemerisCalculator = None):
         self.driver = neo4j_driver  # Initialize Neo4j driver from constants
         self.ephemeris_calculator = ephemeris_calculator  # Optional dependency
-        print(f"DEBUG: Initialized Neo4jQueries with EphemerisCalculator: {self.ephemeris_calculator}")
+        logger.debug("Initialized Neo4jQueries with EphemerisCalculator: %s", self.ephemeris_calculator)
 
 
-    def format_hour_name(self, hour_index):
+    def format_hour_name(self, hour_index, weekday=None):
         """
         Format hour name for Neo4j query.
         
         Args:
             hour_index (int): Hour number (1 to 12 for day, -1 to -12 for night)
                             Negative numbers automatically become Night hours
+            weekday (str): Day name, e.g. "Wednesday" (default: the calculator's local day)
         """
-        if not self.ephemeris_calculator:
+        if weekday is None and not self.ephemeris_calculator:
             raise ValueError("EphemerisCalculator is required to format hour names.")
         
         # Use absolute value to get the ordinal name (converts -4 to 4th, etc)
         ordinal_idx = abs(hour_index)
         # Use sign to determine day/night (negative becomes Night)
         day_segment = 'Day' if hour_index > 0 else 'Night'
-        weekday = self.ephemeris_calculator.now_local.strftime('%A')
+        weekday = weekday or self.ephemeris_calculator.now_local.strftime('%A')
         
         # This creates URIs like "Hour_4th_Of_Night_Wednesday" from -4
         # or "Hour_4th_Of_Day_Wednesday" from 4
@@ -52,7 +56,7 @@ class Neo4jQueries:
                 labels(connectedNode) AS nodeLabels,
                 properties(connectedNode) AS nodeProperties
             """
-            results = [record.data() for record in session.run(query)]
+            results = [record.data() for record in session.run(query, query_name="fetch_hour_data")]
 
             simplified = {
                 "hour": None,
@@ -115,11 +119,25 @@ class Neo4jQueries:
                 properties(r2) AS planetRelationshipProperties,
                 labels(planet) AS planetLabels
             """
-            results = session.run(query, hour_uri=hour_name)
+            results = session.run(query, hour_uri=hour_name, query_name="fetch_hour_graph")
             return [record.data() for record in results]
 
 
 
+    def fetch_graph_version(self):
+        """
+        The stamp ontologies/__ontology_upload.py writes after every upload.
+
+        Returns:
+            str: The current version, or None if the graph was never stamped.
+        """
+        with self.driver.session() as session:
+            query = "MATCH (v:OntologyVersion { id: 'current' }) RETURN v.version AS version"
+            record = session.run(query, query_name="fetch_graph_version").single()
+            return record["version"] if record else None
+
+
+
     # Placeholder for additional queries
     def query_planetary_data(self, planetary_positions):
         pass
@@ -0,0 +1,298 @@
+import bisect
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from pytz import timezone as pytz_timezone
+from skyfield.api import wgs84
+from skyfield.almanac import find_discrete, sunrise_sunset
+import numpy as np
+
+from app.routes.constants import DAY_RULERS, EXTENDED_SKYFIELD_IDS
+from app.routes.constants import ephemeris, ts
+from app.routes.utils.ephemeris_calculator import timezone_name_at
+from app.routes.utils.heatmap_calculator import HeatmapCalculator, HEATMAP_PLANETS, PLANET_INDEX
+from app.routes.utils.hour_rulers import HOUR_RULERS
+
+SPAN_DAYS = {"day": 1, "week": 7}
+DEFAULT_FRAMES = {"day": 96, "week": 168}
+MAX_FRAMES = 2016
+
+# Fields returned per planet and frame, in output order
+TIMELINE_FIELDS = ("intensity", "radius", "opacity")
+
+# Padding (days) around the requested span when searching sunrise/sunset events,
+# so the first and last frames always fall inside a complete planetary day
+TIMETABLE_PADDING_DAYS = 1.5
+
+SECONDS_PER_DAY = 86400.0
+
+# Planetary-hour timetables kept for planetary_hour_at, one per location and UTC day
+HOUR_TIMETABLE_CACHE_SIZE = 4096
+
+
+class TimelineCalculator:
+    """
+    Heatmap intensity, radius and opacity for every planet over a series of frames.
+
+    Positions for all frames are computed in one vectorized Skyfield pass per
+    planet, and the hour/day rulers come from a planetary-hour timetable built
+    from the actual sunrise and sunset events, so the ruler bonuses switch
+    exactly at hour boundaries rather than at frame boundaries.
+    """
+
+    def __init__(self, latitude, longitude, start_utc=None, span="day", frames=None):
+        if span not in SPAN_DAYS:
+            raise ValueError(f"Unknown span '{span}', expected one of {', '.join(SPAN_DAYS)}.")
+
+        self.latitude = latitude
+        self.longitude = longitude
+        self.observer = wgs84.latlon(latitude, longitude)
+
+        timezone_name = timezone_name_at(latitude, longitude)
+        if not timezone_name:
+            raise ValueError("Could not determine timezone for the given location.")
+        self.timezone = pytz_timezone(timezone_name)
+
+        self.span = span
+        self.frames = max(1, min(int(frames or DEFAULT_FRAMES[span]), MAX_FRAMES))
+        self.start_utc = (start_utc or datetime.now(dt_timezone.utc)).replace(second=0, microsecond=0)
+        self.step_seconds = SPAN_DAYS[span] * SECONDS_PER_DAY / self.frames
+
+        # Frame times as one Skyfield Time array
+        t0 = ts.from_datetime(self.start_utc)
+        self.times = ts.tt_jd(t0.tt + np.arange(self.frames) * (self.step_seconds / SECONDS_PER_DAY))
+
+
+    def build_hour_timetable(self):
+        """
+        Build the planetary-hour timetable covering all frames.
+
+        Every planetary day runs from sunrise to the next sunrise: 12 day hours
+        between sunrise and sunset, 12 night hours between sunset and the next
+        sunrise, ruled in Chaldean order starting from the ruler of the day.
+
+        Returns:
+            dict: Arrays (one entry per hour) "start_tt", "hour" (1..12 day,
+                  -1..-12 night), "hour_ruler" and "day_ruler" (indices into
+                  HEATMAP_PLANETS), plus the list of "weekday" names.
+
+        Raises:
+            ValueError: If sunrise and sunset can't be determined (polar day/night).
+        """
+        padding = TIMETABLE_PADDING_DAYS
+        t0 = ts.tt_jd(self.times.tt[0] - padding)
+        t1 = ts.tt_jd(self.times.tt[-1] + padding)
+        event_times, events = find_discrete(t0, t1, sunrise_sunset(ephemeris, self.observer))
+
+        start_tt, hours, hour_rulers, day_rulers, weekdays = [], [], [], [], []
+        for i in range(len(events) - 2):
+            # A planetary day is a sunrise (1) followed by a sunset (0) and the next sunrise
+            if not (events[i] == 1 and events[i + 1] == 0 and events[i + 2] == 1):
+                continue
+            sunrise, sunset, next_sunrise = event_times.tt[i:i + 3]
+            day_hours = np.linspace(sunrise, sunset, 13)[:-1]
+            night_hours = np.linspace(sunset, next_sunrise, 13)[:-1]
+
+            local_sunrise = event_times[i].utc_datetime().astimezone(self.timezone)
+            day_ruler = DAY_RULERS[local_sunrise.weekday()]
+            rulers = HOUR_RULERS[local_sunrise.weekday()]
+
+            start_tt.extend(day_hours)
+            start_tt.extend(night_hours)
+            for hour in range(24):
+                hours.append(hour + 1 if hour < 12 else -(hour - 11))
+                hour_rulers.append(PLANET_INDEX[rulers[hour]])
+                day_rulers.append(PLANET_INDEX[day_ruler])
+                weekdays.append(local_sunrise.strftime('%A'))
+
+        if not start_tt or start_tt[0] > self.times.tt[0]:
+            raise ValueError("Could not determine sunrise or sunset times.")
+
+        return {
+            "start_tt": np.array(start_tt),
+            "hour": np.array(hours),
+            "hour_ruler": np.array(hour_rulers),
+            "day_ruler": np.array(day_rulers),
+            "weekday": weekdays,
+        }
+
+
+    def calculate_position_series(self):
+        """
+        Observe every planet once for all frames.
+
+        Returns:
+            dict: (frames, planets) arrays "distance_au", "altitude", "azimuth",
+                  "longitude" in HEATMAP_PLANETS order.
+        """
+        observer_at = (ephemeris['earth'] + self.observer).at(self.times)
+        series = {key: np.empty((self.frames, len(HEATMAP_PLANETS))) for key in ("distance_au", "altitude", "azimuth", "longitude")}
+
+        for i, planet_name in enumerate(HEATMAP_PLANETS):
+            astrometric = observer_at.observe(ephemeris[EXTENDED_SKYFIELD_IDS[planet_name]])
+            alt, az, distance = astrometric.apparent().altaz()
+            series["distance_au"][:, i] = distance.au
+            series["altitude"][:, i] = alt.degrees
+            series["azimuth"][:, i] = az.degrees
+            series["longitude"][:, i] = astrometric.ecliptic_latlon()[1].degrees % 360
+
+        return series
+
+
+    def score_frames(self):
+        """
+        Score all frames with the heatmap engine.
+
+        Returns:
+            tuple: (series, scores, timetable, hour_slot) - the position series,
+                   the score_arrays output, the hour timetable and the timetable
+                   slot of every frame.
+        """
+        # Step 1: Positions for every frame
+        series = self.calculate_position_series()
+
+        # Step 2: Combustion, cazimi and the Moon phase from the Sun's longitude
+        sun = PLANET_INDEX["Sun"]
+        separation = np.abs(series["longitude"] - series["longitude"][:, [sun]])
+        separation = np.where(separation > 180, 360 - separation, separation)
+        not_sun = np.arange(len(HEATMAP_PLANETS)) != sun
+        is_combust = (separation <= 8.5) & not_sun
+        is_cazimi = (separation <= 0.283) & not_sun
+        phase_angle = np.full(separation.shape, np.nan)
+        phase_angle[:, PLANET_INDEX["Moon"]] = separation[:, PLANET_INDEX["Moon"]]
+
+        # Step 3: Rulers per frame from the hour timetable
+        timetable = self.build_hour_timetable()
+        hour_slot = np.searchsorted(timetable["start_tt"], self.times.tt, side="right") - 1
+        planet_index = np.arange(len(HEATMAP_PLANETS))
+        is_hour_ruler = planet_index == timetable["hour_ruler"][hour_slot][:, None]
+        is_day_ruler = planet_index == timetable["day_ruler"][hour_slot][:, None]
+
+        # Step 4: Score every frame at once
+        scores = HeatmapCalculator.score_arrays(
+            planet_index,
+            np.round(series["distance_au"], 6),
+            series["altitude"],
+            (series["longitude"] // 30).astype(np.intp),
+            is_combust,
+            is_cazimi,
+            phase_angle,
+            is_hour_ruler,
+            is_day_ruler,
+        )
+        return series, scores, timetable, hour_slot
+
+
+    def calculate_timeline(self):
+        """
+        Score all frames and pack the fields the client animates.
+
+        Returns:
+            dict: "times" (unix ms per frame), "planets", a (fields, planets, frames)
+                  float32 array under "values", and the hour timetable limited to
+                  the requested span.
+        """
+        _, scores, timetable, hour_slot = self.score_frames()
+        values = np.stack([scores["intensity"], scores["core_radius"], scores["core_opacity"]])
+
+        return {
+            "start": self.start_utc,
+            "step_ms": self.step_seconds * 1000,
+            "times": self.frame_times_ms(),
+            "planets": list(HEATMAP_PLANETS),
+            "fields": list(TIMELINE_FIELDS),
+            # (fields, planets, frames): one contiguous run per planet and field
+            "values": np.ascontiguousarray(values.transpose(0, 2, 1), dtype="<f4"),
+            # Hours that overlap the span, for the client's labels
+            "hours": self.describe_hours(timetable, hour_slot[0], hour_slot[-1]),
+        }
+
+
+    def frame_times_ms(self):
+        """Unix time in milliseconds of every frame."""
+        return [self._tt_to_unix_ms(tt) for tt in self.times.tt.tolist()]
+
+
+    def describe_hours(self, timetable, first_slot, last_slot):
+        """
+        Describe a run of timetable slots.
+
+        Returns:
+            list: One dict per hour with "start" (unix ms), "hour", "weekday",
+                  "hour_ruler" and "day_ruler".
+        """
+        return [
+            {
+                "start": self._tt_to_unix_ms(timetable["start_tt"][slot]),
+                "hour": int(timetable["hour"][slot]),
+                "weekday": timetable["weekday"][slot],
+                "hour_ruler": HEATMAP_PLANETS[timetable["hour_ruler"][slot]],
+                "day_ruler": HEATMAP_PLANETS[timetable["day_ruler"][slot]],
+            }
+            for slot in range(first_slot, last_slot + 1)
+        ]
+
+
+    def _tt_to_unix_ms(self, tt):
+        # Offsets from the first frame; no leap second falls inside a week in practice
+        return int(round(self.start_utc.timestamp() * 1000 + (tt - self.times.tt[0]) * SECONDS_PER_DAY * 1000))
+
+
+
+@lru_cache(maxsize=HOUR_TIMETABLE_CACHE_SIZE)
+def daily_hours(latitude, longitude, utc_date):
+    """
+    The planetary hours around one UTC day, from TimelineCalculator's
+    sunrise-to-sunrise timetable.
+
+    Every moment of the day falls inside one of the hours and is followed by
+    at least one more. The result is shared between callers: don't modify it.
+
+    Returns:
+        tuple: Hour dicts as in TimelineCalculator.describe_hours, in order.
+
+    Raises:
+        ValueError: For a location without a timezone, or without sunrise and
+                    sunset (not cached).
+    """
+    start_utc = datetime(utc_date.year, utc_date.month, utc_date.day, tzinfo=dt_timezone.utc)
+    calculator = TimelineCalculator(latitude, longitude, start_utc=start_utc, span="day")
+    timetable = calculator.build_hour_timetable()
+    return tuple(calculator.describe_hours(timetable, 0, len(timetable["start_tt"]) - 1))
+
+
+def current_and_next_hour(hours, unix_ms):
+    """
+    Find the hour in effect at `unix_ms` and the one after it.
+
+    Args:
+        hours (list): Hour dicts ordered by "start" (unix ms).
+        unix_ms (float): The moment.
+
+    Returns:
+        tuple: (current, upcoming); either is None outside the hours given.
+    """
+    position = bisect.bisect_right([hour["start"] for hour in hours], unix_ms)
+    current = hours[position - 1] if position > 0 else None
+    upcoming = hours[position] if position < len(hours) else None
+    return current, upcoming
+
+
+def planetary_hour_at(latitude, longitude, at):
+    """
+    The planetary hour in effect at a moment. Before sunrise this is a night
+    hour of the previous weekday, as in the timeline and the sky stream.
+
+    Args:
+        latitude (float): Observer latitude.
+        longitude (float): Observer longitude.
+        at (datetime): Aware moment.
+
+    Returns:
+        tuple: (current, upcoming) hour dicts with "start" (unix ms), "hour"
+               (1..12 day, -1..-12 night), "weekday", "hour_ruler" and "day_ruler".
+
+    Raises:
+        ValueError: For a location without a timezone or without sunrise and sunset.
+    """
+    at_utc = at.astimezone(dt_timezone.utc)
+    return current_and_next_hour(daily_hours(latitude, longitude, at_utc.date()), at_utc.timestamp() * 1000)
@@ -0,0 +1,148 @@
+from datetime import datetime, timezone as dt_timezone
+import os
+import time
+
+from app.routes.utils import ephemeris_calculator
+from app.routes.utils.ephemeris_calculator import EphemerisCalculator
+from app.utils.admission import ConcurrencyLimiter
+from app.utils.json_provider import dumps_bytes, loads
+from app.utils.snapshot_cache import SnapshotCache
+from app.utils.timing import span
+
+# "Now" datasets are shared by every request for the same location cell within the
+# same freshness window. Set EPHEMERIS_SNAPSHOT_DIR (ideally on tmpfs, e.g.
+# /dev/shm/monsieur-snapshots) to share them between worker processes.
+SNAPSHOT_TTL_SECONDS = int(os.getenv("EPHEMERIS_SNAPSHOT_TTL", "30"))
+SNAPSHOT_CELL_DEGREES = 0.01
+
+snapshot_cache = SnapshotCache(
+    ttl_seconds=SNAPSHOT_TTL_SECONDS,
+    max_entries=int(os.getenv("EPHEMERIS_SNAPSHOT_CACHE_SIZE", "256")),
+    shared_dir=os.getenv("EPHEMERIS_SNAPSHOT_DIR") or None,
+)
+
+# Distinct snapshots computed at once in this process; requests for a snapshot
+# already being computed wait for it without taking a slot
+ephemeris_limiter = ConcurrencyLimiter("ephemeris", max_active=4, max_waiting=16)
+
+
+def parse_coordinates(latitude, longitude):
+    """
+    Validate request coordinates.
+
+    Returns:
+        tuple: (latitude, longitude) as floats.
+
+    Raises:
+        ValueError: If either value is missing, not a number or out of range.
+    """
+    if latitude is None or longitude is None:
+        raise ValueError("Missing latitude or longitude")
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError("Latitude and longitude must be numbers")
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError("Latitude or longitude out of range")
+    return latitude, longitude
+
+
+def compute_with_calculator(latitude, longitude, at=None):
+    """
+    Build the calculator for a location and time and generate its dataset.
+
+    For callers that also need the calculator itself (sun times, planetary hour).
+
+    Returns:
+        tuple: (EphemerisCalculator, dataset dict)
+    """
+    latitude, longitude = parse_coordinates(latitude, longitude)
+    if at is not None and at.tzinfo is None:
+        at = at.replace(tzinfo=dt_timezone.utc)
+    calculator = EphemerisCalculator(latitude=latitude, longitude=longitude, at=at)
+    return calculator, calculator.generate_ephemeris_dataset()
+
+
+def snapshot_key(latitude, longitude):
+    """
+    The location cell and time bucket a "now" request is served from.
+
+    Returns:
+        tuple: ((cell latitude, cell longitude), bucket number)
+
+    Raises:
+        ValueError: For invalid coordinates.
+    """
+    latitude, longitude = parse_coordinates(latitude, longitude)
+    cell = (
+        round(round(latitude / SNAPSHOT_CELL_DEGREES) * SNAPSHOT_CELL_DEGREES, 4),
+        round(round(longitude / SNAPSHOT_CELL_DEGREES) * SNAPSHOT_CELL_DEGREES, 4),
+    )
+    return cell, int(time.time() // SNAPSHOT_TTL_SECONDS)
+
+
+def compute_snapshot(latitude, longitude, bucket=None):
+    """
+    Serialized "now" dataset for a location, shared through the snapshot cache.
+
+    The location is snapped to a SNAPSHOT_CELL_DEGREES cell and the time to the
+    start of the current SNAPSHOT_TTL_SECONDS bucket, and the dataset is computed
+    for exactly that cell centre and instant, so every worker that computes a
+    key produces the same body.
+
+    Args:
+        latitude (float): Observer latitude.
+        longitude (float): Observer longitude.
+        bucket (int): Time bucket from snapshot_key, for callers that already
+                      keyed other work on it (default the current bucket).
+
+    Returns:
+        bytes: The dataset as JSON.
+
+    Raises:
+        ValueError: For invalid coordinates or a location without a timezone.
+        Overloaded: Too many other snapshots are being computed (see ephemeris_limiter).
+    """
+    cell, current_bucket = snapshot_key(latitude, longitude)
+    if bucket is None:
+        bucket = current_bucket
+    key = (cell, bucket, ephemeris_calculator.PRECISION_MODE)
+
+    def generate():
+        at = datetime.fromtimestamp(bucket * SNAPSHOT_TTL_SECONDS, dt_timezone.utc)
+        with ephemeris_limiter.slot():
+            return dumps_bytes(compute_with_calculator(cell[0], cell[1], at)[1])
+
+    with span("ephemeris.snapshot"):
+        return snapshot_cache.get_or_compute(key, generate)
+
+
+def compute(latitude, longitude, at=None, bucket=None):
+    """
+    Compute the ephemeris dataset for a location.
+
+    Without `at` the dataset comes from the snapshot cache (see compute_snapshot)
+    and is a fresh copy the caller may modify.
+
+    Args:
+        latitude (float): Observer latitude.
+        longitude (float): Observer longitude.
+        at (datetime): Moment to compute for; naive values are taken as UTC
+                       (default now).
+        bucket (int): Snapshot time bucket to use when `at` is not given
+                      (see compute_snapshot).
+
+    Returns:
+        dict: The dataset from EphemerisCalculator.generate_ephemeris_dataset
+              ("planets", "chart", "additional_info").
+
+    Raises:
+        ValueError: For invalid coordinates or a location without a timezone.
+    """
+    if at is not None:
+        return compute_with_calculator(latitude, longitude, at)[1]
+
+    dataset = loads(compute_snapshot(latitude, longitude, bucket))
+    # JSON object keys are strings; house numbers are ints in the dataset
+    dataset["chart"]["houses"] = {int(number): house for number, house in dataset["chart"]["houses"].items()}
+    return dataset
@@ -0,0 +1,330 @@
+import bisect
+import itertools
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+
+from app.routes.constants import DEFAULT_ASPECT_CONFIG, ZODIAC_SIGNS
+from app.routes.utils.heatmap_calculator import HEATMAP_PLANETS
+from app.routes.utils.heatmap_field import field_cell
+from app.routes.utils.timeline_calculator import TimelineCalculator
+from app.utils.logging_config import get_logger
+
+logger = get_logger("ephemeris")
+
+# Seconds between position updates pushed to subscribers
+TICK_SECONDS = float(os.getenv("SKY_STREAM_TICK_SECONDS", "10"))
+
+# Positions are precomputed once per cell at one-minute resolution for a day and
+# interpolated on every tick; the window is rebuilt after REFRESH_HOURS
+WINDOW_FRAMES = 1440
+REFRESH_HOURS = 20
+
+# A producer without subscribers stops after this many seconds
+IDLE_SECONDS = 30
+
+# Messages buffered per subscriber; a client that falls further behind is resynced
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Upcoming events listed in the snapshot
+SNAPSHOT_UPCOMING = 5
+
+_producers = {}
+_registry_lock = threading.Lock()
+
+
+class SkyProducer:
+    """
+    Live planetary state for one location cell, shared by all its subscribers.
+
+    The producer precomputes a day of positions and the event schedule (hour
+    changes, sign ingresses, exact aspects) for the cell, then pushes position
+    deltas every tick and each event at its instant. Subscribers are queues of
+    (event name, payload) tuples; None tells a subscriber the stream ended.
+    """
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.subscribers = set()
+        self.running = True
+        self.state = None
+        self.hour = None
+        self.window = None
+        self._event_cursor = 0
+        self._idle_since = None
+        self._thread = threading.Thread(target=self._run, name=f"sky-stream-{cell[0]},{cell[1]}", daemon=True)
+
+
+    def start(self):
+        self._thread.start()
+
+
+    def build_window(self, start_utc):
+        """
+        Precompute positions and events for the day following `start_utc`.
+
+        Returns:
+            dict: "times_ms" (frame times), unwrapped "longitude"/"azimuth" and
+                  "altitude" (frames, planets) arrays, the "hours" of the window,
+                  the sorted "events" and their "event_times", and "refresh_ms".
+        """
+        calculator = TimelineCalculator(self.cell[0], self.cell[1], start_utc=start_utc, span="day", frames=WINDOW_FRAMES)
+        series = calculator.calculate_position_series()
+        timetable = calculator.build_hour_timetable()
+        times_ms = np.array(calculator.frame_times_ms(), dtype=float)
+
+        # Unwrapped angles interpolate and cross boundaries without 360 jumps
+        longitude = np.unwrap(series["longitude"], period=360, axis=0)
+        azimuth = np.unwrap(series["azimuth"], period=360, axis=0)
+
+        hour_slot = np.searchsorted(timetable["start_tt"], calculator.times.tt, side="right") - 1
+        hours = calculator.describe_hours(timetable, hour_slot[0], hour_slot[-1])
+
+        events = [(hour["start"], "hour", hour) for hour in hours[1:]]
+        events.extend(self._ingress_events(times_ms, longitude))
+        events.extend(self._aspect_events(times_ms, longitude))
+        events.sort(key=lambda event: event[0])
+
+        return {
+            "times_ms": times_ms,
+            "longitude": longitude,
+            "azimuth": azimuth,
+            "altitude": series["altitude"],
+            "hours": hours,
+            "events": events,
+            "event_times": [event[0] for event in events],
+            "refresh_ms": times_ms[0] + REFRESH_HOURS * 3600 * 1000,
+        }
+
+
+    @staticmethod
+    def _crossings(times_ms, values, step):
+        """
+        Find where `values` crosses a multiple of `step` between frames.
+
+        Returns:
+            list: (frame, planet column, interpolated unix ms, boundary index after the crossing)
+        """
+        band = np.floor(values / step)
+        frames, columns = np.nonzero(band[1:] != band[:-1])
+        crossings = []
+        for frame, column in zip(frames.tolist(), columns.tolist()):
+            before, after = values[frame, column], values[frame + 1, column]
+            boundary = step * max(band[frame, column], band[frame + 1, column])
+            fraction = (boundary - before) / (after - before)
+            at = times_ms[frame] + fraction * (times_ms[frame + 1] - times_ms[frame])
+            crossings.append((frame, column, int(round(at)), int(band[frame + 1, column])))
+        return crossings
+
+
+    def _ingress_events(self, times_ms, longitude):
+        events = []
+        for frame, planet, at, sign in self._crossings(times_ms, longitude, 30):
+            events.append((at, "ingress", {
+                "planet": HEATMAP_PLANETS[planet],
+                "sign": ZODIAC_SIGNS[sign % 12],
+                "retrograde": bool(longitude[frame + 1, planet] < longitude[frame, planet]),
+            }))
+        return events
+
+
+    def _aspect_events(self, times_ms, longitude):
+        # Signed separation of every planet pair; an aspect of angle a perfects
+        # whenever separation - a (or separation + a) crosses a multiple of 360
+        pairs = list(itertools.combinations(range(len(HEATMAP_PLANETS)), 2))
+        first, second = (np.array(index) for index in zip(*pairs))
+        separation = longitude[:, first] - longitude[:, second]
+
+        events = []
+        for aspect, config in DEFAULT_ASPECT_CONFIG.items():
+            angle = config["angle"]
+            offsets = (-angle, angle) if 0 < angle < 180 else (-angle,)
+            for offset in offsets:
+                for _, pair, at, _ in self._crossings(times_ms, separation + offset, 360):
+                    events.append((at, "aspect", {
+                        "aspect": aspect,
+                        "planets": [HEATMAP_PLANETS[first[pair]], HEATMAP_PLANETS[second[pair]]],
+                    }))
+        return events
+
+
+    def positions_at(self, now_ms):
+        """Interpolated, rounded positions of every planet at `now_ms`."""
+        window = self.window
+        position = np.interp(now_ms, window["times_ms"], np.arange(len(window["times_ms"])))
+        frame = min(int(position), len(window["times_ms"]) - 2)
+        fraction = position - frame
+
+        def at(values):
+            return values[frame] + fraction * (values[frame + 1] - values[frame])
+
+        longitude = at(window["longitude"]) % 360
+        altitude = at(window["altitude"])
+        azimuth = at(window["azimuth"]) % 360
+        return {
+            planet: {
+                "longitude": round(float(longitude[i]), 2),
+                "sign": ZODIAC_SIGNS[int(longitude[i] // 30)],
+                "altitude": round(float(altitude[i]), 1),
+                "azimuth": round(float(azimuth[i]), 1),
+            }
+            for i, planet in enumerate(HEATMAP_PLANETS)
+        }
+
+
+    def snapshot(self, now_ms):
+        events = self.window["events"][self._event_cursor:self._event_cursor + SNAPSHOT_UPCOMING]
+        return {
+            "cell": list(self.cell),
+            "t": int(now_ms),
+            "planets": self.state,
+            "hour": self.hour,
+            "upcoming": [dict(payload, t=at, event=name) for at, name, payload in events],
+        }
+
+
+    def add(self, subscriber):
+        """Register a subscriber (call with the registry lock held)."""
+        self.subscribers.add(subscriber)
+        self._idle_since = None
+        if self.state is not None:
+            subscriber.put_nowait(("snapshot", self.snapshot(time.time() * 1000)))
+
+
+    def broadcast(self, name, payload):
+        with _registry_lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((name, payload))
+            except queue.Full:
+                # The client fell behind: drop its backlog and resync it
+                self._drain(subscriber)
+                subscriber.put_nowait(("snapshot", self.snapshot(time.time() * 1000)))
+
+
+    @staticmethod
+    def _drain(subscriber):
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
+
+
+    def _start_window(self, now_ms):
+        self.window = self.build_window(datetime.fromtimestamp(now_ms / 1000, dt_timezone.utc))
+        self._event_cursor = bisect.bisect_right(self.window["event_times"], now_ms)
+        starts = [hour["start"] for hour in self.window["hours"]]
+        self.hour = self.window["hours"][max(bisect.bisect_right(starts, now_ms) - 1, 0)]
+
+
+    def _tick(self, now_ms):
+        # Step 1: Events that came due since the last tick, in order
+        window = self.window
+        while self._event_cursor < len(window["events"]) and window["event_times"][self._event_cursor] <= now_ms:
+            at, name, payload = window["events"][self._event_cursor]
+            self._event_cursor += 1
+            if name == "hour":
+                self.hour = payload
+            self.broadcast(name, dict(payload, t=at))
+
+        # Step 2: Position changes at the stream's rounding
+        positions = self.positions_at(now_ms)
+        if self.state is None:
+            self.state = positions
+            self.broadcast("snapshot", self.snapshot(now_ms))
+            return
+        changed = {planet: value for planet, value in positions.items() if self.state.get(planet) != value}
+        self.state = positions
+        if changed:
+            self.broadcast("positions", {"t": int(now_ms), "planets": changed})
+
+
+    def _should_stop(self):
+        with _registry_lock:
+            if self.subscribers:
+                self._idle_since = None
+                return False
+            if self._idle_since is None:
+                self._idle_since = time.monotonic()
+                return False
+            if time.monotonic() - self._idle_since < IDLE_SECONDS:
+                return False
+            self.running = False
+            _producers.pop(self.cell, None)
+            return True
+
+
+    def _run(self):
+        try:
+            self._start_window(time.time() * 1000)
+            while not self._should_stop():
+                now_ms = time.time() * 1000
+                self._tick(now_ms)
+                if now_ms >= self.window["refresh_ms"]:
+                    self._start_window(now_ms)
+
+                # Sleep until the next tick or the next event, whichever is sooner
+                timeout = TICK_SECONDS
+                if self._event_cursor < len(self.window["events"]):
+                    timeout = min(timeout, (self.window["event_times"][self._event_cursor] - now_ms) / 1000)
+                time.sleep(max(timeout, 0.05))
+        except Exception as e:
+            logger.exception("Sky stream for cell %s failed: %s", self.cell, e)
+            with _registry_lock:
+                self.running = False
+                _producers.pop(self.cell, None)
+            self.broadcast("error", {"error": str(e)})
+        finally:
+            with _registry_lock:
+                subscribers = list(self.subscribers)
+            for subscriber in subscribers:
+                try:
+                    subscriber.put_nowait(None)
+                except queue.Full:
+                    self._drain(subscriber)
+                    subscriber.put_nowait(None)
+
+
+def subscribe(latitude, longitude):
+    """
+    Subscribe to the producer for a location's cell, starting it if needed.
+
+    Returns:
+        tuple: (SkyProducer, subscriber queue)
+    """
+    cell = field_cell(latitude, longitude)
+    subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _registry_lock:
+        producer = _producers.get(cell)
+        started = producer is None
+        if started:
+            producer = _producers[cell] = SkyProducer(cell)
+        producer.add(subscriber)
+    if started:
+        producer.start()
+        logger.info("Started sky stream producer for cell %s", cell)
+    return producer, subscriber
+
+
+def find_producer(latitude, longitude):
+    """The running producer for a location's cell, or None; never starts one."""
+    with _registry_lock:
+        producer = _producers.get(field_cell(latitude, longitude))
+    return producer if producer is not None and producer.window is not None else None
+
+
+def unsubscribe(producer, subscriber):
+    with _registry_lock:
+        producer.subscribers.discard(subscriber)
+
+
+def producer_stats():
+    """Active producers and their subscriber counts."""
+    with _registry_lock:
+        return {f"{cell[0]},{cell[1]}": len(producer.subscribers) for cell, producer in _producers.items()}
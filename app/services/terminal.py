@@ -0,0 +1,287 @@
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from pytz import timezone as pytz_timezone
+
+from app.routes.constants import EXTENDED_PLANETARY_ORDER, PLANETARY_ORDER
+from app.routes.utils.ephemeris_calculator import timezone_name_at
+from app.routes.utils import hour_rulers
+from app.routes.utils.heatmap_field import field_cell
+from app.routes.utils.timeline_calculator import planetary_hour_at
+from app.services import ephemeris_service
+from app.utils.json_provider import loads
+from app.utils.ontology_index import get_ontology_index
+from app.utils.prefix_trie import normalize_term
+from app.utils.timing import span
+
+# Examples listed per relationship type in "whois"
+WHOIS_EXAMPLES = 3
+
+COMMANDS = {}
+
+
+class TerminalError(ValueError):
+    """A command that can't be answered; the message is shown in the terminal."""
+
+
+def command(name, usage, description, aliases=()):
+    """Register a handler(session, args) under `name` and its aliases."""
+    def decorator(handler):
+        entry = {"name": name, "usage": usage, "description": description, "handler": handler}
+        for key in (name, *aliases):
+            COMMANDS[key] = entry
+        return handler
+    return decorator
+
+
+class TerminalSession:
+    """
+    What one command may read: the location's cached "now" snapshot (decoded on
+    first use), its cached planetary-hour timetable, and the in-memory ontology
+    index. Nothing here recomputes a dataset that another
+    request in the same time bucket already computed.
+    """
+
+    def __init__(self, latitude=None, longitude=None):
+        self.latitude = latitude
+        self.longitude = longitude
+        self._dataset = None
+
+    def require_location(self):
+        if self.latitude is None or self.longitude is None:
+            raise TerminalError("Location unknown: allow location access or type coordinates (lat, lon) first.")
+
+    @property
+    def dataset(self):
+        if self._dataset is None:
+            self.require_location()
+            self._dataset = loads(ephemeris_service.compute_snapshot(self.latitude, self.longitude))
+        return self._dataset
+
+    def local_time(self, unix_ms):
+        tz = pytz_timezone(timezone_name_at(self.latitude, self.longitude))
+        return datetime.fromtimestamp(unix_ms / 1000, dt_timezone.utc).astimezone(tz).strftime("%H:%M")
+
+
+def execute(query, latitude=None, longitude=None):
+    """
+    Parse and answer one terminal command.
+
+    Args:
+        query (str): The typed command, e.g. "planet mars" or "whois Raphael".
+        latitude, longitude (float): Observer location, needed by sky commands.
+
+    Returns:
+        dict: "command", "response" (text for the terminal) and a small "data" dict.
+
+    Raises:
+        TerminalError: Unknown command, missing argument or location.
+    """
+    words = query.split()
+    if not words:
+        raise TerminalError("Type a command, or 'help' for the list.")
+
+    name, args = words[0].lower(), words[1:]
+    entry = COMMANDS.get(name)
+    if entry is None and name.capitalize() in EXTENDED_PLANETARY_ORDER:
+        # A bare planet name is "planet <name>"
+        entry, args = COMMANDS["planet"], words
+    if entry is None:
+        raise TerminalError(f"Unknown command '{words[0]}'. Type 'help' for the list.")
+
+    session = TerminalSession(latitude, longitude)
+    with span(f"terminal.{entry['name']}"):
+        lines, data = entry["handler"](session, args)
+    return {"command": entry["name"], "response": "\n".join(lines), "data": data}
+
+
+@command("help", "help", "List the commands.", aliases=("?",))
+def help_command(session, args):
+    entries = {entry["name"]: entry for entry in COMMANDS.values()}
+    return [f"> {entry['usage']:<16} {entry['description']}" for entry in entries.values()], {}
+
+
+@command("hour", "hour", "Current planetary hour, its rulers and the next change.")
+def hour_command(session, args):
+    # Step 1: The hour from the cached sunrise-to-sunrise timetable of the
+    # location's cell, the same hours the timeline and the sky stream use
+    session.require_location()
+    cell = field_cell(session.latitude, session.longitude)
+    current, upcoming = planetary_hour_at(cell[0], cell[1], datetime.now(dt_timezone.utc))
+    hour, weekday, day_ruler = current["hour"], current["weekday"], current["day_ruler"]
+    segment = "Day" if hour > 0 else "Night"
+    hour_name = hour_rulers.hour_name(weekday, hour)
+
+    # Step 2: The planet from the hour ruler table, the name and spirits from the ontology
+    planet = hour_rulers.hour_ruler(weekday, hour)
+    entity = get_ontology_index().get(f"monsieur:MagicHourEntity/{hour_name}")
+    rulers = [target["label"] for kind, target in _relationships(entity) if kind == "hour_ruled_by"]
+    spirits = [ruler for ruler in rulers if ruler not in PLANETARY_ORDER]
+
+    title = f"> Hour {abs(hour)} of the {segment.lower()} ({weekday})"
+    if entity and entity["name"]:
+        title += f": {entity['name']}"
+    lines = [title, f"> Ruled by {planet}" + (f", {' and '.join(spirits)}" if spirits else ""), f"> Day ruler: {day_ruler}"]
+    data = {"hour": hour, "hour_name": hour_name, "hour_ruler": planet, "day_ruler": day_ruler}
+    lines.append(f"> Next: hour of {upcoming['hour_ruler']} at {session.local_time(upcoming['start'])}")
+    data["next"] = {"start": upcoming["start"], "hour_ruler": upcoming["hour_ruler"]}
+    return lines, data
+
+
+@command("moon", "moon", "Moon phase, illumination and position.")
+def moon_command(session, args):
+    moon = session.dataset["planets"]["Moon"]
+    lines = [
+        f"> Moon {moon['phase'].lower()}, {moon['illumination_percentage']}% illuminated",
+        f"> {moon['degree']}° {moon['sign']}{' (retrograde)' if moon['is_retrograde'] else ''}",
+        f"> Distance {moon.get('distance_km', 0):,.0f} km, declination {moon['declination']:.2f}°",
+    ]
+    keys = ("phase", "illumination_percentage", "sign", "degree", "declination", "distance_km")
+    return lines, {key: moon.get(key) for key in keys}
+
+
+@command("aspects", "aspects [planet]", "Current aspects, optionally only those of one planet.")
+def aspects_command(session, args):
+    aspects = session.dataset["chart"]["aspects"]
+    if args:
+        planet = _planet_name(args[0])
+        aspects = [aspect for aspect in aspects if planet in (aspect["planet1"], aspect["planet2"])]
+    if not aspects:
+        return ["> No aspects within orb."], {"aspects": []}
+    lines = [
+        f"> {aspect['planet1']} {aspect['aspect'].lower()} {aspect['planet2']} ({aspect['angular_distance']}°)"
+        for aspect in aspects
+    ]
+    return lines, {"aspects": aspects}
+
+
+@command("planet", "planet <name>", "Position, house and aspects of a planet.")
+def planet_command(session, args):
+    if not args:
+        raise TerminalError("Usage: planet <name>, e.g. planet mars")
+    name = _planet_name(args[0])
+    dataset = session.dataset
+    planet = dataset["planets"][name]
+
+    house = next(
+        (int(number) for number, data in dataset["chart"]["houses"].items()
+         if any(occupant.get("name") == name for occupant in data["planets"])),
+        None,
+    )
+    flags = [flag for flag, key in (("retrograde", "is_retrograde"), ("stationary", "is_stationary"),
+                                    ("combust", "is_combust"), ("cazimi", "is_cazimi")) if planet.get(key)]
+    position = f"> {name}: {planet['degree']}° {planet['sign']}"
+    if house is not None:
+        position += f", house {house}"
+    lines = [position + (f" ({', '.join(flags)})" if flags else "")]
+    lines.append(f"> Altitude {planet['altitude']}°, azimuth {planet['azimuth']}°, {planet['distance_au']} AU")
+
+    aspects = [aspect for aspect in dataset["chart"]["aspects"] if name in (aspect["planet1"], aspect["planet2"])]
+    if aspects:
+        lines.append("> Aspects: " + ", ".join(
+            f"{aspect['aspect'].lower()} {aspect['planet2'] if aspect['planet1'] == name else aspect['planet1']}"
+            for aspect in aspects
+        ))
+
+    entity = get_ontology_index().get(f"monsieur:PlanetEntity/{name}")
+    if entity and entity["description"]:
+        lines.append(f"> {entity['description']}")
+    keys = ("longitude", "sign", "degree", "is_retrograde", "altitude", "azimuth", "distance_au")
+    return lines, {"planet": name, "house": house, **{key: planet.get(key) for key in keys}}
+
+
+@command("whois", "whois <name>", "Look up an entity of the ontology and its relationships.", aliases=("who",))
+def whois_command(session, args):
+    if not args:
+        raise TerminalError("Usage: whois <name>, e.g. whois Raphael")
+    query = " ".join(args)
+    index = get_ontology_index()
+    suggestions = index.suggest(query, 20)
+    if not suggestions:
+        raise TerminalError(f"No entity named '{query}'.")
+    wanted = normalize_term(query)
+    suggestion = next(
+        (s for s in suggestions if wanted in (normalize_term(s["name"] or ""), normalize_term(s["label"] or ""))),
+        suggestions[0],
+    )
+    entity = index.get(suggestion["uri"])
+
+    lines = [f"> {entity['name'] or entity['label']} ({entity['type'] or 'Entity'})"]
+    if entity["description"]:
+        lines.append(f"> {entity['description']}")
+    if entity["synonyms"]:
+        lines.append(f"> Also known as: {', '.join(entity['synonyms'])}")
+
+    # Outgoing relationships from the entity's own declaration, incoming ones from the reverse index
+    outgoing = defaultdict(list)
+    for kind, target in _relationships(entity):
+        outgoing[kind].append(target["label"])
+    incoming = _incoming(index).get(entity["uri"], {})
+    for kind, labels in outgoing.items():
+        lines.append(f"> {kind.replace('_', ' ')}: {_examples(labels)}")
+    for kind, labels in incoming.items():
+        lines.append(f"> {kind.replace('_', ' ')} (from): {_examples(labels)}")
+
+    data = {
+        "uri": entity["uri"],
+        "type": entity["type"],
+        "outgoing": {kind: len(labels) for kind, labels in outgoing.items()},
+        "incoming": {kind: len(labels) for kind, labels in incoming.items()},
+    }
+    return lines, data
+
+
+def _planet_name(word):
+    name = word.capitalize()
+    if name not in EXTENDED_PLANETARY_ORDER:
+        raise TerminalError(f"Unknown planet '{word}'. Planets: {', '.join(EXTENDED_PLANETARY_ORDER)}")
+    return name
+
+
+def _examples(labels):
+    shown = ", ".join(labels[:WHOIS_EXAMPLES])
+    return f"{shown} and {len(labels) - WHOIS_EXAMPLES} more" if len(labels) > WHOIS_EXAMPLES else shown
+
+
+def _relationships(entity):
+    """(relationship type, {"uri", "label"}) declared by an entity: discovered relationships and analogies."""
+    if not entity:
+        return []
+    data = entity["data"]
+    relationships = []
+    discovered = (data.get("discoveredRelationships") or {}).get("hasRelationshipWith") or []
+    for relationship in discovered if isinstance(discovered, list) else []:
+        target = relationship.get("relatedEntity") or {}
+        if target.get("uri"):
+            relationships.append((relationship.get("relationshipType") or "related_to", _target(target)))
+    analogies = (data.get("analogyProperties") or {}).get("hasAnalogyWith") or []
+    for analogy in analogies if isinstance(analogies, list) else []:
+        target = analogy.get("targetEntity") or {}
+        if target.get("uri"):
+            relationships.append(("analogy_with", _target(target)))
+    return relationships
+
+
+def _target(target):
+    return {"uri": target["uri"], "label": str(target.get("label") or target["uri"].rsplit("/", 1)[-1])}
+
+
+_incoming_index = {"version": None, "incoming": {}}
+_incoming_lock = threading.Lock()
+
+
+def _incoming(index):
+    """
+    {target uri: {relationship type: [source labels]}}, built once per ontology version.
+    """
+    with _incoming_lock:
+        if _incoming_index["version"] != index.version:
+            incoming = defaultdict(lambda: defaultdict(list))
+            for entity in index.entities.values():
+                source = entity["name"] or entity["label"]
+                for kind, target in _relationships(entity):
+                    incoming[target["uri"]][kind].append(source)
+            _incoming_index["incoming"] = {uri: dict(kinds) for uri, kinds in incoming.items()}
+            _incoming_index["version"] = index.version
+        return _incoming_index["incoming"]
@@ -0,0 +1,76 @@
+// autocomplete.js
+// Entity suggestions for the search bar and the terminal, served by /api/autocomplete
+const MIN_QUERY_LENGTH = 2;
+const DEBOUNCE_MS = 120;
+
+// Remember answers per prefix so backspacing doesn't refetch
+const suggestionCache = new Map();
+
+
+export function attachAutocomplete(input, { fulltext = false } = {}) {
+    if (!input) return;
+
+    const datalist = document.createElement('datalist');
+    datalist.id = `${input.id}Suggestions`;
+    document.body.appendChild(datalist);
+    input.setAttribute('list', datalist.id);
+    input.setAttribute('autocomplete', 'off');
+
+    let timer = null;
+    let lastQuery = '';
+
+    input.addEventListener('input', () => {
+        const query = input.value.trim();
+        clearTimeout(timer);
+
+        if (query.length < MIN_QUERY_LENGTH) {
+            datalist.innerHTML = '';
+            return;
+        }
+
+        timer = setTimeout(() => {
+            lastQuery = query;
+            fetchSuggestions(query, fulltext)
+                .then((suggestions) => {
+                    // Ignore answers for a prefix the user has already typed past
+                    if (query !== lastQuery) return;
+                    renderSuggestions(datalist, suggestions);
+                })
+                .catch((error) => console.error('Autocomplete error:', error));
+        }, DEBOUNCE_MS);
+    });
+}
+
+
+function fetchSuggestions(query, fulltext) {
+    const key = `${fulltext ? 1 : 0}:${query.toLowerCase()}`;
+    if (suggestionCache.has(key)) {
+        return Promise.resolve(suggestionCache.get(key));
+    }
+
+    const params = new URLSearchParams({ q: query, fulltext: fulltext ? '1' : '0' });
+    return fetch(`/api/autocomplete?${params}`)
+        .then((response) => response.json())
+        .then((data) => {
+            const suggestions = data.suggestions || [];
+            suggestionCache.set(key, suggestions);
+            return suggestions;
+        });
+}
+
+
+function renderSuggestions(datalist, suggestions) {
+    datalist.innerHTML = '';
+    suggestions.forEach((suggestion) => {
+        const option = document.createElement('option');
+        option.value = suggestion.name;
+        option.label = suggestion.type ? `${suggestion.label} · ${suggestion.type}` : suggestion.label;
+        datalist.appendChild(option);
+    });
+}
+
+
+document.addEventListener('DOMContentLoaded', () => {
+    attachAutocomplete(document.getElementById('searchInput'), { fulltext: true });
+    attachAutocomplete(document.getElementById('terminalInput'));
+});
@@ -19,23 +19,59 @@ export async function fetchEphemerisData(locationData) {
 
 
 
+// Last chart received, reused when the server answers 304 Not Modified
+let lastChart = { etag: null, svg: null };
+
 /**
-* Fetches chart SVG using ephemeris data
-* @param {Object} ephemerisData - Ephemeris data
+* Fetches chart SVG using ephemeris data or coordinates
+* @param {Object} ephemerisData - Ephemeris data, or {latitude, longitude}
 * @returns {Promise<string>} - SVG content
 */
 async function fetchChartSVG(ephemerisData) {
-  const response = await fetch('/api/chart-svg', {
+  const headers = { 'Content-Type': 'application/json' };
+  if (lastChart.etag) {
+      headers['If-None-Match'] = lastChart.etag;
+  }
+
+  // Symbol defs are only needed once per page, see keepChartSprite()
+  const url = document.getElementById('chartSprite') ? '/api/chart-svg?defs=0' : '/api/chart-svg';
+  const response = await fetch(url, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers,
       body: JSON.stringify(ephemerisData),
   });
 
+  if (response.status === 304 && lastChart.svg) {
+      return lastChart.svg;
+  }
+
   if (!response.ok) {
       throw new Error(`Failed to fetch chart SVG: ${response.statusText}`);
   }
 
-  return await response.text();
+  const svg = await response.text();
+  lastChart = { etag: response.headers.get('ETag'), svg };
+  return svg;
+}
+
+
+
+/**
+* Moves the planet symbol <defs> of a freshly rendered chart into a hidden SVG
+* that outlives the chart, so later charts can be requested without them.
+* @param {HTMLElement} container - The element the chart was rendered into
+*/
+function keepChartSprite(container) {
+  const defs = container.querySelector('svg defs');
+  if (!defs || document.getElementById('chartSprite')) {
+      return;
+  }
+  const sprite = document.createElementNS('http://www.w3.org/2000/svg', 'svg');
+  sprite.id = 'chartSprite';
+  sprite.setAttribute('aria-hidden', 'true');
+  sprite.style.display = 'none';
+  sprite.appendChild(defs);
+  document.body.appendChild(sprite);
 }
 
 
@@ -49,9 +85,10 @@ export async function renderChart(containerId, locationData) {
   const container = document.getElementById(containerId);
 
   try {
-      const ephemerisData = await fetchEphemerisData(locationData);
-      const svgContent = await fetchChartSVG(ephemerisData);
+      // The chart endpoint computes the ephemeris itself from the coordinates
+      const svgContent = await fetchChartSVG(locationData);
       container.innerHTML = svgContent; // Render the SVG content
+      keepChartSprite(container);
   } catch (error) {
       container.innerHTML = `Error rendering chart: ${error.message}`;
   }
@@ -75,6 +75,9 @@
 //     }
 // }
 
+// Last location data was fetched for; terminal commands are answered for it
+export const observerLocation = { latitude: null, longitude: null };
+
 export function geolocateUser(onSuccess, onError) {
     if (navigator.geolocation) {
         navigator.geolocation.getCurrentPosition(
@@ -103,6 +106,7 @@ export function geolocateUser(onSuccess, onError) {
                         throw new Error('Invalid data structure - missing hour data');
                     }
                     
+                    Object.assign(observerLocation, { latitude, longitude });
                     if (onSuccess) onSuccess(data, latitude, longitude);
                 })
                 .catch((error) => {
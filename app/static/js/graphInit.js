@@ -130,6 +130,7 @@ export function loadFullGraph() {
                 return !excludedNodeLabels.includes(node.label);
             }).map(node => ({
                 ...node, // Spread existing node properties
+                title: JSON.stringify(node.properties, null, 2), // Show properties on hover
                 shape: 'dot',
                 size: 16,
                 color: { background: 'lightblue', border: 'blue' },
@@ -139,6 +140,7 @@ export function loadFullGraph() {
                 return !excludedEdgeLabels.includes(edge.label);
             }).map(edge => ({
                 ...edge, // Spread existing edge properties
+                title: JSON.stringify(edge.properties, null, 2),
                 smooth: { type: 'dynamic' },
                 width: 2,
                 color: { color: '#666' },
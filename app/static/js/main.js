@@ -5,6 +5,7 @@ import { updateTerminalWithData } from './terminalOutput.js';
 import { fetchCurrentHourAndFilter } from './graphFiltering.js';
 // import { generateGradient, applyGradientToNetworkContainer } from './heatmap.js';
 import { applyPlanetEnergiesBackground } from './heatmap.js';
+import { subscribeToSky } from './skyStream.js';
 
 // DOMContentLoaded: Initialize the terminal and geolocation logic
 document.addEventListener('DOMContentLoaded', () => {
@@ -31,6 +32,18 @@ document.addEventListener('DOMContentLoaded', () => {
             // Apply the gradient using heatmap data
             console.log('Heatmap Data:', data.heatmap_data);
             applyPlanetEnergiesBackground(data.heatmap_data);
+
+            // Live updates: announce events as they happen instead of polling
+            const announce = (text) => {
+                terminalOutput.textContent += `> ${text}\n`;
+                terminalOutput.scrollTop = terminalOutput.scrollHeight;
+            };
+            subscribeToSky(latitude, longitude, {
+                hour: (hour) => announce(`Planetary hour changed: hour of ${hour.hour_ruler} (day of ${hour.day_ruler})`),
+                ingress: (ingress) => announce(`${ingress.planet} enters ${ingress.sign}${ingress.retrograde ? ' (retrograde)' : ''}`),
+                aspect: (aspect) => announce(`${aspect.planets[0]} ${aspect.aspect.toLowerCase()} ${aspect.planets[1]} is exact`),
+                error: (error) => console.error('Sky stream error:', error.error),
+            });
         },
         (error) => {
             // Display error in the terminal
@@ -0,0 +1,49 @@
+/**
+ * Live sky updates over Server-Sent Events
+ * One EventSource per page replaces re-posting to /api/geolocation_ephemeris:
+ * the server pushes position deltas every few seconds, and hour, ingress and
+ * aspect events at the moment they happen.
+ */
+
+const SKY_EVENTS = ['snapshot', 'positions', 'hour', 'ingress', 'aspect'];
+
+/**
+ * Subscribe to the sky stream for a location
+ * @param {number} latitude
+ * @param {number} longitude
+ * @param {Object} handlers - Callbacks keyed by event name (snapshot, positions, hour, ingress, aspect, error)
+ * @returns {Object} The current planet state, plus close() to end the subscription
+ */
+export function subscribeToSky(latitude, longitude, handlers = {}) {
+    const params = new URLSearchParams({ lat: latitude, lon: longitude });
+    const source = new EventSource(`/api/stream/sky?${params}`);
+    const sky = { planets: {}, hour: null, close: () => source.close() };
+
+    SKY_EVENTS.forEach((name) => {
+        source.addEventListener(name, (event) => {
+            const data = JSON.parse(event.data);
+
+            // Keep a merged view so handlers can read the full state after a delta
+            if (name === 'snapshot') {
+                sky.planets = data.planets;
+                sky.hour = data.hour;
+            } else if (name === 'positions') {
+                Object.assign(sky.planets, data.planets);
+            } else if (name === 'hour') {
+                sky.hour = data;
+            }
+
+            if (handlers[name]) handlers[name](data, sky);
+        });
+    });
+
+    // Server-side failures (e.g. no sunrise at the location) end the stream
+    source.addEventListener('error', (event) => {
+        if (event.data) {
+            source.close();
+            if (handlers.error) handlers.error(JSON.parse(event.data));
+        }
+    });
+
+    return sky;
+}
@@ -1,6 +1,7 @@
 import { loadFullGraph} from './graphInit.js';
 import { fetchCurrentHourAndFilter} from './graphFiltering.js';
 import { updateTerminalWithData} from './terminalOutput.js';
+import { observerLocation } from './geolocationService.js';
 
 // CHAT COMMANDS
 export const chatHandler = {
@@ -22,6 +23,7 @@ export const chatHandler = {
             })
                 .then((response) => response.json())
                 .then((data) => {
+                    Object.assign(observerLocation, { latitude: lat, longitude: lon });
                     fetchCurrentHourAndFilter(data);
                     updateTerminalWithData(data);
                 })
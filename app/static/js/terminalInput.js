@@ -4,6 +4,7 @@ const terminalOutputHandler = document.getElementById('terminalOutput');
 
 // Import chatHandler functions
 import { chatHandler } from './terminalCommands.js';
+import { observerLocation } from './geolocationService.js';
 
 
 terminalInput.addEventListener('keydown', (event) => {
@@ -19,8 +20,13 @@ terminalInput.addEventListener('keydown', (event) => {
             const response = chatHandler.processGraphCommand(userInput);
             displayOutput(response);
         } else {
-            // Send other queries to the backend API
-            fetch(`/api/terminal?query=${encodeURIComponent(userInput)}`)
+            // Send other queries to the backend API, with the location sky commands need
+            const params = new URLSearchParams({ query: userInput });
+            if (observerLocation.latitude !== null) {
+                params.set('lat', observerLocation.latitude);
+                params.set('lon', observerLocation.longitude);
+            }
+            fetch(`/api/terminal?${params}`)
                 .then(response => response.json())
                 .then(data => {
                     displayOutput(data.response);
@@ -0,0 +1,135 @@
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import jsonify
+
+from app.utils.logging_config import get_logger
+from app.utils.metrics import Counter
+
+logger = get_logger("routes")
+
+# Seconds a request may wait for a slot before it is shed with 503
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "3"))
+
+# Retry-After sent with shed requests
+RETRY_AFTER_SECONDS = 1
+
+REJECTED = Counter("admission_rejected_total", "Requests shed by a concurrency limiter.", label=("limiter", "status"))
+
+# Every limiter created in the process, for /metrics
+LIMITERS = []
+
+
+class Overloaded(Exception):
+    """
+    Raised when a limiter sheds a request.
+
+    status is 429 when the wait queue was already full (back off now) and 503
+    when the request waited QUEUE_TIMEOUT_SECONDS without getting a slot.
+    """
+
+    def __init__(self, limiter, status):
+        self.limiter = limiter
+        self.status = status
+        reason = "too many requests waiting" if status == 429 else "timed out waiting"
+        super().__init__(f"Server busy ({limiter}: {reason}), retry shortly")
+
+    def response(self):
+        response = jsonify({"error": str(self)})
+        response.status_code = self.status
+        response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+        return response
+
+
+class ConcurrencyLimiter:
+    """
+    Bounds how many computations of one kind run at once in this process.
+
+    Up to `max_active` callers run; up to `max_waiting` more queue for a slot
+    for at most `queue_timeout` seconds; anyone else is shed immediately. This
+    keeps latency bounded during spikes instead of letting every request slow
+    down together. Limits come from the environment as <NAME>_MAX_ACTIVE and
+    <NAME>_MAX_WAITING, e.g. EPHEMERIS_MAX_ACTIVE.
+    """
+
+    def __init__(self, name, max_active=4, max_waiting=16, queue_timeout=None):
+        self.name = name
+        prefix = name.upper()
+        self.max_active = int(os.getenv(f"{prefix}_MAX_ACTIVE", max_active))
+        self.max_waiting = int(os.getenv(f"{prefix}_MAX_WAITING", max_waiting))
+        self.queue_timeout = QUEUE_TIMEOUT_SECONDS if queue_timeout is None else queue_timeout
+        self._slots = threading.BoundedSemaphore(self.max_active)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        LIMITERS.append(self)
+
+    def acquire(self):
+        """
+        Take a slot; pair every successful call with release().
+
+        Raises:
+            Overloaded: The queue is full (429) or the wait timed out (503).
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.max_waiting:
+                    self._reject(429)
+                self.waiting += 1
+            start = time.monotonic()
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                logger.warning("%s limiter shed a request after %.1f s in queue", self.name, time.monotonic() - start)
+                self._reject(503)
+
+        with self._lock:
+            self.active += 1
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        """Hold one slot for the duration of the block (see acquire)."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _reject(self, status):
+        REJECTED.inc((self.name, status))
+        raise Overloaded(self.name, status)
+
+    def stats(self):
+        with self._lock:
+            return {"active": self.active, "waiting": self.waiting,
+                    "max_active": self.max_active, "max_waiting": self.max_waiting}
+
+
+def limited(limiter):
+    """View decorator: run the whole view inside one of the limiter's slots."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with limiter.slot():
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Turn Overloaded raised anywhere in a request into a 429/503 JSON response."""
+
+    @app.errorhandler(Overloaded)
+    def handle_overloaded(error):
+        return error.response()
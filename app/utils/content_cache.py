@@ -0,0 +1,87 @@
+import os
+import threading
+from collections import OrderedDict
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger("cache")
+
+
+class ContentCache:
+    """
+    Bounded LRU of rendered bodies keyed by a content digest, with an optional
+    disk tier shared by every worker process that points at the same directory.
+
+    Bodies are immutable for a given digest, so disk entries never need
+    invalidation; they are written to a temporary file and renamed into place
+    so readers never see a partial body.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, suffix=""):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.suffix = suffix
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, digest):
+        return os.path.join(self.disk_dir, f"{digest}{self.suffix}")
+
+    def get(self, digest):
+        with self._lock:
+            body = self._entries.get(digest)
+            if body is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return body
+
+        if self.disk_dir:
+            try:
+                with open(self._path(digest), "rb") as f:
+                    body = f.read()
+            except OSError:
+                body = None
+            if body is not None:
+                self._remember(digest, body)
+                with self._lock:
+                    self.disk_hits += 1
+                return body
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, digest, body):
+        self._remember(digest, body)
+        if self.disk_dir:
+            path = self._path(digest)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(body)
+                os.replace(temp_path, path)
+            except OSError as e:
+                logger.warning("Could not write cache entry %s: %s", digest, e)
+
+    def _remember(self, digest, body):
+        with self._lock:
+            self._entries[digest] = body
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "disk_dir": self.disk_dir,
+            }
@@ -3,7 +3,10 @@ from datetime import datetime, timedelta, timezone as dt_timezone
 from skyfield.almanac import find_discrete, sunrise_sunset
 import numpy as np
 
-PLANETARY_ORDER = ['Sun', 'Venus', 'Mercury', 'Moon', 'Saturn', 'Jupiter', 'Mars']
+from app.routes.utils.hour_rulers import hour_ruler
+from app.utils.logging_config import get_logger
+
+logger = get_logger("time")
 
 def determine_planetary_hour(now_local, sunrise_local, sunset_local):
     """
@@ -17,30 +20,28 @@ def determine_planetary_hour(now_local, sunrise_local, sunset_local):
     Returns:
         tuple: The hour index (0-based) and the ruling planet.
     """
-    DAY_RULERS = ['Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Sun']
-    
     # Determine if it's day or night
-    if sunrise_local <= now_local <= sunset_local:
+    is_daytime = sunrise_local <= now_local <= sunset_local
+    if is_daytime:
         # Daytime calculations
         duration = (sunset_local - sunrise_local).total_seconds() / 12
         time_since_sunrise = (now_local - sunrise_local).total_seconds()
         hour_index = int(time_since_sunrise // duration)
-        print(f"DEBUG: Daytime calculation -> Duration per hour: {duration} seconds, Hour index: {hour_index}")
+        logger.debug("Daytime calculation -> Duration per hour: %s seconds, Hour index: %s", duration, hour_index)
     else:
         # Nighttime calculations
         next_sunrise_local = sunrise_local + timedelta(days=1)
         duration = (next_sunrise_local - sunset_local).total_seconds() / 12
         time_since_sunset = (now_local - sunset_local).total_seconds()
         hour_index = int(time_since_sunset // duration)
-        print(f"DEBUG: Nighttime calculation -> Duration per hour: {duration} seconds, Hour index: {hour_index}")
+        logger.debug("Nighttime calculation -> Duration per hour: %s seconds, Hour index: %s", duration, hour_index)
     
-    # Determine the ruling planet for the day and hour
-    day_index = now_local.weekday()  # 0 = Monday, ..., 6 = Sunday
-    day_ruling_planet = DAY_RULERS[day_index]
-    start_planet_index = PLANETARY_ORDER.index(day_ruling_planet)
-    ruling_planet = PLANETARY_ORDER[(start_planet_index + hour_index) % len(PLANETARY_ORDER)]
+    # Determine the ruling planet from the hour ruler table; night hours continue the day's sequence
+    hour_index = min(11, max(0, hour_index))
+    hour = hour_index + 1 if is_daytime else -(hour_index + 1)
+    ruling_planet = hour_ruler(now_local.weekday(), hour)
     
-    print(f"DEBUG: Day ruling planet: {day_ruling_planet}, Start planet index: {start_planet_index}, Ruling planet: {ruling_planet}")
+    logger.debug("Planetary hour: %s, Ruling planet: %s", hour, ruling_planet)
     return hour_index, ruling_planet
 
 
@@ -62,7 +63,7 @@ def get_sun_times(eph, ts, observer, user_timezone):
     now_utc = datetime.now(dt_timezone.utc)
     now_local = now_utc.astimezone(user_timezone)
     local_date = now_local.date()
-    print(f"DEBUG: Calculating sun times for date: {local_date}")
+    logger.debug("Calculating sun times for date: %s", local_date)
     
     # Define the time range for the day
     t0 = ts.utc(local_date.year, local_date.month, local_date.day)
@@ -81,11 +82,11 @@ def get_sun_times(eph, ts, observer, user_timezone):
     sunset_utc = times[sunset_indices[-1]].utc_datetime()
     sunrise_local = sunrise_utc.replace(tzinfo=dt_timezone.utc).astimezone(user_timezone)
     sunset_local = sunset_utc.replace(tzinfo=dt_timezone.utc).astimezone(user_timezone)
-    print(f"DEBUG: Raw sunrise UTC: {sunrise_utc}, Raw sunset UTC: {sunset_utc}")
+    logger.debug("Raw sunrise UTC: %s, Raw sunset UTC: %s", sunrise_utc, sunset_utc)
     
     # Handle ordering issues (e.g., swapped sunrise and sunset)
     if sunrise_local > sunset_local:
         sunrise_local, sunset_local = sunset_local, sunrise_local
-        print("DEBUG: Swapped sunrise and sunset due to ordering issue.")
+        logger.debug("Swapped sunrise and sunset due to ordering issue.")
     
     return sunrise_local, sunset_local
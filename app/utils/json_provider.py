@@ -0,0 +1,140 @@
+import dataclasses
+import decimal
+import json
+import uuid
+
+import numpy as np
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib encoder is the fallback
+    orjson = None
+
+# Native fragments (orjson >= 3.9) are spliced by the encoder itself
+_ORJSON_FRAGMENT = getattr(orjson, "Fragment", None)
+
+
+class RawJSON:
+    """
+    A pre-serialized JSON value that is spliced into a response as-is.
+
+    Use it for bodies that are encoded once and served many times (a cached
+    hour graph, a timetable) so that every response containing them doesn't
+    decode and re-encode the same structure.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+    def __repr__(self):
+        return f"RawJSON({len(self.data)} bytes)"
+
+
+def _default(value):
+    """Encode the types the app returns that the JSON encoders don't handle natively."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if hasattr(value, "isoformat"):  # datetimes, including the neo4j temporal types
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _Splicer:
+    """
+    Replaces RawJSON values with unique string placeholders during encoding and
+    swaps the fragments back in afterwards, for encoders without native fragments.
+    """
+
+    def __init__(self, fallback=_default):
+        self.prefix = f"__raw_json_{uuid.uuid4().hex}_"
+        self.fragments = []
+        self.fallback = fallback
+
+    def default(self, value):
+        if isinstance(value, RawJSON):
+            self.fragments.append(value.data)
+            return f"{self.prefix}{len(self.fragments) - 1}"
+        return self.fallback(value)
+
+    def splice(self, body):
+        for i, fragment in enumerate(self.fragments):
+            body = body.replace(f'"{self.prefix}{i}"'.encode(), fragment, 1)
+        return body
+
+
+def dumps_bytes(obj, sort_keys=False, **kwargs):
+    """
+    Serialize `obj` to UTF-8 JSON bytes with the app's type support.
+
+    Usable outside a request (services, caches); the provider delegates here.
+    Extra json.dumps arguments (indent, default, ...) are honoured by using the
+    standard library encoder, which orjson can't take them through.
+    """
+    if orjson is not None and not kwargs:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if _ORJSON_FRAGMENT is not None:
+            def default(value):
+                if isinstance(value, RawJSON):
+                    return _ORJSON_FRAGMENT(value.data)
+                return _default(value)
+            return orjson.dumps(obj, default=default, option=option)
+
+        splicer = _Splicer()
+        return splicer.splice(orjson.dumps(obj, default=splicer.default, option=option))
+
+    splicer = _Splicer(kwargs.pop("default", None) or _default)
+    kwargs.setdefault("ensure_ascii", False)
+    kwargs.setdefault("separators", (",", ":") if kwargs.get("indent") is None else (",", ": "))
+    body = json.dumps(obj, default=splicer.default, sort_keys=sort_keys, **kwargs).encode("utf-8")
+    return splicer.splice(body)
+
+
+def loads(s, **kwargs):
+    if orjson is not None and not kwargs:
+        return orjson.loads(s)
+    return json.loads(s, **kwargs)
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson when it is installed.
+
+    NumPy scalars and arrays, datetimes and dataclasses are encoded directly,
+    so payloads don't need a conversion walk first, and RawJSON fragments are
+    spliced into the body without being re-encoded. Without orjson the
+    standard library encoder is used with the same type support.
+    """
+
+    mimetype = "application/json"
+
+    # Key order is preserved by default; sorting costs a pass over every object
+    sort_keys = False
+
+    def dumps_bytes(self, obj, **kwargs):
+        """Serialize `obj` to UTF-8 JSON bytes."""
+        return dumps_bytes(obj, sort_keys=self.sort_keys, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,75 @@
+import logging
+import os
+import random
+import sys
+
+ROOT_LOGGER = "monsieur"
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+# LOG_LEVEL sets the default level; LOG_LEVELS overrides it per module and
+# LOG_SAMPLE keeps only a fraction of the records below WARNING, e.g.
+#   LOG_LEVEL=INFO LOG_LEVELS="chart=DEBUG,ephemeris=DEBUG" LOG_SAMPLE="chart=0.01"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "")
+
+_configured = False
+
+
+def _parse_mapping(value):
+    """Parse "name=value,name=value" into a dict (blank entries are skipped)."""
+    mapping = {}
+    for item in value.split(","):
+        name, _, setting = item.partition("=")
+        if name.strip() and setting.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+class SamplingFilter(logging.Filter):
+    """Let through a random `rate` fraction of records below WARNING, and every WARNING and above."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def get_logger(name):
+    """
+    Return the logger for one module area ("chart", "ephemeris", "neo4j", ...).
+
+    Call logger.debug("x=%s", x) with arguments rather than f-strings: the
+    message is only formatted when the record is actually emitted, so disabled
+    debug logging costs one level check.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def configure_logging(level=None, levels=None, sample=None):
+    """
+    Attach one stderr handler to the "monsieur" logger and apply per-module
+    levels and sampling. Safe to call more than once; later calls only
+    re-apply the levels and sampling rates.
+    """
+    global _configured
+
+    root = logging.getLogger(ROOT_LOGGER)
+    if not _configured:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.propagate = False
+        _configured = True
+
+    root.setLevel((level or LOG_LEVEL).upper())
+    for name, module_level in _parse_mapping(levels if levels is not None else LOG_LEVELS).items():
+        get_logger(name).setLevel(module_level.upper())
+
+    for name, rate in _parse_mapping(sample if sample is not None else LOG_SAMPLE).items():
+        logger = get_logger(name)
+        for existing in [f for f in logger.filters if isinstance(f, SamplingFilter)]:
+            logger.removeFilter(existing)
+        logger.addFilter(SamplingFilter(float(rate)))
@@ -0,0 +1,202 @@
+import bisect
+import threading
+
+# Latency buckets in milliseconds
+DEFAULT_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Every metric created in the process, in creation order, for /metrics
+REGISTRY = []
+_registry_lock = threading.Lock()
+
+
+def register(metric):
+    with _registry_lock:
+        REGISTRY.append(metric)
+    return metric
+
+
+class _Sharded:
+    """
+    Per-thread accumulation merged at scrape time.
+
+    Each thread writes only to its own shard, so recording takes no lock; the
+    lock is held while a thread registers its shard and while shards are merged.
+    Shards of threads that have exited are folded into `_retired` on scrape so
+    a server that starts a thread per request doesn't accumulate them.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _collect(self, merge):
+        """Merge every shard with `merge(target, key, series)`; returns {label value: merged}."""
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    for key, series in list(shard.items()):
+                        merge(self._retired, key, series)
+            self._shards = alive
+
+            merged = {}
+            for key, series in list(self._retired.items()):
+                merge(merged, key, series)
+            for _, shard in alive:
+                for key, series in list(shard.items()):
+                    merge(merged, key, series)
+        return merged
+
+    def reset(self):
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+class Histogram(_Sharded):
+    """
+    Cumulative histogram with fixed upper bounds, one series per label value.
+
+    `label` is one label name, or a tuple of names when label values are tuples.
+    """
+
+    def __init__(self, name, description, label="name", buckets=DEFAULT_LATENCY_BUCKETS_MS):
+        super().__init__()
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = tuple(buckets)
+        register(self)
+
+    def observe(self, label_value, value):
+        index = bisect.bisect_left(self.buckets, value)
+        shard = self._shard()
+        series = shard.get(label_value)
+        if series is None:
+            series = shard[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    @staticmethod
+    def _merge(target, key, series):
+        merged = target.get(key)
+        if merged is None:
+            target[key] = [list(series[0]), series[1], series[2]]
+        else:
+            merged[0] = [a + b for a, b in zip(merged[0], series[0])]
+            merged[1] += series[1]
+            merged[2] += series[2]
+
+    def snapshot(self):
+        """
+        Return {label value: {"buckets": {upper bound: cumulative count}, "sum", "count"}}.
+        """
+        snapshot = {}
+        for key, (counts, total, count) in self._collect(self._merge).items():
+            cumulative = 0
+            buckets = {}
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                buckets[str(bound)] = cumulative
+            snapshot[key] = {"buckets": buckets, "sum": round(total, 3), "count": count}
+        return snapshot
+
+    def render(self):
+        """Render the histogram in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.snapshot().items()):
+            labels = _format_labels(self.label, key)
+            for bound, count in series["buckets"].items():
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series['sum']}")
+            lines.append(f"{self.name}_count{{{labels}}} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Sharded):
+    """Monotonic counter, one series per label value (see Histogram for `label`)."""
+
+    def __init__(self, name, description, label="name"):
+        super().__init__()
+        self.name = name
+        self.description = description
+        self.label = label
+        register(self)
+
+    def inc(self, label_value, amount=1):
+        shard = self._shard()
+        shard[label_value] = shard.get(label_value, 0) + amount
+
+    @staticmethod
+    def _merge(target, key, value):
+        target[key] = target.get(key, 0) + value
+
+    def snapshot(self):
+        return self._collect(self._merge)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{{{_format_labels(self.label, key)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class Gauge:
+    """
+    Value read at scrape time from `callback`, which returns a number or a
+    {label value: number} dict (None values are skipped). Nothing is recorded
+    on the hot path.
+    """
+
+    def __init__(self, name, description, callback, label="name", kind="gauge"):
+        self.name = name
+        self.description = description
+        self.callback = callback
+        self.label = label
+        # "counter" for monotonic totals kept elsewhere (e.g. cache hit counts)
+        self.kind = kind
+        register(self)
+
+    def snapshot(self):
+        value = self.callback()
+        return value if isinstance(value, dict) else {None: value}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in self.snapshot().items():
+            if value is None:
+                continue
+            labels = "" if key is None else f"{{{_format_labels(self.label, key)}}}"
+            lines.append(f"{self.name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def render_all():
+    """Prometheus text exposition of every registered metric."""
+    with _registry_lock:
+        metrics = list(REGISTRY)
+    return "".join(metric.render() for metric in metrics)
+
+
+def _format_labels(names, values):
+    if isinstance(names, tuple):
+        return ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+    return f'{names}="{_escape_label(values)}"'
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
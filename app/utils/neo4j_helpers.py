@@ -1,6 +1,10 @@
 
 from neo4j import GraphDatabase
 
+from app.utils.logging_config import get_logger
+
+logger = get_logger("neo4j")
+
 # Neo4j Driver Initialization
 NEO4J_URI = "neo4j+s://eb32f100.databases.neo4j.io"  
 NEO4J_USER = "neo4j"               
@@ -27,7 +31,7 @@ def format_hour_name(hour_index, day_segment, weekday_name):
     capitalized_day_segment = day_segment.capitalize()  # Capitalize "Day" or "Night"
     capitalized_weekday = weekday_name.capitalize()  # Capitalize "Monday", etc.
     formatted_name = f"Hour_{hour_ordinal}_Of_{capitalized_day_segment}_{capitalized_weekday}"
-    print(f"DEBUG: Formatted hour name: {formatted_name}")
+    logger.debug("Formatted hour name: %s", formatted_name)
     return formatted_name
 
 
@@ -42,7 +46,7 @@ def fetch_hour_data(hour_name, neo4j_driver):
     Returns:
         list: Simplified results of Neo4j query.
     """
-    print(f"DEBUG: Fetching Neo4j data for hour_name: {hour_name}")
+    logger.debug("Fetching Neo4j data for hour_name: %s", hour_name)
     with neo4j_driver.session() as session:
         query = f"""
         MATCH (hour {{uri: "monsieur:MagicHourEntity/{hour_name}"}})
@@ -56,11 +60,10 @@ def fetch_hour_data(hour_name, neo4j_driver):
             labels(connectedNode) AS nodeLabels,
             properties(connectedNode) AS nodeProperties
         """
-        print(f"DEBUG: Executing query:\n{query}")
+        logger.debug("Executing query:\n%s", query)
         results = session.run(query)
-        print(f"DEBUG: Query executed. Results fetched.")
         data = [record.data() for record in results]
-        print(f"DEBUG: Results processed: {data}")
+        logger.debug("Results processed: %s", data)
         simplified_data = simplify_neo4j_results(data)
         return simplified_data
 
@@ -102,5 +105,5 @@ def simplify_neo4j_results(data):
         }
         simplified["connections"].append(connection)
     
-    print(f"DEBUG: Simplified results: {simplified}")
+    logger.debug("Simplified results: %s", simplified)
     return simplified
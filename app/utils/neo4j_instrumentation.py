@@ -0,0 +1,251 @@
+import collections
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+from app.utils.metrics import Histogram
+
+# Queries slower than this (wall time, ms) are written to the slow-query log
+SLOW_QUERY_MS = float(os.getenv("NEO4J_SLOW_QUERY_MS", "250"))
+
+# Fraction of queries run as PROFILE <query> instead of the plain query, to sample
+# db hits (0 disables profiling). Profiling slows a query down, so profiled runs
+# are timed in their own histogram and kept out of the latency histograms.
+PROFILE_SAMPLE_RATE = float(os.getenv("NEO4J_PROFILE_SAMPLE_RATE", "0"))
+
+# How many recent slow queries are kept for /api/admin/query_stats
+SLOW_QUERY_HISTORY = 100
+
+slow_query_logger = logging.getLogger("monsieur.neo4j.slow_queries")
+
+QUERY_WALL_TIME = Histogram("neo4j_query_wall_time_ms", "Client wall time per Neo4j query.")
+QUERY_AVAILABLE_AFTER = Histogram("neo4j_query_available_after_ms", "Server time until the first record was available.")
+QUERY_CONSUMED_AFTER = Histogram("neo4j_query_consumed_after_ms", "Server time until all records were consumed.")
+QUERY_ROWS = Histogram("neo4j_query_rows", "Rows returned per Neo4j query.",
+                       buckets=(0, 1, 10, 100, 1000, 10000, 100000))
+QUERY_DB_HITS = Histogram("neo4j_query_db_hits", "Database hits per profiled Neo4j query.",
+                          buckets=(10, 100, 1000, 10000, 100000, 1000000, 10000000))
+QUERY_PROFILED_WALL_TIME = Histogram("neo4j_profiled_query_wall_time_ms", "Client wall time per profiled Neo4j query.")
+
+HISTOGRAMS = (QUERY_WALL_TIME, QUERY_AVAILABLE_AFTER, QUERY_CONSUMED_AFTER, QUERY_ROWS, QUERY_DB_HITS,
+              QUERY_PROFILED_WALL_TIME)
+
+_errors = collections.Counter()
+_slow_queries = collections.deque(maxlen=SLOW_QUERY_HISTORY)
+_stats_lock = threading.Lock()
+
+
+class InstrumentedResult(list):
+    """
+    Fully consumed query result: a list of records plus the query summary.
+
+    Supports the parts of neo4j.Result the app uses (iteration, data(),
+    single(), consume()), so call sites don't change.
+    """
+
+    def __init__(self, records, summary):
+        super().__init__(records)
+        self.summary = summary
+
+    def data(self):
+        return [record.data() for record in self]
+
+    def single(self):
+        return self[0] if self else None
+
+    def consume(self):
+        return self.summary
+
+
+def _sum_db_hits(profile):
+    if not profile:
+        return 0
+    return profile.get("dbHits", 0) + sum(_sum_db_hits(child) for child in profile.get("children", ()))
+
+
+def _caller_name():
+    # Two frames up: the function that called session.run()
+    return sys._getframe(2).f_code.co_name
+
+
+def record_query(name, query, wall_ms, rows, summary=None, db_hits=None, error=None, profiled=False):
+    """
+    Record the metrics of one executed query and log it if it was slow.
+
+    Profiled runs only feed the db hits and profiled wall time histograms, so
+    the latency histograms describe plain queries.
+    """
+    (QUERY_PROFILED_WALL_TIME if profiled else QUERY_WALL_TIME).observe(name, wall_ms)
+    if error is not None:
+        with _stats_lock:
+            _errors[name] += 1
+        return
+
+    QUERY_ROWS.observe(name, rows)
+    available_after = getattr(summary, "result_available_after", None)
+    consumed_after = getattr(summary, "result_consumed_after", None)
+    if not profiled:
+        if available_after is not None:
+            QUERY_AVAILABLE_AFTER.observe(name, available_after)
+        if consumed_after is not None:
+            QUERY_CONSUMED_AFTER.observe(name, consumed_after)
+    if db_hits is not None:
+        QUERY_DB_HITS.observe(name, db_hits)
+
+    if wall_ms >= SLOW_QUERY_MS:
+        entry = {
+            "name": name,
+            "wall_ms": round(wall_ms, 2),
+            "available_after_ms": available_after,
+            "consumed_after_ms": consumed_after,
+            "rows": rows,
+            "db_hits": db_hits,
+            "profiled": profiled,
+            "query": " ".join(query.split())[:500],
+            "at": time.time(),
+        }
+        with _stats_lock:
+            _slow_queries.append(entry)
+        slow_query_logger.warning(
+            "Slow query %s: %.1f ms wall, %s ms available, %s ms consumed, %d rows, db_hits=%s",
+            name, wall_ms, available_after, consumed_after, rows, db_hits,
+        )
+
+
+class InstrumentedSession:
+    """
+    Wraps a neo4j Session so every run() is timed, counted and optionally profiled.
+
+    Pass `query_name="..."` to run() to name a query; otherwise the calling
+    function's name is used.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, attr):
+        return getattr(self._session, attr)
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._session.__exit__(*exc_info)
+
+    def run(self, query, parameters=None, query_name=None, **kwargs):
+        name = query_name or _caller_name()
+        profile = (
+            PROFILE_SAMPLE_RATE > 0
+            and random.random() < PROFILE_SAMPLE_RATE
+            and not query.lstrip().upper().startswith(("PROFILE", "EXPLAIN", "CREATE CONSTRAINT", "CREATE FULLTEXT"))
+        )
+
+        start = time.perf_counter()
+        try:
+            result = self._session.run(f"PROFILE {query}" if profile else query, parameters, **kwargs)
+            records = list(result)
+            summary = result.consume()
+        except Exception as e:
+            record_query(name, query, (time.perf_counter() - start) * 1000, 0, error=e, profiled=profile)
+            raise
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        db_hits = _sum_db_hits(summary.profile) if profile else None
+        record_query(name, query, wall_ms, len(records), summary, db_hits, profiled=profile)
+        return InstrumentedResult(records, summary)
+
+
+class ForkSafeDriver:
+    """
+    Creates the wrapped neo4j Driver on first use in each process.
+
+    A driver's connection pool must not be shared across fork(): the master of
+    a preloading server can use this driver (e.g. to verify connectivity) and
+    every worker still opens its own pool on its first session.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._driver = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    # An inherited driver belongs to the parent; drop it without closing its sockets
+                    self._driver = self._factory()
+                    self._pid = pid
+        return self._driver
+
+    def __getattr__(self, attr):
+        return getattr(self._get(), attr)
+
+    def session(self, **config):
+        return self._get().session(**config)
+
+    def pool_stats(self):
+        """
+        Connection counts of this process's pool, or None before the first session.
+
+        Reads the driver's private pool structure, so it degrades to None if a
+        driver version lays it out differently.
+        """
+        if self._pid != os.getpid():
+            return None
+        pool = getattr(self._driver, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return None
+        per_address = [list(queue) for queue in list(connections.values())]
+        return {
+            "open": sum(len(queue) for queue in per_address),
+            "in_use": sum(1 for queue in per_address for connection in queue if getattr(connection, "in_use", False)),
+            "max": getattr(pool.pool_config, "max_connection_pool_size", None),
+        }
+
+    def close(self):
+        """Close this process's driver, if it has created one."""
+        with self._lock:
+            if self._driver is not None and self._pid == os.getpid():
+                self._driver.close()
+            self._driver = None
+            self._pid = None
+
+
+class InstrumentedDriver:
+    """Wraps a neo4j Driver so that every session it opens is instrumented."""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def __getattr__(self, attr):
+        return getattr(self._driver, attr)
+
+    def session(self, **config):
+        return InstrumentedSession(self._driver.session(**config))
+
+
+def query_stats():
+    """Snapshot of the per-query histograms, error counts and recent slow queries."""
+    with _stats_lock:
+        errors = dict(_errors)
+        slow = list(_slow_queries)
+    return {
+        "slow_query_ms": SLOW_QUERY_MS,
+        "profile_sample_rate": PROFILE_SAMPLE_RATE,
+        "histograms": {histogram.name: histogram.snapshot() for histogram in HISTOGRAMS},
+        "errors": errors,
+        "slow_queries": slow,
+    }
+
+
+def render_query_metrics():
+    """Prometheus text exposition of the query histograms."""
+    return "".join(histogram.render() for histogram in HISTOGRAMS)
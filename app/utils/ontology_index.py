@@ -0,0 +1,156 @@
+import glob
+import hashlib
+import os
+import threading
+import time
+
+import yaml
+
+from app.utils.logging_config import get_logger
+from app.utils.prefix_trie import PrefixTrie
+
+logger = get_logger("ontology")
+
+# The libyaml loader is several times faster than the pure Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ONTOLOGY_DIR = os.getenv(
+    "ONTOLOGY_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "ontologies"),
+)
+SUPERCLASS_FILE = "_superclassEntity.yaml"
+
+# How often (seconds) the ontology files are stat'ed for changes
+ONTOLOGY_CHECK_INTERVAL = float(os.getenv("ONTOLOGY_CHECK_INTERVAL", "30"))
+
+
+def _synonyms(value):
+    """hasSynonyms is a list in most files and a comma separated string in some."""
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    if isinstance(value, str) and value:
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return []
+
+
+class OntologyIndex:
+    """
+    In-memory index of every entity (classes and instances) declared in the
+    ontology YAML files, with a prefix trie over their names for autocomplete.
+    """
+
+    def __init__(self, ontology_dir=ONTOLOGY_DIR):
+        self.ontology_dir = ontology_dir
+        self.files = sorted(glob.glob(os.path.join(ontology_dir, "*.yaml")))
+        self.version = self.compute_version(self.files)
+        self.entities = {}
+        self.trie = PrefixTrie()
+        self._load()
+
+    @staticmethod
+    def compute_version(files):
+        """
+        Fingerprint the corpus from the declared ontology version plus each file's
+        size and mtime, so edits are picked up without re-reading every file.
+        """
+        digest = hashlib.sha1()
+        for path in files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:12]
+
+    def _load(self):
+        names = []
+        for path in self.files:
+            try:
+                with open(path, "r") as f:
+                    data = yaml.load(f, Loader=YAML_LOADER)
+            except (OSError, yaml.YAMLError) as e:
+                logger.warning("Skipping ontology file %s: %s", os.path.basename(path), e)
+                continue
+            if not isinstance(data, dict):
+                continue
+
+            if os.path.basename(path) == SUPERCLASS_FILE:
+                declared = (data.get("ontology") or {}).get("version")
+                if declared:
+                    self.version = f"{declared}-{self.version}"
+
+            for class_name, class_data in (data.get("classes") or {}).items():
+                if isinstance(class_data, dict) and class_data.get("uri"):
+                    self._add(class_data, class_name, "Class", path, names)
+
+            for instance_name, instance_data in (data.get("instances") or {}).items():
+                if isinstance(instance_data, dict) and instance_data.get("uri"):
+                    parent = None
+                    for relationship in instance_data.get("relationships") or []:
+                        if isinstance(relationship, dict) and relationship.get("HAS_MEMBER"):
+                            parent = relationship["HAS_MEMBER"]
+                            break
+                    self._add(instance_data, instance_name, parent, path, names)
+
+        self.trie.build(names)
+
+    def _add(self, data, key, entity_type, path, names):
+        default_properties = data.get("defaultProperties") or {}
+        name = default_properties.get("hasName") if isinstance(default_properties, dict) else None
+        synonyms = _synonyms(default_properties.get("hasSynonyms")) if isinstance(default_properties, dict) else []
+        entity = {
+            "uri": data["uri"],
+            "name": name if isinstance(name, str) and name else None,
+            "label": str(data.get("label") or key),
+            "type": entity_type,
+            "description": data.get("description"),
+            "synonyms": synonyms,
+            "source": os.path.basename(path),
+            "data": data,
+        }
+        self.entities[entity["uri"]] = entity
+
+        # Payload kept small so suggestions serialize quickly
+        suggestion = {
+            "uri": entity["uri"],
+            "name": entity["name"] or entity["label"],
+            "label": entity["label"],
+            "type": entity_type,
+        }
+        for term in {entity["name"], entity["label"], *synonyms}:
+            if term:
+                names.append((term, suggestion))
+
+    def get(self, uri):
+        return self.entities.get(uri)
+
+    def suggest(self, prefix, limit=10):
+        return self.trie.suggest(prefix, limit)
+
+
+_index = None
+_index_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_ontology_index(force=False):
+    """
+    Return the shared OntologyIndex, rebuilding it when the ontology version changes.
+
+    The files are stat'ed at most every ONTOLOGY_CHECK_INTERVAL seconds; in between,
+    the current index is returned without any I/O.
+    """
+    global _index, _index_checked_at
+
+    now = time.monotonic()
+    if _index is not None and not force and now - _index_checked_at < ONTOLOGY_CHECK_INTERVAL:
+        return _index
+
+    with _index_lock:
+        if _index is not None and not force and now - _index_checked_at < ONTOLOGY_CHECK_INTERVAL:
+            return _index
+        files = sorted(glob.glob(os.path.join(ONTOLOGY_DIR, "*.yaml")))
+        if force or _index is None or not _index.version.endswith(OntologyIndex.compute_version(files)):
+            _index = OntologyIndex(ONTOLOGY_DIR)
+        _index_checked_at = now
+        return _index
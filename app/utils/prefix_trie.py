@@ -0,0 +1,86 @@
+import unicodedata
+
+
+def normalize_term(text):
+    """
+    Normalize a name for prefix matching: lowercase, accents stripped, collapsed spaces.
+
+    Args:
+        text (str): Raw name, label or synonym.
+
+    Returns:
+        str: Normalized term ("Kriós" -> "krios", "Hour_8th" -> "hour 8th").
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.replace("_", " ").lower().split())
+
+
+class PrefixTrie:
+    """
+    Character trie where every node keeps its best `max_suggestions` entries.
+
+    Suggestions are ranked once at build time (whole-name matches, then shorter
+    terms), so a lookup is a walk of len(prefix) dict hops plus a slice,
+    independent of corpus size.
+    """
+
+    def __init__(self, max_suggestions=20):
+        self.max_suggestions = max_suggestions
+        self.root = {}
+        self.entries = []
+        self.size = 0
+
+    def build(self, items):
+        """
+        Build the trie from (term, entry) pairs.
+
+        Each term is also indexed from the start of every word, so "Saint Michael"
+        is found by both "sai" and "mic".
+
+        Args:
+            items (iterable): (term, entry) pairs. The same entry may appear under
+                              several terms (name, label, synonyms).
+
+        Returns:
+            PrefixTrie: self, for chaining.
+        """
+        keyed = []
+        entry_ids = {}
+        for term, entry in items:
+            normalized = normalize_term(term)
+            if not normalized:
+                continue
+            key = id(entry)
+            if key not in entry_ids:
+                entry_ids[key] = len(self.entries)
+                self.entries.append(entry)
+            words = normalized.split(" ")
+            for i in range(len(words)):
+                # Whole-name matches rank before word matches, then shorter names first
+                keyed.append(((i > 0, len(normalized), normalized), " ".join(words[i:]), entry_ids[key]))
+
+        # Insert best-ranked terms first so every node fills with its top entries
+        keyed.sort(key=lambda item: item[0])
+        for _, term, entry_id in keyed:
+            node = self.root
+            for ch in term:
+                node = node.setdefault(ch, {})
+                bucket = node.get("")
+                if bucket is None:
+                    bucket = node[""] = []
+                if len(bucket) < self.max_suggestions and entry_id not in bucket:
+                    bucket.append(entry_id)
+            self.size += 1
+        return self
+
+    def suggest(self, prefix, limit=10):
+        """
+        Return up to `limit` entries whose name (or one of its words) starts with `prefix`.
+        """
+        node = self.root
+        for ch in normalize_term(prefix):
+            node = node.get(ch)
+            if node is None:
+                return []
+        return [self.entries[entry_id] for entry_id in node.get("", ())[:limit]]
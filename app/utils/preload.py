@@ -0,0 +1,54 @@
+import gc
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger("routes")
+
+# Location used to exercise the calculators once before forking
+WARMUP_LATITUDE = 48.8566
+WARMUP_LONGITUDE = 2.3522
+
+
+def warm_shared_state():
+    """
+    Load and touch the heavy read-only structures in the master process.
+
+    Called once after create_app() by a preloading server (see gunicorn.conf.py)
+    so that workers inherit the ephemeris segments, timescale tables, timezone
+    polygons, ontology index and rendered chart layers copy-on-write instead of
+    each building their own. Ends by closing the master's Neo4j connections and
+    freezing the heap so the garbage collector doesn't dirty the shared pages.
+
+    Returns:
+        float: Seconds spent warming.
+    """
+    start = time.perf_counter()
+
+    # Step 1: Module-level tables (ephemeris, timescale, timezone polygons, SVG layers, sprite)
+    from app.routes.constants import neo4j_driver
+    from app.routes.utils import chart_calculator, heatmap_calculator  # noqa: F401
+    from app.services import ephemeris_service
+    from app.utils.ontology_index import get_ontology_index
+
+    # Step 2: One full dataset reads every ephemeris segment and lazily built Skyfield table
+    at = datetime.now(dt_timezone.utc).replace(second=0, microsecond=0)
+    ephemeris_service.compute(WARMUP_LATITUDE, WARMUP_LONGITUDE, at=at)
+
+    # Step 3: The ontology autocomplete index
+    try:
+        get_ontology_index()
+    except Exception as e:
+        logger.warning("Ontology index not preloaded: %s", e)
+
+    # Step 4: Connections opened by the master (connectivity check) must not leak into workers
+    neo4j_driver.close()
+
+    # Step 5: Move everything allocated so far out of the collector's generations
+    gc.collect()
+    gc.freeze()
+
+    elapsed = time.perf_counter() - start
+    logger.info("Preloaded shared state in %.2f s (%d objects frozen)", elapsed, gc.get_freeze_count())
+    return elapsed
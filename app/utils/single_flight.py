@@ -0,0 +1,82 @@
+import threading
+
+# Every SingleFlight created in the process, for /metrics
+FLIGHTS = []
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+def _copy_error(error):
+    """
+    A new instance of `error` with the same type, args and attributes, without
+    calling __init__. Raising it gives the waiting caller a traceback of its own
+    instead of growing the one shared with the leader and the other callers.
+    """
+    copy = type(error).__new__(type(error), *error.args)
+    copy.__dict__.update(error.__dict__)
+    return copy
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation.
+
+    The first caller for a key (the leader) runs `compute()`; callers arriving
+    while it runs wait for it and get the same result, or a copy of the leader's
+    exception chained to it.
+    Nothing is kept once the flight lands, so results must be immutable or
+    copied by the caller; pair it with a cache for sequential reuse.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+        FLIGHTS.append(self)
+
+    def do(self, key, compute):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+            else:
+                flight.followers += 1
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise _copy_error(flight.error) from flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "waiting": sum(flight.followers for flight in self._flights.values()),
+                "leaders": self.leaders,
+                "shared": self.shared,
+            }
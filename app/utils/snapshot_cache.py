@@ -0,0 +1,204 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no cross-process locking on Windows
+    fcntl = None
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger("cache")
+
+# Striped locks: keys hashing to the same stripe compute one at a time in a process
+LOCK_STRIPES = 64
+
+# Shared-tier files older than this many freshness windows are swept
+SWEEP_AFTER_WINDOWS = 10
+SWEEP_EVERY_WRITES = 100
+
+
+class SnapshotCache:
+    """
+    Short-lived cache of serialized results with single-flight computation.
+
+    Two tiers: a bounded in-process LRU, and an optional directory shared by
+    every worker on the host (point it at tmpfs such as /dev/shm to keep it in
+    memory). Keys are expected to include a time bucket, so an entry never
+    changes once written; `ttl_seconds` bounds how long either tier serves it.
+
+    A missing key is computed once: threads of a process wait on a striped
+    lock and workers wait on an flock of the key's lock file, then read the
+    body the first one wrote.
+    """
+
+    def __init__(self, ttl_seconds=30, max_entries=256, shared_dir=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.shared_dir = shared_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._writes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        # Requests waiting for or computing a missing key
+        self.in_flight = 0
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the body cached for `key`, calling `compute()` (which must return
+        bytes) at most once across threads and workers when it is missing.
+        """
+        body = self._local_get(key)
+        if body is not None:
+            return body
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return self._fill(key, compute)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _fill(self, key, compute):
+        with self._stripes[hash(key) % LOCK_STRIPES]:
+            # Another thread may have filled the key while this one waited
+            body = self._local_get(key)
+            if body is not None:
+                return body
+
+            if self.shared_dir:
+                body = self._shared_get(key)
+                if body is None:
+                    with self._file_lock(key):
+                        body = self._shared_get(key)
+                        if body is None:
+                            body = self._compute(compute)
+                            self._shared_put(key, body)
+                else:
+                    with self._lock:
+                        self.shared_hits += 1
+            else:
+                body = self._compute(compute)
+
+            self._local_put(key, body)
+            return body
+
+    def _compute(self, compute):
+        with self._lock:
+            self.misses += 1
+        return compute()
+
+    def _local_get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def _local_put(self, key, body):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.shared_dir, f"{digest}.json")
+
+    def _shared_get(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.ttl_seconds:
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _shared_put(self, key, body):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(body)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("Could not write snapshot %s: %s", path, e)
+            return
+
+        with self._lock:
+            self._writes += 1
+            sweep = self._writes % SWEEP_EVERY_WRITES == 0
+        if sweep:
+            self._sweep()
+
+    def _file_lock(self, key):
+        return _FileLock(f"{self._path(key)}.lock")
+
+    def _sweep(self):
+        """Delete shared-tier files (and their lock files) from old time buckets."""
+        cutoff = time.time() - self.ttl_seconds * SWEEP_AFTER_WINDOWS
+        try:
+            names = os.listdir(self.shared_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.shared_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "in_flight": self.in_flight,
+                "shared_dir": self.shared_dir,
+            }
+
+
+class _FileLock:
+    """Exclusive flock on a lock file; a no-op where fcntl is unavailable."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                self._file = open(self.path, "a")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except OSError as e:
+                logger.warning("Could not lock %s, computing without it: %s", self.path, e)
+                self._file = None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
@@ -0,0 +1,68 @@
+import glob
+import os
+import re
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger("chart")
+
+CHART_PLANETS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "svg", "chart_planets"
+)
+SYMBOL_ID_PREFIX = "planet-"
+
+SVG_ROOT = re.compile(r"<svg\b([^>]*)>(.*)</svg>", re.S)
+XML_PROLOG = re.compile(r"<\?xml.*?\?>|<!DOCTYPE.*?>|<!--.*?-->", re.S)
+ATTRIBUTE = re.compile(r'([\w:-]+)="([^"]*)"')
+
+
+def minify_svg(markup):
+    """Drop the prolog, comments and inter-tag whitespace of an SVG document."""
+    markup = XML_PROLOG.sub("", markup)
+    markup = re.sub(r">\s+<", "><", markup)
+    return re.sub(r"\s+", " ", markup).strip()
+
+
+def svg_to_symbol(markup, symbol_id):
+    """
+    Turn a standalone SVG document into a <symbol> with the same viewBox.
+
+    Args:
+        markup (str): The SVG file contents.
+        symbol_id (str): The id <use href="#..."> will refer to.
+
+    Returns:
+        str: The minified <symbol> element.
+    """
+    match = SVG_ROOT.search(minify_svg(markup))
+    if not match:
+        raise ValueError(f"No <svg> root element found for symbol '{symbol_id}'.")
+    attributes = dict(ATTRIBUTE.findall(match.group(1)))
+    view_box = attributes.get("viewBox") or f"0 0 {attributes.get('width', 30)} {attributes.get('height', 30)}"
+    return f'<symbol id="{symbol_id}" viewBox="{view_box}">{match.group(2)}</symbol>'
+
+
+def build_sprite(directory=CHART_PLANETS_DIR):
+    """
+    Read every *.svg in `directory` into one <defs> block of <symbol>s.
+
+    Returns:
+        tuple: (defs markup, {lowercase file stem: symbol id})
+    """
+    symbols = []
+    symbol_ids = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.svg"))):
+        name = os.path.splitext(os.path.basename(path))[0].lower()
+        symbol_id = f"{SYMBOL_ID_PREFIX}{name}"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                symbols.append(svg_to_symbol(f.read(), symbol_id))
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping chart symbol %s: %s", os.path.basename(path), e)
+            continue
+        symbol_ids[name] = symbol_id
+    return f'<defs>{"".join(symbols)}</defs>', symbol_ids
+
+
+# Built once at import; charts embed the defs instead of linking ten image files
+PLANET_SPRITE_DEFS, PLANET_SYMBOL_IDS = build_sprite()
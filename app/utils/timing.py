@@ -0,0 +1,158 @@
+import collections
+import contextvars
+import cProfile
+import functools
+import hmac
+import io
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import g, request
+
+from app.utils.metrics import Histogram
+
+# Requests may attach a cProfile summary with ?profile=1 when they carry this token
+# in the X-Admin-Token header; profiling is disabled while it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Functions listed in a profile summary, and how many summaries are kept for
+# responses that can't carry one inline
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_HISTORY = 20
+
+STAGE_TIME = Histogram("stage_time_ms", "Time spent per request stage.", label="stage")
+REQUEST_TIME = Histogram("http_request_duration_ms", "Request latency until the response headers.",
+                         label=("route", "method", "status"))
+
+# Spans of the request being handled in this thread (None outside a request)
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+# Held while a request is being profiled: one profiled request at a time
+_profiling = threading.Lock()
+
+_profiles = collections.OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+@contextmanager
+def span(name):
+    """
+    Time a stage: `with span("ephemeris.houses"): ...`.
+
+    Every span is recorded in the STAGE_TIME histogram; inside a request it is
+    also reported in that response's Server-Timing header. Spans may nest, and
+    each reports its own inclusive time.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        STAGE_TIME.observe(name, elapsed_ms)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed_ms))
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_admin_request():
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def server_timing_header(spans, total_ms):
+    """Format spans as a Server-Timing value, summing repeated stage names."""
+    durations = collections.OrderedDict()
+    counts = collections.Counter()
+    for name, elapsed_ms in spans:
+        durations[name] = durations.get(name, 0.0) + elapsed_ms
+        counts[name] += 1
+
+    entries = []
+    for name, elapsed_ms in durations.items():
+        entry = f"{name};dur={elapsed_ms:.1f}"
+        if counts[name] > 1:
+            entry += f';desc="{counts[name]}x"'
+        entries.append(entry)
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def _profile_summary(profiler):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+def get_profile(profile_id):
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def init_app(app):
+    """Collect spans for every request and report them when it finishes."""
+
+    @app.before_request
+    def start_request_timing():
+        g.request_start = time.perf_counter()
+        g.request_spans_token = _request_spans.set([])
+
+        if request.args.get("profile") == "1" and is_admin_request():
+            # Only one request is profiled at a time; others run normally
+            if _profiling.acquire(blocking=False):
+                g.profiler = cProfile.Profile()
+                g.profiler.enable()
+
+    @app.after_request
+    def finish_request_timing(response):
+        spans = _request_spans.get() or []
+        total_ms = (time.perf_counter() - g.get("request_start", time.perf_counter())) * 1000
+        response.headers["Server-Timing"] = server_timing_header(spans, total_ms)
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_TIME.observe((route, request.method, response.status_code), total_ms)
+
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            _profiling.release()
+            summary = _profile_summary(profiler)
+            profile_id = uuid.uuid4().hex[:12]
+            with _profiles_lock:
+                _profiles[profile_id] = summary
+                while len(_profiles) > PROFILE_HISTORY:
+                    _profiles.popitem(last=False)
+            response.headers["X-Profile-Id"] = profile_id
+
+            # JSON bodies carry the summary inline; other bodies via /api/admin/profiles/<id>
+            if response.mimetype == "application/json" and not response.is_streamed:
+                body = app.json.loads(response.get_data())
+                if isinstance(body, dict):
+                    body["_profile"] = summary
+                    response.set_data(app.json.dumps(body))
+        return response
+
+    @app.teardown_request
+    def reset_request_timing(exc):
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            # The request failed before after_request ran
+            profiler.disable()
+            _profiling.release()
+        token = g.pop("request_spans_token", None)
+        if token is not None:
+            _request_spans.reset(token)
@@ -0,0 +1,442 @@
+import glob
+import itertools
+import os
+import re
+import sys
+import threading
+
+import yaml
+
+# The libyaml loader is several times faster than the pure Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ONTOLOGY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ontologies")
+
+# Query shapes issued by the app and by ontologies/__ontology_upload.py
+MERGE_NODE = re.compile(r"MERGE \(n:(\w+) \{ uri: \$uri \}\)")
+MERGE_RELATIONSHIP = re.compile(r"MERGE \((\w+)\)-\[(\w*):(\w+)\]->\((\w+)\)")
+HOUR_BY_LITERAL_URI = re.compile(r'MATCH \(hour \{uri: "([^"]+)"\}\)')
+FULLTEXT_TERM = re.compile(r"\(((?:\\.|[^\s\\])+)\* OR ")
+UPLOAD_STAMP = "(v:OntologyVersion { id: 'current' })"
+
+
+class FakeNode:
+    """Stands in for neo4j.graph.Node: labels, properties and a numeric id."""
+
+    def __init__(self, node_id, labels, properties):
+        self.id = node_id
+        self.element_id = str(node_id)
+        self.labels = set(labels)
+        self._properties = dict(properties)
+
+    def get(self, key, default=None):
+        return self._properties.get(key, default)
+
+    def items(self):
+        return self._properties.items()
+
+    def keys(self):
+        return self._properties.keys()
+
+    def __getitem__(self, key):
+        return self._properties[key]
+
+    def __contains__(self, key):
+        return key in self._properties
+
+
+class FakeRelationship:
+    """Stands in for neo4j.graph.Relationship."""
+
+    def __init__(self, relationship_id, relationship_type, start_node, end_node, properties):
+        self.id = relationship_id
+        self.element_id = str(relationship_id)
+        self.type = relationship_type
+        self.start_node = start_node
+        self.end_node = end_node
+        self._properties = dict(properties)
+
+    def get(self, key, default=None):
+        return self._properties.get(key, default)
+
+    def items(self):
+        return self._properties.items()
+
+    def keys(self):
+        return self._properties.keys()
+
+    def __getitem__(self, key):
+        return self._properties[key]
+
+
+class FakeRecord(dict):
+    """A result row; data() turns nodes and relationships into property dicts like neo4j.Record."""
+
+    def data(self):
+        return {key: _plain(value) for key, value in self.items()}
+
+
+def _plain(value):
+    if isinstance(value, (FakeNode, FakeRelationship)):
+        return dict(value.items())
+    return value
+
+
+class FakeSummary:
+    result_available_after = 0
+    result_consumed_after = 0
+    profile = None
+
+
+class FakeResult(list):
+    def consume(self):
+        return FakeSummary()
+
+    def data(self):
+        return [record.data() for record in self]
+
+    def single(self):
+        return self[0] if self else None
+
+
+class FakeGraph:
+    """
+    In-memory property graph answering the handful of Cypher queries this app
+    issues. Anything else raises NotImplementedError so an unsupported query
+    is noticed instead of silently returning nothing.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.relationships = []
+        self._incident = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        # What the upload stamp node holds (see stamp_upload in __ontology_upload.py)
+        self.version = None
+
+
+    @classmethod
+    def from_ontologies(cls, ontology_dir=ONTOLOGY_DIR):
+        """
+        Build the graph the ontology YAMLs describe.
+
+        Classes and instances become nodes, with SUBCLASS_OF and HAS_MEMBER
+        relationships as created by __ontology_upload.py. Instances are labelled
+        with the class they are a member of (plus Searchable), and their
+        discoveredRelationships and analogies become relationships between
+        existing nodes, the way the analogy and relationship uploads create them.
+        """
+        graph = cls()
+        documents = []
+        for path in sorted(glob.glob(os.path.join(ontology_dir, "*.yaml"))):
+            try:
+                with open(path, "r") as f:
+                    data = yaml.load(f, Loader=YAML_LOADER)
+            except (OSError, yaml.YAMLError) as e:
+                print(f"Skipping ontology file {os.path.basename(path)}: {e}", file=sys.stderr)
+                continue
+            if isinstance(data, dict):
+                documents.append(data)
+
+        # Step 1: Class nodes
+        class_uris = {}
+        for data in documents:
+            for class_name, class_data in (data.get("classes") or {}).items():
+                if not isinstance(class_data, dict) or not class_data.get("uri"):
+                    continue
+                label = str(class_data.get("label") or class_name).replace(" ", "").split(":")[-1]
+                class_uris[class_name] = class_data["uri"]
+                graph.merge_node(label, class_data["uri"], {
+                    "label": label,
+                    "description": class_data.get("description", ""),
+                    **_flatten(class_data.get("subclassProperties") or {}),
+                    **_flatten(class_data.get("analogyProperties") or {}),
+                })
+
+        # Step 2: Instance nodes
+        instances = []
+        for data in documents:
+            for instance_name, instance_data in (data.get("instances") or {}).items():
+                if not isinstance(instance_data, dict) or not instance_data.get("uri"):
+                    continue
+                parent = next(
+                    (relationship["HAS_MEMBER"] for relationship in instance_data.get("relationships") or []
+                     if isinstance(relationship, dict) and relationship.get("HAS_MEMBER")),
+                    None,
+                )
+                properties = {
+                    **_flatten(instance_data.get("defaultProperties") or {}),
+                    **_flatten(instance_data.get("classProperties") or {}),
+                    **_flatten(instance_data.get("subclassProperties") or {}),
+                    "description": instance_data.get("description", ""),
+                }
+                graph.merge_node(parent or instance_name, instance_data["uri"], properties)
+                instances.append((instance_data, parent))
+
+        # Step 3: Relationships between nodes that exist
+        for data in documents:
+            for class_name, class_data in (data.get("classes") or {}).items():
+                parent = isinstance(class_data, dict) and class_data.get("subClassOf")
+                if parent in class_uris and class_data.get("uri"):
+                    graph.merge_relationship(class_data["uri"], "SUBCLASS_OF", class_uris[parent])
+
+        for instance_data, parent in instances:
+            uri = instance_data["uri"]
+            if parent in class_uris:
+                graph.merge_relationship(uri, "HAS_MEMBER", class_uris[parent])
+
+            discovered = (instance_data.get("discoveredRelationships") or {}).get("hasRelationshipWith") or []
+            for relationship in discovered:
+                target = (relationship.get("relatedEntity") or {}).get("uri")
+                source = relationship.get("source") or {}
+                graph.merge_relationship(uri, relationship.get("relationshipType") or "RELATIONSHIP", target, {
+                    "confidence_score": source.get("confidence_score", 1.0),
+                    "source_id": source.get("source_id") or "",
+                    "quote_id": source.get("quote_id") or "",
+                    "feed": source.get("feed", "manual"),
+                })
+
+            analogies = (instance_data.get("analogyProperties") or {}).get("hasAnalogyWith") or []
+            for analogy in analogies if isinstance(analogies, list) else []:
+                target = (analogy.get("targetEntity") or {}).get("uri")
+                system = (analogy.get("analogySystem") or {}).get("uri")
+                confidence = analogy.get("confidence") or {}
+                properties = {"system": system, "confidence_score": confidence.get("score", 1.0),
+                              "feed": confidence.get("feed", "manual")}
+                graph.merge_relationship(uri, "HAS_ANALOGY_WITH", target, properties)
+                graph.merge_relationship(target, "HAS_ANALOGY_WITH", uri, properties)
+
+        # Stamped like a finished upload
+        graph.version = "from_ontologies"
+        return graph
+
+
+    def merge_node(self, label, uri, properties):
+        with self._lock:
+            node = self.nodes.get(uri)
+            if node is None:
+                node = self.nodes[uri] = FakeNode(next(self._ids), (), {"uri": uri})
+                self._incident[uri] = []
+            node.labels.update((label, "Searchable"))
+            node._properties.update(properties)
+            return node
+
+
+    def merge_relationship(self, start_uri, relationship_type, end_uri, properties=None):
+        """MERGE (start)-[:type]->(end) between existing nodes; a no-op if either is missing."""
+        with self._lock:
+            start, end = self.nodes.get(start_uri), self.nodes.get(end_uri)
+            if start is None or end is None:
+                return None
+            for relationship in self._incident[start_uri]:
+                if (relationship.type == relationship_type and relationship.start_node is start
+                        and relationship.end_node is end):
+                    break
+            else:
+                relationship = FakeRelationship(next(self._ids), relationship_type, start, end, {})
+                self.relationships.append(relationship)
+                self._incident[start_uri].append(relationship)
+                if end_uri != start_uri:
+                    self._incident[end_uri].append(relationship)
+            relationship._properties.update(properties or {})
+            return relationship
+
+
+    def incident(self, node):
+        """(relationship, other node) for every relationship touching `node`, either direction."""
+        return [
+            (relationship, relationship.end_node if relationship.start_node is node else relationship.start_node)
+            for relationship in self._incident[node.get("uri")]
+        ]
+
+
+    def run(self, query, parameters):
+        query = query.strip()
+        if query.startswith("PROFILE "):
+            query = query[len("PROFILE "):].lstrip()
+
+        if query.startswith(("CREATE CONSTRAINT", "CREATE FULLTEXT")):
+            return []
+        if UPLOAD_STAMP in query:
+            if query.startswith("MERGE"):
+                self.version = parameters["version"]
+                return []
+            return [FakeRecord(version=self.version)] if self.version is not None else []
+        if "MATCH (n)-[r]->(m)" in query:
+            return [FakeRecord(n=r.start_node, r=r, m=r.end_node) for r in list(self.relationships)]
+        if "MATCH (hour {uri: $hour_uri})" in query:
+            return self._hour_graph(parameters["hour_uri"])
+        match = HOUR_BY_LITERAL_URI.search(query)
+        if match:
+            return self._hour_data(match.group(1))
+        if "db.index.fulltext.queryNodes" in query:
+            return self._fulltext(parameters["query"], parameters.get("limit", 10))
+
+        match = MERGE_NODE.search(query)
+        if match:
+            self.merge_node(match.group(1), parameters["uri"], parameters.get("properties") or {})
+            return []
+        match = MERGE_RELATIONSHIP.search(query)
+        if match:
+            start, variable, relationship_type, end = match.groups()
+            properties = {}
+            if variable:
+                properties = {key: value for key, value in parameters.items() if not key.endswith("_uri")}
+            self.merge_relationship(parameters[f"{start}_uri"], relationship_type, parameters[f"{end}_uri"], properties)
+            return []
+
+        raise NotImplementedError(f"FakeGraph does not understand this query: {query[:80]!r}")
+
+
+    def _hour_data(self, uri):
+        # MATCH (hour {uri}) OPTIONAL MATCH (hour)-[r]-(connectedNode)
+        hour = self.nodes.get(uri)
+        if hour is None:
+            return []
+        rows = [
+            FakeRecord(
+                hour=hour,
+                relationshipType=relationship.type,
+                connectedNode=other,
+                relationshipProperties=dict(relationship.items()),
+                nodeLabels=sorted(other.labels),
+                nodeProperties=dict(other.items()),
+            )
+            for relationship, other in self.incident(hour)
+        ]
+        return rows or [FakeRecord(hour=hour, relationshipType=None, connectedNode=None,
+                                   relationshipProperties=None, nodeLabels=None, nodeProperties=None)]
+
+
+    def _hour_graph(self, uri):
+        # MATCH (hour {uri}) OPTIONAL MATCH (hour)-[r1]-(connectedNode)
+        # OPTIONAL MATCH (connectedNode)-[r2]-(planet) WHERE 'PlanetEntity' IN labels(connectedNode)
+        hour = self.nodes.get(uri)
+        if hour is None:
+            return []
+        projected_hour = {key: hour.get(key) for key in ("uri", "hasName", "description", "hasSynonyms")}
+        rows = []
+        for r1, connected in self.incident(hour):
+            row = {
+                "hour": projected_hour,
+                "hourRelationshipType": r1.type,
+                "connectedNode": dict(connected.items()),
+                "hourRelationshipProperties": dict(r1.items()),
+                "connectedNodeLabels": sorted(connected.labels),
+            }
+            second_hops = self.incident(connected) if "PlanetEntity" in connected.labels else []
+            for r2, planet in second_hops:
+                rows.append(FakeRecord(row, planet=dict(planet.items()), planetRelationshipType=r2.type,
+                                       planetRelationshipProperties=dict(r2.items()),
+                                       planetLabels=sorted(planet.labels)))
+            if not second_hops:
+                rows.append(FakeRecord(row, planet=None, planetRelationshipType=None,
+                                       planetRelationshipProperties=None, planetLabels=None))
+        if not rows:
+            rows.append(FakeRecord(hour=projected_hour, hourRelationshipType=None, connectedNode=None,
+                                   hourRelationshipProperties=None, connectedNodeLabels=None, planet=None,
+                                   planetRelationshipType=None, planetRelationshipProperties=None,
+                                   planetLabels=None))
+        return rows
+
+
+    def _fulltext(self, lucene_query, limit):
+        # Every term of "(term* OR term~) AND ..." must occur in a name, label or synonym
+        terms = [re.sub(r"\\(.)", r"\1", term).lower() for term in FULLTEXT_TERM.findall(lucene_query)]
+        rows = []
+        for node in list(self.nodes.values()):
+            if "Searchable" not in node.labels:
+                continue
+            synonyms = node.get("hasSynonyms") or []
+            text = " ".join(str(value) for value in (node.get("hasName"), node.get("label"), *synonyms) if value).lower()
+            if terms and all(term in text for term in terms):
+                rows.append(FakeRecord(uri=node.get("uri"), name=node.get("hasName") or node.get("label"),
+                                       label=node.get("label"), labels=sorted(node.labels)))
+                if len(rows) >= limit:
+                    break
+        return rows
+
+
+class FakeTransaction:
+    def __init__(self, graph):
+        self._graph = graph
+
+    def run(self, query, parameters=None, **kwargs):
+        return FakeResult(self._graph.run(query, {**(parameters or {}), **kwargs}))
+
+
+class FakeSession(FakeTransaction):
+    """Stands in for neo4j.Session, including the managed transaction helpers."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def close(self):
+        pass
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(FakeTransaction(self._graph), *args, **kwargs)
+
+    execute_read = write_transaction = read_transaction = execute_write
+
+
+class FakeDriver:
+    """
+    Stands in for neo4j.Driver over a FakeGraph, so the app, the benchmarks and
+    the load test run without a database.
+    """
+
+    def __init__(self, graph=None):
+        self.graph = graph if graph is not None else FakeGraph.from_ontologies()
+
+    def session(self, **config):
+        return FakeSession(self.graph)
+
+    def verify_connectivity(self, **config):
+        return None
+
+    def pool_stats(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def install(graph=None):
+    """
+    Point the app's shared driver at a FakeDriver.
+
+    Call before importing the app's routes or calling create_app(): the app
+    refuses to start without connection details (placeholders are set here when
+    missing) and verifies connectivity at startup. Every module imports the same
+    InstrumentedDriver, so swapping what it wraps keeps query instrumentation
+    in place.
+
+    Returns:
+        FakeDriver: The installed driver.
+    """
+    for name, value in (("NEO4J_URI", "neo4j://fake:7687"), ("NEO4J_USER", "fake"), ("NEO4J_PASSWORD", "fake")):
+        os.environ.setdefault(name, value)
+    from app.routes.constants import neo4j_driver
+
+    fake = FakeDriver(graph)
+    neo4j_driver._driver = fake
+    return fake
+
+
+def _flatten(properties):
+    """Property definitions as __ontology_upload.flatten_properties stores them."""
+    flat = {}
+    for key, value in properties.items():
+        if isinstance(value, dict):
+            default = value.get("default")
+            flat[key] = [] if default is None else default
+        elif isinstance(value, list):
+            flat[key] = [item if isinstance(item, (str, int, float, bool)) else str(item) for item in value]
+        else:
+            flat[key] = value
+    return flat
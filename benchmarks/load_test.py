@@ -0,0 +1,320 @@
+"""
+Load generator replaying a realistic request mix against the app.
+
+    python benchmarks/load_test.py                                  # starts offline_app.py and tests it
+    python benchmarks/load_test.py --url http://127.0.0.1:8000      # tests a running server
+    python benchmarks/load_test.py --concurrency 1,8,32 --duration 30 --json capacity.json
+
+Traffic is a weighted mix of /api/geolocation_ephemeris, /api/filter_by_hour,
+/api/chart-svg and /api/graph_data, with locations drawn around real cities
+(weighted by metro population) and planetary hours drawn from the ontology.
+The mix is seeded, so two runs send the same requests; --record saves it and
+--replay sends a recorded file instead (JSON lines with "method", "path" and
+an optional "body" and "endpoint").
+
+For each concurrency level the report gives requests per second, p50/p95/p99
+latency and the error rate (transport errors and 4xx/5xx responses), overall
+and per endpoint.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+import yaml
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+HOURS_FILE = os.path.join(os.path.dirname(BENCHMARK_DIR), "ontologies", "magicHourEntity.yaml")
+
+# (city, latitude, longitude, metro population in millions)
+CITIES = [
+    ("Tokyo", 35.68, 139.69, 37.2),
+    ("Delhi", 28.61, 77.21, 32.9),
+    ("Shanghai", 31.23, 121.47, 29.2),
+    ("Sao Paulo", -23.55, -46.63, 22.6),
+    ("Mexico City", 19.43, -99.13, 22.3),
+    ("Cairo", 30.04, 31.24, 22.2),
+    ("Mumbai", 19.08, 72.88, 21.3),
+    ("Beijing", 39.90, 116.41, 21.3),
+    ("New York", 40.71, -74.01, 18.9),
+    ("Buenos Aires", -34.60, -58.38, 15.5),
+    ("Istanbul", 41.01, 28.98, 15.8),
+    ("Lagos", 6.52, 3.38, 15.9),
+    ("Los Angeles", 34.05, -118.24, 12.5),
+    ("Moscow", 55.76, 37.62, 12.7),
+    ("Paris", 48.86, 2.35, 11.2),
+    ("London", 51.51, -0.13, 9.6),
+    ("Bangkok", 13.76, 100.50, 11.1),
+    ("Johannesburg", -26.20, 28.05, 6.2),
+    ("Berlin", 52.52, 13.40, 3.6),
+    ("Madrid", 40.42, -3.70, 6.7),
+    ("Milan", 45.46, 9.19, 4.3),
+    ("Sydney", -33.87, 151.21, 5.3),
+    ("Toronto", 43.65, -79.38, 6.4),
+    ("Reykjavik", 64.15, -21.94, 0.2),
+]
+
+# Share of each endpoint in the generated mix
+ENDPOINT_WEIGHTS = {
+    "geolocation_ephemeris": 0.40,
+    "filter_by_hour": 0.25,
+    "chart_svg": 0.20,
+    "graph_data": 0.15,
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+def hour_uris():
+    with open(HOURS_FILE, "r") as f:
+        instances = yaml.safe_load(f).get("instances") or {}
+    return sorted(data["uri"] for data in instances.values() if isinstance(data, dict) and data.get("uri"))
+
+
+def generate_traffic(count, seed=0, jitter=0.05):
+    """
+    Build `count` requests of the endpoint mix.
+
+    Locations are a city picked by population plus up to `jitter` degrees of
+    noise, so requests spread over neighbouring cache cells as real users do.
+
+    Returns:
+        list: {"endpoint", "method", "path", "body"} dicts.
+    """
+    rng = random.Random(seed)
+    hours = hour_uris()
+    endpoints, endpoint_weights = zip(*ENDPOINT_WEIGHTS.items())
+    city_weights = [city[3] for city in CITIES]
+
+    traffic = []
+    for _ in range(count):
+        endpoint = rng.choices(endpoints, endpoint_weights)[0]
+        _, latitude, longitude, _ = rng.choices(CITIES, city_weights)[0]
+        location = {
+            "latitude": round(latitude + rng.uniform(-jitter, jitter), 4),
+            "longitude": round(longitude + rng.uniform(-jitter, jitter), 4),
+        }
+        if endpoint == "geolocation_ephemeris":
+            request = {"method": "POST", "path": "/api/geolocation_ephemeris", "body": location}
+        elif endpoint == "chart_svg":
+            request = {"method": "POST", "path": "/api/chart-svg", "body": location}
+        elif endpoint == "filter_by_hour":
+            request = {"method": "POST", "path": "/api/filter_by_hour", "body": {"hour_name": rng.choice(hours)}}
+        else:
+            request = {"method": "GET", "path": "/api/graph_data", "body": None}
+        traffic.append(dict(request, endpoint=endpoint))
+    return traffic
+
+
+def load_traffic(path):
+    traffic = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                request = json.loads(line)
+                request.setdefault("body", None)
+                request.setdefault("endpoint", request["path"])
+                traffic.append(request)
+    return traffic
+
+
+def save_traffic(path, traffic):
+    with open(path, "w") as f:
+        for request in traffic:
+            f.write(json.dumps(request) + "\n")
+
+
+class Client:
+    """One keep-alive connection, reopened after a transport error."""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connection = None
+
+    def send(self, request):
+        """Returns the response status, or None on a transport error."""
+        body = None
+        headers = {}
+        if request["body"] is not None:
+            body = json.dumps(request["body"])
+            headers["Content-Type"] = "application/json"
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request(request["method"], request["path"], body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            if response.getheader("Connection", "").lower() == "close":
+                self.close()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def run_level(host, port, traffic, concurrency, duration, timeout):
+    """
+    Send `traffic` round-robin from `concurrency` threads for `duration` seconds.
+
+    Returns:
+        tuple: ([(endpoint, latency ms, status or None)], elapsed seconds)
+    """
+    cursor = itertools.count()
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client = Client(host, port, timeout)
+        local = []
+        while time.perf_counter() < deadline:
+            request = traffic[next(cursor) % len(traffic)]
+            start = time.perf_counter()
+            status = client.send(request)
+            local.append((request["endpoint"], (time.perf_counter() - start) * 1000, status))
+        client.close()
+        samples.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for _, latency, _ in samples)
+    statuses = Counter("error" if status is None else str(status) for _, _, status in samples)
+    errors = sum(count for status, count in statuses.items() if status == "error" or int(status) >= 400)
+    summary = {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "statuses": dict(statuses),
+    }
+    for p in PERCENTILES:
+        value = percentile(latencies, p)
+        summary[f"p{p}_ms"] = None if value is None else round(value, 1)
+    return summary
+
+
+def report(concurrency, samples, elapsed):
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+
+    result = {"concurrency": concurrency, "duration_s": round(elapsed, 1), **summarize(samples, elapsed)}
+    result["endpoints"] = {endpoint: summarize(rows, elapsed) for endpoint, rows in sorted(by_endpoint.items())}
+
+    def line(name, summary):
+        latencies = " ".join(
+            f"{'-' if summary[f'p{p}_ms'] is None else summary[f'p{p}_ms']:>8}" for p in PERCENTILES
+        )
+        return f"  {name:<24} {summary['requests']:>8} {summary['rps']:>8} {latencies} {summary['error_rate']:>7.2%}"
+
+    print(f"\nconcurrency {concurrency} ({elapsed:.1f} s)")
+    print(f"  {'endpoint':<24} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    print(line("all", result))
+    for endpoint, summary in result["endpoints"].items():
+        print(line(endpoint, summary))
+    return result
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_offline_server(port, log_path=None, startup_timeout=180):
+    """Start offline_app.py on `port` and wait until it answers."""
+    log = open(log_path, "w") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARK_DIR, "offline_app.py"), "--port", str(port)],
+        stdout=log, stderr=log,
+    )
+    client = Client("127.0.0.1", port, timeout=5)
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"offline_app.py exited with status {process.returncode}")
+        if client.send({"method": "GET", "path": "/", "body": None}) == 200:
+            client.close()
+            return process
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"offline_app.py did not answer within {startup_timeout} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="server to test (default: start offline_app.py on a free port)")
+    parser.add_argument("--concurrency", default="1,4,16,32", help="comma separated levels (default 1,4,16,32)")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per level (default 20)")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of unrecorded traffic first (default 5)")
+    parser.add_argument("--requests", type=int, default=5000, help="size of the generated mix (default 5000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jitter", type=float, default=0.05, help="degrees of noise around each city")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--replay", help="send the requests recorded in this JSON lines file")
+    parser.add_argument("--record", help="write the generated mix to this JSON lines file")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--server-log", help="offline server output (default discarded)")
+    args = parser.parse_args(argv)
+
+    traffic = load_traffic(args.replay) if args.replay else generate_traffic(args.requests, args.seed, args.jitter)
+    if args.record:
+        save_traffic(args.record, traffic)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        print(f"Starting offline server on port {port}...", file=sys.stderr)
+        process = start_offline_server(port, args.server_log)
+
+    try:
+        if args.warmup > 0:
+            run_level(host, port, traffic, levels[0], args.warmup, args.timeout)
+        results = [report(level, *run_level(host, port, traffic, level, args.duration, args.timeout)) for level in levels]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target": args.url or "offline", "requests_in_mix": len(traffic), "levels": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
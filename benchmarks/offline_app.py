@@ -0,0 +1,37 @@
+"""
+The app served against the in-memory graph of fake_neo4j.py, for load tests
+without a database.
+
+    python benchmarks/offline_app.py [--port 8000]                       # threaded dev server
+    gunicorn -c gunicorn.conf.py --pythonpath benchmarks offline_app:app  # production setup
+
+Like wsgi.py, importing this module creates the app and warms the shared state.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_neo4j  # noqa: E402
+
+fake_neo4j.install()
+
+from app import create_app  # noqa: E402
+from app.utils.preload import warm_shared_state  # noqa: E402
+
+with contextlib.redirect_stdout(io.StringIO()):  # blueprint registration chatter
+    app = create_app()
+warm_shared_state()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the app against the fake Neo4j graph.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    app.run(host=args.host, port=args.port, threaded=True)
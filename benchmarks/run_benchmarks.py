@@ -0,0 +1,333 @@
+"""
+Benchmarks for the calculators, the ontology upload and the graph routes.
+
+    python benchmarks/run_benchmarks.py             # run, compare with this machine's baseline
+    python benchmarks/run_benchmarks.py --save      # run and record the results as the baseline
+    python benchmarks/run_benchmarks.py -k chart    # only benchmarks whose name contains "chart"
+
+Everything runs offline: Neo4j is replaced by the in-memory graph of
+fake_neo4j.py, and every calculation uses a fixed instant and fixed locations
+so runs are comparable. Baselines are stored per machine in baselines.json;
+the script exits with status 1 when a benchmark's best time is slower than its
+baseline by more than --threshold.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone as dt_timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_neo4j  # noqa: E402
+
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baselines.json")
+DEFAULT_THRESHOLD = 0.20
+
+# Fixed inputs: an equinox afternoon and three cities on different continents
+AT = datetime(2026, 3, 20, 14, 30, tzinfo=dt_timezone.utc)
+LOCATIONS = {
+    "milan": (45.46, 9.19),
+    "new_york": (40.71, -74.0),
+    "sydney": (-33.86, 151.2),
+}
+HOUR_URI = "monsieur:MagicHourEntity/Hour_8th_Of_Night_Sunday"
+
+# Files whose instances all belong to a class declared in the same file, as upload_from_yaml requires
+UPLOAD_FILES = ("planetEntity.yaml", "spiritualEntity.yaml", "zodiacalSignsEntity.yaml")
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register `setup` under `name`; setup prepares inputs and returns the callable to time."""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+# ------------------------------------
+# CALCULATORS
+# ------------------------------------
+
+def _calculator(location):
+    from app.routes.utils.ephemeris_calculator import EphemerisCalculator
+
+    latitude, longitude = LOCATIONS[location]
+    return EphemerisCalculator(latitude, longitude, at=AT)
+
+
+def _dataset(location):
+    return _calculator(location).generate_ephemeris_dataset()
+
+
+for _location in LOCATIONS:
+    @benchmark(f"ephemeris.generate_dataset[{_location}]")
+    def _generate_dataset(location=_location):
+        return lambda: _dataset(location)
+
+
+@benchmark("ephemeris.calculate_aspects")
+def _calculate_aspects():
+    calculator = _calculator("milan")
+    calculator.planetary_positions = calculator.calculate_planetary_positions()
+    return calculator.calculate_aspects
+
+
+@benchmark("ephemeris.calculate_complete_chart")
+def _calculate_complete_chart():
+    calculator = _calculator("milan")
+    calculator.planetary_positions = calculator.calculate_planetary_positions()
+    return calculator.calculate_complete_chart
+
+
+@benchmark("heatmap.calculate_heatmap_properties")
+def _heatmap_properties():
+    from app.routes.utils.heatmap_calculator import HeatmapCalculator
+
+    dataset = _dataset("milan")
+    info = dataset["additional_info"]
+    return lambda: HeatmapCalculator.calculate_heatmap_properties(
+        dataset, info.get("hour_ruler"), info.get("day_ruling_planet")
+    )
+
+
+@benchmark("chart.generate_chart_svg")
+def _chart_svg():
+    from app.routes.utils.chart_calculator import ChartCalculator
+
+    calculator = ChartCalculator()
+    ephemeris_data = {"ephemeris": _dataset("milan")}
+    return lambda: calculator.generate_chart_svg(ephemeris_data)
+
+
+# ------------------------------------
+# ONTOLOGY UPLOAD
+# ------------------------------------
+
+def _load_upload_module():
+    path = os.path.join(REPO_ROOT, "ontologies", "__ontology_upload.py")
+    spec = importlib.util.spec_from_file_location("ontology_upload", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@benchmark("ontology.upload_from_yaml")
+def _upload_from_yaml():
+    upload = _load_upload_module()
+    paths = [os.path.join(REPO_ROOT, "ontologies", name) for name in UPLOAD_FILES]
+
+    def run():
+        # A fresh graph per run, so every MERGE creates instead of matching
+        upload.driver = fake_neo4j.FakeDriver(fake_neo4j.FakeGraph())
+        with contextlib.redirect_stdout(io.StringIO()):  # upload_instance prints every instance
+            for path in paths:
+                upload.upload_from_yaml(path)
+    return run
+
+
+# ------------------------------------
+# GRAPH ROUTES
+# ------------------------------------
+
+_client = None
+
+
+def _test_client():
+    global _client
+    if _client is None:
+        from app import create_app
+
+        with contextlib.redirect_stdout(io.StringIO()):  # blueprint registration chatter
+            app = create_app()
+        _client = app.test_client()
+    return _client
+
+
+def _checked(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.request.path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+@benchmark("route.graph_data")
+def _graph_data_route():
+    client = _test_client()
+    return lambda: _checked(client.get("/api/graph_data"))
+
+
+@benchmark("route.filter_by_hour")
+def _filter_by_hour_route():
+    # Served from the hour graph cache after the first call
+    client = _test_client()
+    return lambda: _checked(client.post("/api/filter_by_hour", json={"hour_name": HOUR_URI}))
+
+
+@benchmark("graph.build_hour_graph")
+def _build_hour_graph():
+    # The uncached part of /api/filter_by_hour: query and reshape
+    _test_client()
+    from app.routes.graph import build_hour_graph
+
+    return lambda: build_hour_graph(HOUR_URI)
+
+
+# ------------------------------------
+# TERMINAL COMMANDS (target: well under 10 ms each)
+# ------------------------------------
+
+TERMINAL_COMMANDS = ("hour", "moon", "aspects", "planet mars", "whois Raphael")
+
+for _query in TERMINAL_COMMANDS:
+    @benchmark(f"terminal.execute[{_query}]")
+    def _terminal_command(query=_query):
+        # Answers "now" from the snapshot cache; a run that crosses a snapshot
+        # bucket pays for one recomputation, which the best time ignores
+        from app.services import terminal
+
+        latitude, longitude = LOCATIONS["milan"]
+        return lambda: terminal.execute(query, latitude, longitude)
+
+
+# Commands that read the sky must refuse cleanly (400) before a location is known
+SKY_COMMANDS = ("hour", "moon", "aspects", "planet mars")
+
+
+@benchmark("terminal.execute[no location]")
+def _terminal_without_location():
+    from app.services import terminal
+
+    def run():
+        for query in SKY_COMMANDS:
+            try:
+                terminal.execute(query)
+            except terminal.TerminalError:
+                continue
+            raise AssertionError(f"'{query}' without a location did not raise TerminalError")
+
+    return run
+
+
+# ------------------------------------
+# RUNNER
+# ------------------------------------
+
+def measure(function, repeat, min_time):
+    """
+    Time `function` like timeit: the loop count grows until one repeat takes at
+    least `min_time` seconds, then `repeat` repeats are run with GC disabled.
+
+    Returns:
+        dict: "best_ms" and "median_ms" per call, and the "loops" per repeat.
+    """
+    function()  # Warm-up: lazy tables, lru caches, first-use imports
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    per_call = [elapsed / number * 1000 for elapsed in timer.repeat(repeat, number)]
+    return {"best_ms": round(min(per_call), 4), "median_ms": round(statistics.median(per_call), 4), "loops": number}
+
+
+def load_baselines(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, machine, results):
+    baselines = load_baselines(path)
+    previous = baselines.get(machine, {}).get("results", {})
+    baselines[machine] = {
+        "python": platform.python_version(),
+        "saved_at": datetime.now(dt_timezone.utc).isoformat(timespec="seconds"),
+        # Benchmarks not run this time (-k) keep their previous baseline
+        "results": {**previous, **results},
+    }
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, threshold):
+    """
+    Print each result next to its baseline.
+
+    Returns:
+        list: Names of the benchmarks slower than baseline * (1 + threshold).
+    """
+    regressions = []
+    print(f"{'benchmark':<44} {'best ms':>10} {'median ms':>10} {'baseline':>10} {'change':>8}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        line = f"{name:<44} {result['best_ms']:>10.3f} {result['median_ms']:>10.3f}"
+        if reference:
+            change = result["best_ms"] / reference["best_ms"] - 1
+            flag = ""
+            if change > threshold:
+                regressions.append(name)
+                flag = "  REGRESSION"
+            line += f" {reference['best_ms']:>10.3f} {change:>+8.1%}{flag}"
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats per benchmark (default 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repeat (default 0.2)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown of the best time before failing (default 0.20 = 20%%)")
+    parser.add_argument("--baseline-file", default=BASELINE_FILE)
+    parser.add_argument("--machine", default=platform.node() or "default",
+                        help="baseline name; results are only compared on the same machine (default hostname)")
+    parser.add_argument("--save", action="store_true", help="record the results as this machine's baseline")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.pattern in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    fake_neo4j.install()
+    results = {}
+    for name in names:
+        function = BENCHMARKS[name]()
+        results[name] = measure(function, args.repeat, args.min_time)
+        print(f"  {name}: {results[name]['best_ms']:.3f} ms", file=sys.stderr)
+
+    baseline = load_baselines(args.baseline_file).get(args.machine, {}).get("results", {})
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        save_baseline(args.baseline_file, args.machine, results)
+        print(f"Saved baseline for {args.machine} to {args.baseline_file}")
+        return 0
+    if not baseline:
+        print(f"No baseline for {args.machine}; run with --save to record one")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
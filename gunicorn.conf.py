@@ -0,0 +1,44 @@
+# Gunicorn configuration for the preload-and-fork deployment:
+#
+#     gunicorn -c gunicorn.conf.py
+#
+# Workers and threads come from the environment (WEB_CONCURRENCY, WEB_THREADS).
+# Graceful reload:
+#   kill -HUP <master>   re-reads this file and replaces the workers one by one.
+#                        With preloading the app code is NOT re-imported.
+#   kill -USR2 <master>  starts a new master from the current code alongside the
+#                        old one; then kill -QUIT <old master> once it is up.
+import multiprocessing
+import os
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# create_app() and the warm-up run once in the master; workers fork from it
+preload_app = True
+
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+# An open /api/stream/sky connection holds its thread for as long as the page is
+# open, so each worker gets WEB_THREADS threads for ordinary requests plus one
+# per stream it accepts. The app refuses streams beyond SKY_STREAM_MAX_ACTIVE
+# per worker with 429 (see app/routes/stream.py), so streams can never take the
+# ordinary threads; the deployment serves at most workers * SKY_STREAM_MAX_ACTIVE
+# streams at once.
+stream_threads = int(os.getenv("SKY_STREAM_MAX_ACTIVE", "16"))
+threads = int(os.getenv("WEB_THREADS", "4")) + stream_threads
+worker_class = "gthread"
+
+timeout = int(os.getenv("WEB_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Recycle workers periodically (0 disables); jitter avoids restarting them all at once
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+
+def post_fork(server, worker):
+    # The Neo4j driver is created lazily per process (ForkSafeDriver); nothing
+    # inherited from the master is reused
+    server.log.info("Worker %s forked from preloaded master", worker.pid)
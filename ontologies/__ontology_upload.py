@@ -89,6 +89,8 @@
 # UPLOAD CLASSES SUBCCLASSES AND INSTANCES
 # ------------------------------------
 
+import uuid
+
 import yaml
 from neo4j import GraphDatabase
 
@@ -114,15 +116,25 @@ def create_constraints():
         session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (n:MagicHourEntity) REQUIRE n.uri IS UNIQUE;")
 
 
+# Create the full-text index used by /api/autocomplete
+def create_fulltext_index():
+    with driver.session() as session:
+        session.run("""
+        CREATE FULLTEXT INDEX entityNames IF NOT EXISTS
+        FOR (n:Searchable) ON EACH [n.hasName, n.label, n.hasSynonyms]
+        """)
+
+
 # Create nodes with properties
 def create_node(tx, label, uri, properties):
     label = label.replace(" ", "").split(":")[-1]  # Normalize the label
     if not label:
         raise ValueError("Node label cannot be empty.")
 
+    # Every uploaded node also gets :Searchable so one full-text index covers all entities
     query = f"""
     MERGE (n:{label} {{ uri: $uri }})
-    SET n += $properties
+    SET n += $properties, n:Searchable
     RETURN n
     """
     tx.run(query, uri=uri, properties=properties)
@@ -239,6 +251,15 @@ def upload_instance(tx, instance_name, instance_data, default_properties, classe
         create_instance_relationship(tx, label, uri, parent_label, parent_uri)
 
 
+def stamp_upload(tx):
+    # The app caches graph responses per stamp (see app/routes/graph.py), so
+    # every upload must change it
+    tx.run("""
+    MERGE (v:OntologyVersion { id: 'current' })
+    SET v.version = $version, v.uploaded_at = datetime()
+    """, version=uuid.uuid4().hex)
+
+
 def upload_from_yaml(yaml_file):
     with open(yaml_file, "r") as file:
         data = yaml.safe_load(file)
@@ -248,8 +269,9 @@ def upload_from_yaml(yaml_file):
         superclass = classes.get("Entity", {})
         default_properties = flatten_properties(superclass.get("defaultProperties", {}))
 
-        # Step 1: Create constraints
+        # Step 1: Create constraints and the full-text index
         create_constraints()
+        create_fulltext_index()
 
         # Step 2: Create class nodes and SUBCLASS_OF relationships
         for class_name, class_data in classes.items():
@@ -289,9 +311,13 @@ def upload_from_yaml(yaml_file):
                 classes
             )
 
-# Specify the path to your YAML file
-yaml_file_path = "/Users/fede/Desktop/git/monsieur_neo/ontologies/colorEntity.yaml"
-upload_from_yaml(yaml_file_path)
+        # Step 4: Record that the graph changed
+        session.write_transaction(stamp_upload)
+
+# Specify the path to your YAML file (guarded so benchmarks/ can import upload_from_yaml)
+if __name__ == "__main__":
+    yaml_file_path = "/Users/fede/Desktop/git/monsieur_neo/ontologies/colorEntity.yaml"
+    upload_from_yaml(yaml_file_path)
 
 
 # ------------------------------------
@@ -0,0 +1,296 @@
+#-----------------------------------------
+# ONTOLOGY RDF EXPORTER
+# Streams every ontology YAML to gzip-compressed N-Triples or Turtle.
+#
+# Triples are written line by line as each class and instance is read, so memory
+# stays bounded by the largest single YAML file instead of growing with the
+# corpus. Files are converted in parallel, one output per input, and the
+# per-file outputs are concatenated into one combined file (concatenated gzip
+# members are a valid gzip stream, so nothing is recompressed).
+#
+# Usage:
+#   python ontologies/_ontology_exporter.py                          # N-Triples
+#   python ontologies/_ontology_exporter.py --format turtle
+#   python ontologies/_ontology_exporter.py --output-dir /srv/ontology
+#-----------------------------------------
+
+import argparse
+import glob
+import gzip
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+# The libyaml loader is several times faster than the pure Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ONTOLOGY_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPORT_DIR = os.path.join(ONTOLOGY_DIR, "export")
+
+# Define namespaces
+MONSIEUR = "http://monsieur.org/ontology#"
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+OWL = "http://www.w3.org/2002/07/owl#"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+FORMATS = {
+    "ntriples": ".nt.gz",
+    "turtle": ".ttl.gz",
+}
+
+# Property names kept from the original magic hour OWL export
+PROPERTY_NAMES = {
+    "hasName": "name",
+    "hasImage": "image",
+    "hasSynonyms": "synonyms",
+}
+
+PROPERTY_SECTIONS = ("defaultProperties", "classProperties", "subclassProperties")
+
+_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_ESCAPE_TABLE = str.maketrans(_ESCAPES)
+
+
+# ------------------------------------
+# TERMS
+# ------------------------------------
+
+def iri(uri):
+    """Expand a `monsieur:` URI to a full IRI term."""
+    if uri.startswith("monsieur:"):
+        uri = MONSIEUR + uri[len("monsieur:"):]
+    return f"<{uri.replace(' ', '_').replace('>', '%3E')}>"
+
+
+def monsieur(name):
+    return f"<{MONSIEUR}{name}>"
+
+
+def literal(value):
+    """Serialize a YAML scalar as a typed literal term."""
+    if isinstance(value, bool):
+        return f'"{str(value).lower()}"^^<{XSD}boolean>'
+    if isinstance(value, int):
+        return f'"{value}"^^<{XSD}integer>'
+    if isinstance(value, float):
+        return f'"{value!r}"^^<{XSD}double>'
+    # Plain literals are xsd:string in RDF 1.1
+    return '"' + str(value).translate(_ESCAPE_TABLE) + '"'
+
+
+RDF_TYPE = f"<{RDF}type>"
+RDFS_LABEL = f"<{RDFS}label>"
+RDFS_COMMENT = f"<{RDFS}comment>"
+RDFS_SUBCLASS_OF = f"<{RDFS}subClassOf>"
+OWL_CLASS = f"<{OWL}Class>"
+DEFINITION = monsieur("definition")
+HAS_ANALOGY_WITH = monsieur("hasAnalogyWith")
+
+
+# ------------------------------------
+# STATEMENTS
+# ------------------------------------
+
+def class_statements(classes):
+    """
+    Yield (subject, [(predicate, object), ...]) for every class definition.
+    """
+    for class_name, class_data in classes.items():
+        if not isinstance(class_data, dict) or not class_data.get("uri"):
+            continue
+        subject = iri(class_data["uri"])
+        pairs = [(RDF_TYPE, OWL_CLASS), (RDFS_LABEL, literal(class_data.get("label", class_name)))]
+        if class_data.get("description"):
+            pairs.append((RDFS_COMMENT, literal(class_data["description"])))
+        parent = class_data.get("subClassOf")
+        if parent:
+            parent_uri = (classes.get(parent) or {}).get("uri") or f"monsieur:{parent}"
+            pairs.append((RDFS_SUBCLASS_OF, iri(parent_uri)))
+        yield subject, pairs
+
+
+def instance_statements(instances, classes):
+    """
+    Yield (subject, [(predicate, object), ...]) for every instance.
+
+    Parent classes defined in another file are referenced as `monsieur:<ClassName>`,
+    which is how top-level class URIs are written throughout the corpus.
+    """
+    for instance_name, details in instances.items():
+        if not isinstance(details, dict) or not details.get("uri"):
+            continue
+        subject = iri(details["uri"])
+        pairs = []
+
+        for relationship in details.get("relationships") or []:
+            if isinstance(relationship, dict) and relationship.get("HAS_MEMBER"):
+                parent = relationship["HAS_MEMBER"]
+                parent_uri = (classes.get(parent) or {}).get("uri") or f"monsieur:{parent}"
+                pairs.append((RDF_TYPE, iri(parent_uri)))
+
+        pairs.append((RDFS_LABEL, literal(details.get("label") or instance_name)))
+        pairs.append((DEFINITION, literal(details.get("description") or "")))
+
+        # Add basic properties, one triple per list item
+        for section in PROPERTY_SECTIONS:
+            for prop, value in (details.get(section) or {}).items():
+                predicate = monsieur(PROPERTY_NAMES.get(prop, prop.rstrip(":")))
+                values = value if isinstance(value, list) else [value]
+                for item in values:
+                    if item is not None and item != "" and not isinstance(item, (dict, list)):
+                        pairs.append((predicate, literal(item)))
+
+        # Add analogies
+        for analogy in (details.get("analogyProperties") or {}).get("hasAnalogyWith") or []:
+            target_uri = ((analogy or {}).get("targetEntity") or {}).get("uri") if isinstance(analogy, dict) else None
+            if target_uri:
+                pairs.append((HAS_ANALOGY_WITH, iri(target_uri)))
+
+        # Add discovered relationships
+        for relationship in (details.get("discoveredRelationships") or {}).get("hasRelationshipWith") or []:
+            if not isinstance(relationship, dict):
+                continue
+            relationship_type = relationship.get("relationshipType")
+            related_uri = (relationship.get("relatedEntity") or {}).get("uri")
+            if relationship_type and related_uri:
+                pairs.append((monsieur(relationship_type), iri(related_uri)))
+
+        yield subject, pairs
+
+
+# ------------------------------------
+# WRITERS
+# ------------------------------------
+
+def write_ntriples(out, statements):
+    count = 0
+    for subject, pairs in statements:
+        for predicate, obj in pairs:
+            out.write(f"{subject} {predicate} {obj} .\n")
+        count += len(pairs)
+    return count
+
+
+def write_turtle(out, statements):
+    count = 0
+    for subject, pairs in statements:
+        if not pairs:
+            continue
+        body = " ;\n    ".join(f"{predicate} {obj}" for predicate, obj in pairs)
+        out.write(f"{subject}\n    {body} .\n\n")
+        count += len(pairs)
+    return count
+
+
+WRITERS = {
+    "ntriples": write_ntriples,
+    "turtle": write_turtle,
+}
+
+
+def export_file(path, output_dir=EXPORT_DIR, fmt="ntriples", base_dir=ONTOLOGY_DIR):
+    """
+    Convert one ontology YAML file to a gzip-compressed RDF file.
+
+    Args:
+        path (str): Absolute path of the YAML file.
+        output_dir (str): Directory the compressed output is written to.
+        fmt (str): "ntriples" or "turtle".
+        base_dir (str): Directory the output name is derived relative to.
+
+    Returns:
+        dict: Source file, output file, triple count, or the error raised.
+    """
+    relative = os.path.relpath(path, base_dir)
+    name = os.path.splitext(relative)[0].replace(os.sep, "__")
+    destination = os.path.join(output_dir, name + FORMATS[fmt])
+
+    try:
+        with open(path, "r") as f:
+            data = yaml.load(f, Loader=YAML_LOADER)
+    except yaml.YAMLError as e:
+        return {"file": relative, "output": None, "triples": 0, "error": str(e)}
+
+    if not isinstance(data, dict):
+        return {"file": relative, "output": None, "triples": 0, "error": "File does not contain a mapping."}
+
+    classes = data.get("classes") or {}
+    instances = data.get("instances") or {}
+    writer = WRITERS[fmt]
+
+    with gzip.open(destination, "wt", encoding="utf-8", compresslevel=6) as out:
+        count = writer(out, class_statements(classes))
+        count += writer(out, instance_statements(instances, classes))
+
+    return {"file": relative, "output": destination, "triples": count, "error": None}
+
+
+def combine(outputs, destination):
+    """Concatenate per-file gzip outputs into a single gzip stream."""
+    with open(destination, "wb") as combined:
+        for output in outputs:
+            with open(output, "rb") as part:
+                shutil.copyfileobj(part, combined)
+    return destination
+
+
+def export_corpus(ontology_dir=ONTOLOGY_DIR, output_dir=EXPORT_DIR, fmt="ntriples", recursive=False, workers=None):
+    """
+    Export every ontology file in parallel and combine the results.
+
+    Returns:
+        dict: Per-file results plus the combined output path and totals.
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    pattern = os.path.join(ontology_dir, "**", "*.yaml") if recursive else os.path.join(ontology_dir, "*.yaml")
+    files = sorted(glob.glob(pattern, recursive=recursive))
+
+    args = (files, [output_dir] * len(files), [fmt] * len(files), [ontology_dir] * len(files))
+    if workers == 1 or len(files) <= 1:
+        results = list(map(export_file, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(export_file, *args))
+
+    outputs = [result["output"] for result in results if result["output"]]
+    combined = combine(outputs, os.path.join(output_dir, "ontology" + FORMATS[fmt]))
+
+    return {
+        "combined": combined,
+        "files": results,
+        "triples": sum(result["triples"] for result in results),
+        "errors": sum(1 for result in results if result["error"]),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the ontology corpus as compressed RDF.")
+    parser.add_argument("ontology_dir", nargs="?", default=ONTOLOGY_DIR)
+    parser.add_argument("--output-dir", default=EXPORT_DIR)
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ntriples")
+    parser.add_argument("--recursive", action="store_true", help="Include YAML files in subfolders.")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (1 = no pool).")
+    args = parser.parse_args(argv)
+
+    summary = export_corpus(args.ontology_dir, args.output_dir, args.format, args.recursive, args.workers)
+
+    for result in summary["files"]:
+        if result["error"]:
+            print(f"[ERROR] {result['file']}: {result['error']}")
+        else:
+            print(f"[INFO] {result['file']}: {result['triples']} triples")
+    print(f"[INFO] {summary['triples']} triples written to {summary['combined']} in {summary['elapsed_ms']} ms")
+
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+#-----------------------------------------
+# ONTOLOGY VALIDATOR
+# Validates every ontology YAML against the property definitions declared in
+# _superclassEntity.yaml and in the class blocks of each file, then checks that
+# every referenced URI resolves somewhere in the corpus.
+#
+# Usage:
+#   python ontologies/_ontology_validator.py                  # top-level files
+#   python ontologies/_ontology_validator.py --recursive      # include subfolders
+#   python ontologies/_ontology_validator.py -o report.json   # write report to file
+#-----------------------------------------
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+# The libyaml loader is several times faster than the pure Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ONTOLOGY_DIR = os.path.dirname(os.path.abspath(__file__))
+SUPERCLASS_FILE = "_superclassEntity.yaml"
+ROOT_CLASS = "Entity"
+
+# Regular expression to validate URI format
+URI_REGEX = re.compile(r"^monsieur:[A-Za-z]+(/[A-Za-z0-9_()]+)*$")
+
+# Property sections of a class definition and the instance section they describe
+CLASS_SECTIONS = {
+    "defaultProperties": "defaultProperties",
+    "classProperties": "classProperties",
+    "subclassProperties": "subclassProperties",
+    "subClassProperties": "subclassProperties",
+}
+
+INSTANCE_REQUIRED_KEYS = ("uri", "label", "description")
+CLASS_REQUIRED_KEYS = ("type", "uri", "label", "description")
+
+
+# Basic validators
+def validate_uri(uri):
+    # Accept URIs that start with either 'monsieur:' or 'http(s)://'
+    return isinstance(uri, str) and (bool(URI_REGEX.match(uri)) or uri.startswith(("http://", "https://")))
+
+def validate_string(value):
+    return isinstance(value, str)
+
+def validate_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def validate_boolean(value):
+    return isinstance(value, bool)
+
+def validate_float(value):
+    # Integers are accepted for floats, booleans are not
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+XSD_VALIDATORS = {
+    "xsd:string": validate_string,
+    "xsd:string[]": validate_string_list,
+    "xsd:boolean": validate_boolean,
+    "xsd:float": validate_float,
+}
+
+
+def _issue(level, file, path, message):
+    return {"level": level, "file": file, "path": path, "message": message}
+
+
+# ------------------------------------
+# PHASE 1: PARSE AND SCAN (runs in the process pool)
+# ------------------------------------
+
+def _check_analogy(entry, file, path, issues, references):
+    """Check one hasAnalogyWith entry and collect its target reference."""
+    if not isinstance(entry, dict):
+        issues.append(_issue("error", file, path, "Analogy entry must be a mapping."))
+        return
+
+    target_uri = (entry.get("targetEntity") or {}).get("uri")
+    if not validate_uri(target_uri):
+        issues.append(_issue("error", file, f"{path}.targetEntity.uri", f"Invalid target URI: {target_uri!r}"))
+    else:
+        references.append((path + ".targetEntity.uri", target_uri))
+
+    system_uri = (entry.get("analogySystem") or {}).get("uri")
+    if not system_uri:
+        issues.append(_issue("warning", file, f"{path}.analogySystem.uri", "Missing analogy system."))
+    elif not validate_uri(system_uri):
+        issues.append(_issue("error", file, f"{path}.analogySystem.uri", f"Invalid system URI: {system_uri!r}"))
+    else:
+        references.append((path + ".analogySystem.uri", system_uri))
+
+    confidence = entry.get("confidence")
+    if confidence is not None:
+        score = confidence.get("score") if isinstance(confidence, dict) else None
+        if not validate_float(score):
+            issues.append(_issue("error", file, f"{path}.confidence.score", f"Invalid confidence score: {score!r}"))
+
+
+def _check_relationship(entry, file, path, issues, references):
+    """Check one hasRelationshipWith entry and collect its related entity reference."""
+    if not isinstance(entry, dict):
+        issues.append(_issue("error", file, path, "Relationship entry must be a mapping."))
+        return
+
+    if not entry.get("relationshipType") or not isinstance(entry["relationshipType"], str):
+        issues.append(_issue("error", file, f"{path}.relationshipType", "Missing relationship type."))
+
+    related_uri = (entry.get("relatedEntity") or {}).get("uri")
+    if not validate_uri(related_uri):
+        issues.append(_issue("error", file, f"{path}.relatedEntity.uri", f"Invalid related URI: {related_uri!r}"))
+    else:
+        references.append((path + ".relatedEntity.uri", related_uri))
+
+
+def scan_file(path, base_dir=ONTOLOGY_DIR):
+    """
+    Parse one ontology file and run every check that needs only the file itself.
+
+    Args:
+        path (str): Absolute path of the YAML file.
+        base_dir (str): Directory the file name is reported relative to.
+
+    Returns:
+        dict: Classes, declared URIs, outgoing references, instance properties and issues.
+    """
+    file = os.path.relpath(path, base_dir)
+    scan = {
+        "file": file,
+        "classes": {},
+        "declared": [],
+        "references": [],
+        "instances": {},
+        "issues": [],
+    }
+    issues = scan["issues"]
+
+    try:
+        with open(path, "r") as f:
+            data = yaml.load(f, Loader=YAML_LOADER)
+    except yaml.YAMLError as e:
+        issues.append(_issue("error", file, "", f"YAML parse error: {e}"))
+        return scan
+
+    if not isinstance(data, dict):
+        issues.append(_issue("error", file, "", "File does not contain a mapping."))
+        return scan
+
+    for key in data:
+        if key not in ("ontology", "classes", "instances"):
+            issues.append(_issue("warning", file, key, "Unexpected top-level key."))
+
+    # Classes
+    for class_name, class_data in (data.get("classes") or {}).items():
+        class_path = f"classes.{class_name}"
+        if not isinstance(class_data, dict):
+            issues.append(_issue("error", file, class_path, "Class definition must be a mapping."))
+            continue
+        for key in CLASS_REQUIRED_KEYS:
+            if key not in class_data:
+                issues.append(_issue("error", file, class_path, f"Missing required key: {key}"))
+        uri = class_data.get("uri")
+        if validate_uri(uri):
+            scan["declared"].append((class_path, uri))
+        else:
+            issues.append(_issue("error", file, f"{class_path}.uri", f"Invalid URI: {uri!r}"))
+        scan["classes"][class_name] = class_data
+
+    # Instances
+    for instance_name, instance_data in (data.get("instances") or {}).items():
+        instance_path = f"instances.{instance_name}"
+        if not isinstance(instance_data, dict):
+            issues.append(_issue("error", file, instance_path, "Instance definition must be a mapping."))
+            continue
+        for key in INSTANCE_REQUIRED_KEYS:
+            if not instance_data.get(key):
+                issues.append(_issue("error", file, instance_path, f"Missing required key: {key}"))
+
+        uri = instance_data.get("uri")
+        if validate_uri(uri):
+            scan["declared"].append((instance_path, uri))
+        elif uri:
+            issues.append(_issue("error", file, f"{instance_path}.uri", f"Invalid URI: {uri!r}"))
+
+        parent_class = None
+        for relationship in instance_data.get("relationships") or []:
+            if isinstance(relationship, dict) and relationship.get("HAS_MEMBER"):
+                parent_class = relationship["HAS_MEMBER"]
+                break
+        if not parent_class:
+            issues.append(_issue("warning", file, instance_path, "No HAS_MEMBER parent class."))
+
+        analogies = (instance_data.get("analogyProperties") or {}).get("hasAnalogyWith") or []
+        for i, entry in enumerate(analogies):
+            _check_analogy(entry, file, f"{instance_path}.analogyProperties.hasAnalogyWith[{i}]",
+                           issues, scan["references"])
+
+        relationships = (instance_data.get("discoveredRelationships") or {}).get("hasRelationshipWith") or []
+        for i, entry in enumerate(relationships):
+            _check_relationship(entry, file, f"{instance_path}.discoveredRelationships.hasRelationshipWith[{i}]",
+                                issues, scan["references"])
+
+        # Keep only what the plan-based checks need
+        scan["instances"][instance_name] = {
+            "class": parent_class,
+            "sections": {
+                section: instance_data.get(section)
+                for section in set(CLASS_SECTIONS.values())
+                if section in instance_data
+            },
+        }
+
+    return scan
+
+
+# ------------------------------------
+# PHASE 2: COMPILE VALIDATION PLANS
+# ------------------------------------
+
+def compile_plans(classes):
+    """
+    Compile the property definitions of every class into a flat validation plan.
+
+    Each class inherits the definitions of its subClassOf chain up to Entity, so an
+    instance is checked against a single precomputed table instead of walking the
+    hierarchy per property.
+
+    Args:
+        classes (dict): All class definitions of the corpus, keyed by class name.
+
+    Returns:
+        dict: Class name -> {instance section: {property: (xsd type, validator)}}.
+    """
+    plans = {}
+
+    def build(class_name, seen):
+        if class_name in plans:
+            return plans[class_name]
+        class_data = classes.get(class_name) or {}
+        parent = class_data.get("subClassOf")
+        if parent and parent not in seen and parent in classes:
+            inherited = build(parent, seen | {class_name})
+        else:
+            inherited = {}
+
+        plan = {section: dict(props) for section, props in inherited.items()}
+        for class_section, instance_section in CLASS_SECTIONS.items():
+            for prop, definition in (class_data.get(class_section) or {}).items():
+                if isinstance(definition, dict) and definition.get("type") in XSD_VALIDATORS:
+                    xsd_type = definition["type"]
+                    plan.setdefault(instance_section, {})[prop] = (xsd_type, XSD_VALIDATORS[xsd_type])
+
+        plans[class_name] = plan
+        return plan
+
+    for class_name in classes:
+        build(class_name, frozenset())
+    return plans
+
+
+def apply_plans(scans, plans):
+    """Type-check every instance's property sections against its class plan."""
+    issues = []
+    root_plan = plans.get(ROOT_CLASS, {})
+    for scan in scans:
+        file = scan["file"]
+        for instance_name, instance in scan["instances"].items():
+            instance_path = f"instances.{instance_name}"
+            class_name = instance["class"]
+            plan = plans.get(class_name)
+            if plan is None:
+                if class_name:
+                    issues.append(_issue("warning", file, instance_path, f"Unknown class: {class_name}"))
+                plan = root_plan
+
+            for section, values in instance["sections"].items():
+                if not isinstance(values, dict):
+                    issues.append(_issue("error", file, f"{instance_path}.{section}", "Section must be a mapping."))
+                    continue
+                expected = plan.get(section, {})
+                for prop, value in values.items():
+                    rule = expected.get(prop)
+                    if rule is None:
+                        issues.append(_issue("warning", file, f"{instance_path}.{section}.{prop}",
+                                             "Property not defined by the class."))
+                    elif value is not None and not rule[1](value):
+                        issues.append(_issue("error", file, f"{instance_path}.{section}.{prop}",
+                                             f"Expected {rule[0]}, got {type(value).__name__}: {value!r}"))
+    return issues
+
+
+# ------------------------------------
+# PHASE 3: CROSS-FILE REFERENTIAL INTEGRITY
+# ------------------------------------
+
+def build_uri_index(scans):
+    """Map every declared URI to the file and path that declares it."""
+    index = {}
+    issues = []
+    for scan in scans:
+        for path, uri in scan["declared"]:
+            if uri in index:
+                first_file, first_path = index[uri]
+                issues.append(_issue("error", scan["file"], path,
+                                     f"Duplicate URI {uri} (first declared in {first_file}:{first_path})"))
+            else:
+                index[uri] = (scan["file"], path)
+    return index, issues
+
+
+def resolve_references(scans, uri_index):
+    """Report every referenced URI that is not declared anywhere in the corpus."""
+    issues = []
+    for scan in scans:
+        for path, uri in scan["references"]:
+            if uri not in uri_index:
+                issues.append(_issue("error", scan["file"], path, f"Unresolved URI: {uri}"))
+    return issues
+
+
+# ------------------------------------
+# ENTRY POINT
+# ------------------------------------
+
+def find_ontology_files(ontology_dir=ONTOLOGY_DIR, recursive=False):
+    """List the ontology YAML files, superclass first."""
+    pattern = os.path.join(ontology_dir, "**", "*.yaml") if recursive else os.path.join(ontology_dir, "*.yaml")
+    files = sorted(glob.glob(pattern, recursive=recursive))
+    files.sort(key=lambda path: os.path.basename(path) != SUPERCLASS_FILE)
+    return files
+
+
+def validate_corpus(ontology_dir=ONTOLOGY_DIR, recursive=False, workers=None):
+    """
+    Validate the whole ontology corpus.
+
+    Args:
+        ontology_dir (str): Directory holding the ontology YAML files.
+        recursive (bool): Include YAML files in subfolders.
+        workers (int, optional): Process pool size. 1 runs everything in-process.
+
+    Returns:
+        dict: Machine-readable report with a summary and the issues grouped by file.
+    """
+    start = time.perf_counter()
+    files = find_ontology_files(ontology_dir, recursive)
+
+    if workers == 1 or len(files) <= 1:
+        scans = [scan_file(path, ontology_dir) for path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scans = list(pool.map(scan_file, files, [ontology_dir] * len(files)))
+
+    classes = {}
+    for scan in scans:
+        classes.update(scan["classes"])
+    plans = compile_plans(classes)
+    uri_index, duplicate_issues = build_uri_index(scans)
+
+    issues = [issue for scan in scans for issue in scan["issues"]]
+    issues += duplicate_issues
+    issues += apply_plans(scans, plans)
+    issues += resolve_references(scans, uri_index)
+
+    report_files = {scan["file"]: {"errors": [], "warnings": []} for scan in scans}
+    for issue in issues:
+        bucket = "errors" if issue["level"] == "error" else "warnings"
+        report_files[issue["file"]][bucket].append({"path": issue["path"], "message": issue["message"]})
+
+    error_count = sum(len(entry["errors"]) for entry in report_files.values())
+    warning_count = sum(len(entry["warnings"]) for entry in report_files.values())
+
+    return {
+        "summary": {
+            "valid": error_count == 0,
+            "files": len(files),
+            "classes": len(classes),
+            "instances": sum(len(scan["instances"]) for scan in scans),
+            "uris": len(uri_index),
+            "references": sum(len(scan["references"]) for scan in scans),
+            "errors": error_count,
+            "warnings": warning_count,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        },
+        "files": report_files,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the ontology YAML corpus.")
+    parser.add_argument("ontology_dir", nargs="?", default=ONTOLOGY_DIR)
+    parser.add_argument("--recursive", action="store_true", help="Include YAML files in subfolders.")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (1 = no pool).")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = validate_corpus(args.ontology_dir, recursive=args.recursive, workers=args.workers)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    return 0 if report["summary"]["valid"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
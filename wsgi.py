@@ -0,0 +1,11 @@
+"""
+Production entry point: `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+The app is created and its read-only state warmed once in the master; workers
+are forked from it and share those pages copy-on-write.
+"""
+from app import create_app
+from app.utils.preload import warm_shared_state
+
+app = create_app()
+warm_shared_state()